@@ -18,7 +18,6 @@ from typing import Any, Callable
 from uuid import UUID
 import shutil
 from pathlib import Path
-import subprocess
 
 from models.agent_log import AgentLogEntry, AgentName, LogLevel, SSEEventType
 from models.findings import (
@@ -30,6 +29,7 @@ from models.findings import (
 from models.evolution import EvolutionReport
 from models.scan import PrimerResult, ProjectIntake
 from services.context_store import ContextStore
+from services.repo_mirror import repo_mirrors
 from services.github import parse_repo_url, get_repo_info
 from sandbox.manager import SandboxManager
 
@@ -97,6 +97,7 @@ class AuditOrchestrator:
         """Execute the full audit and return the assembled report."""
         local_workspace_root = Path("/tmp") / "clarity-check" / str(self.scan_id)
         workspace_dir = str(local_workspace_root / "repo")
+        clone_url: str | None = None
 
         try:
             # ---- 0. Seed context ----
@@ -229,27 +230,38 @@ class AuditOrchestrator:
             await self.sandbox_mgr.destroy(self.scan_id)
             self.context.clear()
             try:
+                if clone_url:
+                    await self._release_local_repo(local_workspace_root, clone_url)
                 shutil.rmtree(local_workspace_root, ignore_errors=True)
             except Exception:
                 logger.exception("Failed to delete local workspace %s", local_workspace_root)
 
     @staticmethod
     async def _prepare_local_repo(workspace_root: Path, clone_url: str, branch: str) -> None:
-        """Clone the repo into a local, writable workspace for OpenHands tools."""
+        """Check the repo out into a local, writable workspace for OpenHands tools.
+
+        The checkout is a worktree of the shared repo mirror, so only the
+        branch tip's missing objects are fetched.
+        """
         repo_dir = workspace_root / "repo"
 
-        def _sync_clone() -> None:
+        def _sync_checkout() -> None:
             shutil.rmtree(workspace_root, ignore_errors=True)
             workspace_root.mkdir(parents=True, exist_ok=True)
-            # Shallow clone for speed.
-            subprocess.run(
-                ["git", "clone", "--depth", "1", "--branch", branch, clone_url, str(repo_dir)],
-                check=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
+            repo_sha = repo_mirrors.ensure_branch(clone_url, branch)
+            repo_mirrors.add_worktree(clone_url, repo_sha, repo_dir)
+
+        await asyncio.to_thread(_sync_checkout)
+
+    @staticmethod
+    async def _release_local_repo(workspace_root: Path, clone_url: str) -> None:
+        """Detach the local workspace from the repo mirror and free disk if over budget."""
+
+        def _sync_release() -> None:
+            repo_mirrors.remove_worktree(clone_url, workspace_root / "repo")
+            repo_mirrors.evict()
 
-        await asyncio.to_thread(_sync_clone)
+        await asyncio.to_thread(_sync_release)
 
     # ------------------------------------------------------------------ #
     # Scoring
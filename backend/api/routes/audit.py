@@ -21,15 +21,20 @@ from models.agent_log import AgentLogEntry, AgentName, LogLevel, SSEEventType
 from models.scan import AuditRequest, AuditResponse, ScanStatus
 from services import supabase_client as db
 from services.github import get_head_sha, get_repo_info, parse_repo_url
+from tier1.finding_diff import IndexMissingError, finding_diffs
+from tier1.index_service import index_service
 from tier1.indexer import DeterministicIndexer
 from tier1.orchestrator import Tier1Orchestrator
 from tier1.quota import get_quota_status, utc_month_key
+from tier1.size_estimate import estimate_repo_size
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 _LIMIT_STATUS = 403
 _CLEANUP_EVERY_N_SCANS = 5
+# Cached indexes are stored under the full commit SHA and looked up exactly.
+_FULL_SHA_PATTERN = r"^[0-9a-f]{40}$"
 _scan_start_counter = 0
 
 
@@ -45,11 +50,13 @@ async def cleanup_tier1_expired() -> None:
     try:
         deleted_artifacts = await db.delete_expired_report_artifacts()
         deleted_indexes = await db.delete_expired_project_indexes()
-        if deleted_artifacts or deleted_indexes:
+        deleted_cached_reports = await db.delete_expired_report_artifact_cache()
+        if deleted_artifacts or deleted_indexes or deleted_cached_reports:
             logger.info(
-                "Tier1 cleanup removed artifacts=%s indexes=%s",
+                "Tier1 cleanup removed artifacts=%s indexes=%s cached_reports=%s",
                 deleted_artifacts,
                 deleted_indexes,
+                deleted_cached_reports,
             )
     except Exception:
         logger.exception("Tier1 cleanup failed")
@@ -108,6 +115,8 @@ async def _run_tier1_audit(
     user_id: str,
     month_key: date,
     github_token: str | None = None,
+    clone_url: str | None = None,
+    repo_sha: str | None = None,
 ) -> None:
     """Background task that runs Tier 1 deterministic audit pipeline."""
     bus = event_buses.get(scan_id)
@@ -155,6 +164,8 @@ async def _run_tier1_audit(
                 "reports_generated_before": reports_generated_before,
                 "report_limit": settings.tier1_monthly_report_cap,
             },
+            clone_url=clone_url,
+            repo_sha=repo_sha,
         )
 
         result = await orchestrator.run()
@@ -278,25 +289,40 @@ async def _tier1_preflight(
     owner, repo = await parse_repo_url(str(request_body.repo_url))
     repo_info = await get_repo_info(owner, repo, github_token)
     repo_sha = await get_head_sha(owner, repo, repo_info.default_branch, github_token)
-
     indexer = DeterministicIndexer()
-    index_payload = await indexer.build_or_reuse(
-        project_id=UUID(existing_project["id"]) if existing_project else None,
-        user_id=user_id if existing_project else None,
-        repo_url=str(request_body.repo_url),
-        clone_url=repo_info.clone_url,
-        repo_sha=repo_sha,
-        github_token=github_token,
-    )
+    project_id = UUID(existing_project["id"]) if existing_project else None
+
+    # An index cached for this commit is authoritative; only cold repos are estimated.
+    # Only the counts are read here, so the index body stays in the database.
+    index_payload = await indexer.cached_index(project_id, repo_sha, with_body=False) if project_id else None
+    size_estimate = None
+    if index_payload is None:
+        if not index_service.is_shared(indexer, clone_url=repo_info.clone_url, repo_sha=repo_sha):
+            size_estimate = await _estimate_repo_size(owner, repo, repo_sha, repo_info.clone_url, github_token)
+
+        # Shared with the background run, which reuses this index instead of rebuilding it.
+        # Indexing stops as soon as the LOC cap is passed, so over-cap repos are never fully read.
+        index_payload = await index_service.build_or_reuse(
+            indexer,
+            project_id=project_id,
+            user_id=user_id if existing_project else None,
+            repo_url=str(request_body.repo_url),
+            clone_url=repo_info.clone_url,
+            repo_sha=repo_sha,
+            github_token=github_token,
+            loc_budget=settings.tier1_loc_cap,
+        )
     loc_total = int(index_payload.get("loc_total") or 0)
+    truncated = bool(index_payload.get("truncated"))
 
-    if loc_total > settings.tier1_loc_cap:
+    if truncated or loc_total > settings.tier1_loc_cap:
         raise _limit_exception(
             "limit_loc_exceeded",
             "Repository LOC exceeds the free tier cap.",
             {
                 "loc_total": loc_total,
                 "loc_cap": settings.tier1_loc_cap,
+                "truncated": truncated,
             },
         )
 
@@ -305,12 +331,61 @@ async def _tier1_preflight(
         "month_key": month_key,
         "repo_name": repo_info.full_name,
         "repo_sha": repo_sha,
+        "clone_url": repo_info.clone_url,
         "loc_total": loc_total,
         "file_count": int(index_payload.get("file_count") or 0),
         "reports_remaining": settings.tier1_monthly_report_cap - reports_generated,
+        "size_estimate": size_estimate,
     }
 
 
+async def _estimate_repo_size(
+    owner: str,
+    repo: str,
+    repo_sha: str,
+    clone_url: str,
+    github_token: str | None,
+) -> dict | None:
+    """Reject repos clearly over the LOC cap before anything is cloned.
+
+    Borderline estimates are only flagged; the index decides those.
+    """
+    if not settings.tier1_size_estimate_enabled:
+        return None
+    try:
+        estimate = await estimate_repo_size(
+            owner=owner,
+            repo=repo,
+            repo_sha=repo_sha,
+            clone_url=clone_url,
+            token=github_token,
+        )
+    except Exception:
+        logger.exception("Tier1 size estimate failed; falling back to indexing")
+        return None
+
+    verdict = estimate.verdict(settings.tier1_loc_cap, settings.tier1_size_estimate_margin)
+    if verdict == "over_cap":
+        raise _limit_exception(
+            "limit_loc_exceeded",
+            "Repository LOC is estimated to exceed the free tier cap.",
+            {
+                "loc_estimate": estimate.loc_estimate,
+                "loc_cap": settings.tier1_loc_cap,
+                "estimate_source": estimate.source,
+            },
+        )
+    if verdict == "borderline":
+        logger.info(
+            "Tier1 size estimate for %s/%s is borderline (%d LOC, cap %d)",
+            owner,
+            repo,
+            estimate.loc_estimate,
+            settings.tier1_loc_cap,
+        )
+    return {**estimate.as_dict(), "verdict": verdict}
+
+
 @router.post("/audit", response_model=AuditResponse)
 @limiter.limit(rate_limit_string())
 async def start_audit(
@@ -362,6 +437,8 @@ async def start_audit(
                 user_id,
                 preflight["month_key"],
                 github_token,
+                preflight["clone_url"],
+                preflight["repo_sha"],
             )
 
             return AuditResponse(
@@ -471,3 +548,30 @@ async def get_report_artifact(
         "content_encoding": content_encoding,
         "filename": filename,
     }
+
+
+@router.get("/finding-diff/{project_id}")
+async def get_finding_diff(
+    project_id: UUID,
+    request: Request,
+    base_sha: str = Query(..., pattern=_FULL_SHA_PATTERN),
+    head_sha: str | None = Query(default=None, pattern=_FULL_SHA_PATTERN),
+) -> dict:
+    """Diff Tier 1 findings between two cached commits (head defaults to the latest index)."""
+    user_id: str = request.state.user_id
+    try:
+        return await finding_diffs.diff(
+            project_id=project_id,
+            user_id=user_id,
+            base_sha=base_sha,
+            head_sha=head_sha,
+        )
+    except IndexMissingError as exc:
+        commit = exc.repo_sha or "the latest scan"
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "code": "project_index_missing",
+                "message": f"No cached index for {commit}. Run a new scan of that commit first.",
+            },
+        )
@@ -6,7 +6,6 @@ import json
 import logging
 from uuid import UUID, uuid4
 
-import httpx
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, HttpUrl
 
@@ -15,6 +14,7 @@ from models.scan import PrimerResult
 from sandbox.manager import SandboxManager
 from services import supabase_client as db
 from services.github import get_head_sha, get_repo_info, parse_repo_url
+from services.openrouter import chat_completion
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -194,30 +194,15 @@ async def _summarize(primer_json: dict) -> str:
         f"{json.dumps(primer_json)[:15000]}"
     )
     try:
-        async with httpx.AsyncClient(timeout=20) as client:
-            resp = await client.post(
-                f"{settings.openrouter_base_url}/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {settings.openrouter_api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": settings.model_scanner,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.2,
-                    "max_tokens": 280,
-                },
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            content = (
-                data.get("choices", [{}])[0]
-                .get("message", {})
-                .get("content", "")
-                .strip()
-            )
-            if content:
-                return content
+        completion = await chat_completion(
+            model=settings.model_scanner,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.2,
+            max_tokens=280,
+            timeout=20,
+        )
+        if completion.content:
+            return completion.content
     except Exception:
         logger.exception("Primer summary fallback to deterministic text")
 
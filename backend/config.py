@@ -49,6 +49,10 @@ class Settings(BaseSettings):
     # --- LLM Runtime Limits ---
     # Keep this conservative to avoid OpenRouter credit/max_token failures.
     llm_max_output_tokens: int = 4096
+    # On-disk cache of chat completions keyed by model, messages and sampling settings; 0 MB disables.
+    llm_cache_root: str = "/tmp/clarity-check/llm-cache"
+    llm_cache_max_mb: int = 64
+    llm_cache_ttl_seconds: int = 86400
 
     # --- Sandbox Limits ---
     sandbox_timeout_minutes: int = 30
@@ -64,6 +68,50 @@ class Settings(BaseSettings):
     tier1_project_cap: int = 3
     tier1_index_ttl_days: int = 30
     tier1_report_ttl_days: int = 7
+    # Reuse report artifacts (model call, markdown, PDF) across runs with identical inputs, for tier1_report_ttl_days.
+    tier1_report_cache_enabled: bool = True
+    # Process-pool workers for file indexing; 0 or 1 keeps indexing serial.
+    tier1_index_workers: int = 0
+    # Repos with fewer tracked files are indexed serially even when workers > 1.
+    tier1_index_parallel_min_files: int = 400
+    # Re-scan only files changed since the project's latest cached index.
+    tier1_incremental_index_enabled: bool = True
+    # In-process LRU of per-blob extraction results keyed by git blob id; 0 disables.
+    tier1_blob_cache_max_mb: int = 64
+    # Commits of history fetched (blob-less) behind the indexed commit for git metadata; <= 1 fetches none.
+    tier1_git_history_depth: int = 200
+    # Wall-clock budget for all linter probes, which run concurrently.
+    tier1_linter_budget_seconds: float = 30.0
+    # CPU-time limit per linter process; 0 disables it.
+    tier1_linter_cpu_seconds: int = 20
+    # How long a finished index stays in memory for the scan that follows its preflight.
+    tier1_index_share_ttl_seconds: int = 600
+    # Estimate LOC from blob sizes before cloning, rejecting repos clearly over tier1_loc_cap.
+    tier1_size_estimate_enabled: bool = True
+    # Relative error tolerated on the estimate; only repos over cap by more than this are rejected early.
+    tier1_size_estimate_margin: float = 0.5
+    # Signal rows kept per bucket (per auth/rate-limit class for route hints); exact counts are kept separately. 0 keeps all.
+    tier1_signal_bucket_cap: int = 200
+    # Files with a line longer than this many bytes are downgraded to sampled signal scanning; 0 disables.
+    tier1_scan_max_line_bytes: int = 10000
+    # Per-file cap on regex rule evaluations (candidate lines times their rules); files over it are
+    # downgraded to sampled scanning. A count rather than a time budget, so cached indexes never depend
+    # on machine load. 0 disables.
+    tier1_scan_file_rule_budget: int = 100_000
+    # Regex engine for signal scanning: "re", or "re2" (linear time; needs the google-re2 package).
+    tier1_regex_engine: str = "re"
+    # Tier 1 check profile ("balanced", or "security" for a CI gate); indexing only collects what it consumes.
+    tier1_check_profile: str = "balanced"
+    # Minimum interval between SSE progress events during a Tier 1 index build; phase changes always report.
+    tier1_progress_interval_ms: int = 500
+
+    # --- Local Repository Mirrors ---
+    # Bare mirrors shared by Tier 1 indexing and local agent workspaces.
+    repo_mirror_root: str = "/tmp/clarity-check/mirrors"
+    # Least-recently-used idle mirrors are evicted beyond this disk budget.
+    repo_mirror_max_gb: float = 5.0
+    # Blobs above this size stay on the server (partial fetch) and are not indexed; 0 fetches everything.
+    repo_mirror_blob_limit_mb: int = 8
 
     # --- Rate Limiting ---
     rate_limit_per_minute: int = 10
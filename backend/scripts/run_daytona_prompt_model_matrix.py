@@ -244,6 +244,9 @@ async def run_report_matrix(
                 run_details=run_details,
                 git_metadata=git_metadata,
                 index_facts=index_facts,
+                # Combos are ranked on cost and latency, so each one makes a real model
+                # call; a response cached by an earlier run would make it look free.
+                use_llm_cache=False,
             )
 
             details = artifact.summary_json.get("run_details") or {}
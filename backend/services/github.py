@@ -95,3 +95,46 @@ async def get_head_sha(
         resp.raise_for_status()
         data = resp.json()
     return data["sha"]
+
+
+async def get_tree(
+    owner: str,
+    repo: str,
+    sha: str,
+    token: str | None = None,
+) -> dict:
+    """Fetch a commit's recursive tree; blob entries carry their sizes.
+
+    GitHub sets ``truncated`` when the tree is too large to list in full.
+    """
+    headers: dict[str, str] = {"Accept": "application/vnd.github.v3+json"}
+    if token:
+        headers["Authorization"] = f"token {token}"
+
+    async with httpx.AsyncClient() as client:
+        resp = await client.get(
+            f"https://api.github.com/repos/{owner}/{repo}/git/trees/{sha}",
+            params={"recursive": "1"},
+            headers=headers,
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+
+async def get_languages(
+    owner: str,
+    repo: str,
+    token: str | None = None,
+) -> dict[str, int]:
+    """Fetch bytes of code per language, as measured by GitHub Linguist."""
+    headers: dict[str, str] = {"Accept": "application/vnd.github.v3+json"}
+    if token:
+        headers["Authorization"] = f"token {token}"
+
+    async with httpx.AsyncClient() as client:
+        resp = await client.get(
+            f"https://api.github.com/repos/{owner}/{repo}/languages",
+            headers=headers,
+        )
+        resp.raise_for_status()
+        return {str(name): int(size) for name, size in resp.json().items()}
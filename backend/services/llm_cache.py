@@ -0,0 +1,157 @@
+"""On-disk cache of chat completion responses.
+
+Responses are stored one JSON file per request under ``llm_cache_root``,
+keyed by a hash of the model, the normalized messages and the sampling
+settings, so identical prompts from the API, the primer and the matrix
+scripts share one upstream call.  Entries expire after a TTL and the least
+recently used ones are evicted beyond a disk budget.  Cache failures are
+logged and treated as misses; they never fail a completion.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize_messages(messages: list[dict]) -> list[dict]:
+    normalized = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            content = "\n".join(line.rstrip() for line in content.replace("\r\n", "\n").strip().split("\n"))
+        normalized.append({**message, "role": str(message.get("role", "")).lower(), "content": content})
+    return normalized
+
+
+def completion_cache_key(*, model: str, messages: list[dict], temperature: float, max_tokens: int) -> str:
+    payload = {
+        "model": model,
+        "messages": _normalize_messages(messages),
+        "temperature": round(float(temperature), 4),
+        "max_tokens": int(max_tokens),
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Completion responses on disk with a TTL and an LRU disk budget."""
+
+    def __init__(self, root: Path, max_bytes: int, ttl_seconds: int) -> None:
+        self.root = Path(root)
+        self.max_bytes = max(0, int(max_bytes))
+        self.ttl_seconds = max(0, int(ttl_seconds))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.ttl_seconds > 0
+
+    def get(self, cache_key: str) -> dict | None:
+        if not self.enabled:
+            return None
+        path = self._path(cache_key)
+        try:
+            with self._lock:
+                age = time.time() - path.stat().st_mtime
+                if age > self.ttl_seconds:
+                    path.unlink(missing_ok=True)
+                    self.misses += 1
+                    return None
+                entry = json.loads(path.read_text(encoding="utf-8"))
+                # Touch on read so eviction drops the least recently used entries first.
+                os.utime(path)
+                self.hits += 1
+                return entry
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            self.errors += 1
+            logger.exception("LLM response cache read failed")
+            return None
+
+    def put(self, cache_key: str, entry: dict) -> None:
+        if not self.enabled:
+            return
+        try:
+            with self._lock:
+                self.root.mkdir(parents=True, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-", suffix=".json")
+                with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                    json.dump(entry, fh)
+                os.replace(tmp, self._path(cache_key))
+                self.stores += 1
+                self._evict()
+        except Exception:
+            self.errors += 1
+            logger.exception("LLM response cache store failed")
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self._entries():
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _path(self, cache_key: str) -> Path:
+        return self.root / f"{cache_key}.json"
+
+    def _entries(self) -> list[Path]:
+        if not self.root.is_dir():
+            return []
+        return [path for path in self.root.glob("*.json") if not path.name.startswith(".tmp-")]
+
+    def _evict(self) -> None:
+        now = time.time()
+        live: list[tuple[float, int, Path]] = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                self.evictions += 1
+                continue
+            live.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _mtime, size, _path in live)
+        for _mtime, size, path in sorted(live, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.evictions += 1
+
+
+llm_cache = LLMResponseCache(
+    root=Path(settings.llm_cache_root),
+    max_bytes=settings.llm_cache_max_mb * 1024 * 1024,
+    ttl_seconds=settings.llm_cache_ttl_seconds,
+)
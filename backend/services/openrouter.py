@@ -3,11 +3,37 @@
 Wraps the OpenRouter API (OpenAI-compatible) so agents can call different
 models through a single interface.  Used by the OpenHands LLM config to
 route each agent to its designated model.
+
+Direct chat completions (report narratives, repo primers) go through
+``chat_completion``, which serves repeated requests from ``llm_cache`` and
+coalesces identical in-flight requests into one upstream call.
 """
 
 from __future__ import annotations
 
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Callable
+
+import httpx
+
 from config import settings
+from services.llm_cache import completion_cache_key, llm_cache
+
+logger = logging.getLogger(__name__)
+
+# Identical requests currently waiting on OpenRouter, by cache key.
+_inflight: dict[str, asyncio.Task] = {}
+
+
+@dataclass(frozen=True)
+class ChatCompletion:
+    content: str
+    usage: dict | None
+    # True when no upstream call was made for this caller (a cache hit or a
+    # coalesced duplicate); ``usage`` is then the original call's usage.
+    cached: bool = False
 
 
 def get_llm_config(model: str) -> dict:
@@ -28,3 +54,91 @@ def get_llm_config(model: str) -> dict:
         "api_key": settings.openrouter_api_key,
         "base_url": settings.openrouter_base_url,
     }
+
+
+async def chat_completion(
+    *,
+    model: str,
+    messages: list[dict],
+    temperature: float,
+    max_tokens: int,
+    timeout: float = 30,
+    cacheable: Callable[[str], bool] | None = None,
+    use_cache: bool = True,
+) -> ChatCompletion:
+    """Post a chat completion to OpenRouter, reusing cached and in-flight responses.
+
+    Responses with empty content, or rejected by ``cacheable``, are returned
+    but not stored, so the next identical request calls the model again.
+    With ``use_cache=False`` the model is always called; the response is
+    still stored for later callers.
+    """
+    cache_key = completion_cache_key(model=model, messages=messages, temperature=temperature, max_tokens=max_tokens)
+    if use_cache:
+        cached = await asyncio.to_thread(llm_cache.get, cache_key)
+        if cached is not None:
+            return ChatCompletion(content=cached.get("content", ""), usage=cached.get("usage"), cached=True)
+
+        task = _inflight.get(cache_key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            completion = await asyncio.shield(task)
+            return ChatCompletion(content=completion.content, usage=completion.usage, cached=True)
+
+    task = asyncio.create_task(
+        _post_chat_completion(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout,
+        )
+    )
+    _inflight[cache_key] = task
+    try:
+        completion = await asyncio.shield(task)
+    finally:
+        if _inflight.get(cache_key) is task:
+            del _inflight[cache_key]
+
+    if completion.content and (cacheable is None or cacheable(completion.content)):
+        await asyncio.to_thread(
+            llm_cache.put,
+            cache_key,
+            {"model": model, "content": completion.content, "usage": completion.usage},
+        )
+    return completion
+
+
+async def _post_chat_completion(
+    *,
+    model: str,
+    messages: list[dict],
+    temperature: float,
+    max_tokens: int,
+    timeout: float,
+) -> ChatCompletion:
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        resp = await client.post(
+            f"{settings.openrouter_base_url}/chat/completions",
+            headers={
+                "Authorization": f"Bearer {settings.openrouter_api_key}",
+                "Content-Type": "application/json",
+            },
+            json={
+                "model": model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+            },
+        )
+        resp.raise_for_status()
+        data = resp.json()
+
+    content = (
+        data.get("choices", [{}])[0]
+        .get("message", {})
+        .get("content", "")
+        .strip()
+    )
+    usage = data.get("usage") if isinstance(data.get("usage"), dict) else None
+    return ChatCompletion(content=content, usage=usage)
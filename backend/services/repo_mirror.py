@@ -0,0 +1,632 @@
+"""Persistent bare-mirror store shared by every local repository checkout.
+
+Each clone URL maps to one bare repository under ``repo_mirror_root``.  Scans
+fetch only the objects they are missing into that mirror and either check
+commits out through ``git worktree`` or read them straight from the object
+store (``git ls-tree`` plus a long-lived ``git cat-file --batch``).  With a
+blob limit every fetch is partial (``--filter=blob:limit=<n>``), so oversized
+blobs never leave the server; a later checkout fetches them lazily if it needs
+them.  The limit is recorded per mirror and applied to every fetch, which is
+what lets readers treat a missing blob as an oversized one.  History behind a
+commit, and a commit only sized before indexing, are fetched without any blobs;
+such commits stay unpinned and are refetched with their blobs before anything
+reads them.
+
+A per-repo lock (threading + ``flock`` across worker processes) serializes
+fetches and worktree bookkeeping, so concurrent scans of the same repo share
+one fetch.  Mirrors are evicted least-recently-used when the store exceeds its
+disk budget; a mirror with a live lease or worktree is never evicted.
+
+Mirrors never store credentials: tokens are passed to each git process as an
+HTTP header through the environment, and callers must have verified
+repository access (e.g. via the GitHub API) before requesting a checkout.
+"""
+
+from __future__ import annotations
+
+import base64
+import fcntl
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+from urllib.parse import urlsplit, urlunsplit
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_LAST_USED_MARKER = "clarity-last-used"
+_PIN_PREFIX = "refs/clarity/commits/"
+
+
+@dataclass(frozen=True)
+class TreeEntry:
+    mode: str
+    object_type: str
+    object_id: str
+    path: str
+
+
+class BlobStream:
+    """One long-lived ``git cat-file --batch`` process for reading blob contents.
+
+    Callers must only request objects present in the mirror: in a partial
+    clone, asking for a missing blob makes git fetch it on its own.
+    """
+
+    def __init__(self, git_dir: Path, env: dict[str, str]) -> None:
+        self._proc = subprocess.Popen(
+            ["git", "--git-dir", str(git_dir), "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+        )
+        self._busy = False
+
+    def iter_blobs(self, object_ids: list[str]) -> Iterator[bytes | None]:
+        """Yield the content of each object in order (None for missing objects)."""
+        if self._busy:
+            raise RuntimeError("BlobStream is already being read")
+        self._busy = True
+        stdin, stdout = self._proc.stdin, self._proc.stdout
+        assert stdin is not None and stdout is not None
+
+        def _write_requests() -> None:
+            try:
+                stdin.write(b"".join(f"{object_id}\n".encode("ascii") for object_id in object_ids))
+                stdin.flush()
+            except (BrokenPipeError, ValueError):
+                pass
+
+        # Requests are written from a thread so large batches cannot deadlock on
+        # full pipes while responses are being consumed here.
+        writer = threading.Thread(target=_write_requests, daemon=True)
+        writer.start()
+        try:
+            for _ in object_ids:
+                header = stdout.readline()
+                if not header:
+                    raise RuntimeError("git cat-file --batch exited unexpectedly")
+                parts = header.split()
+                if len(parts) < 3:
+                    yield None
+                    continue
+                size = int(parts[2])
+                data = stdout.read(size)
+                stdout.read(1)  # trailing newline
+                yield data
+        finally:
+            writer.join()
+            self._busy = False
+
+    def close(self) -> None:
+        if self._proc.stdin is not None and not self._proc.stdin.closed:
+            self._proc.stdin.close()
+        try:
+            self._proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+        if self._proc.stdout is not None:
+            self._proc.stdout.close()
+
+    def __enter__(self) -> BlobStream:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class RepoMirrorStore:
+    """Bare mirrors keyed by clone URL, with per-repo locks and an LRU disk budget."""
+
+    def __init__(self, root: Path, max_bytes: int, blob_limit: int | None = None) -> None:
+        self.root = Path(root)
+        self.max_bytes = max(0, int(max_bytes))
+        self.blob_limit = None if blob_limit is None else max(0, int(blob_limit))
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    # ------------------------------------------------------------------ #
+    # Fetching and checkouts
+    # ------------------------------------------------------------------ #
+
+    def mirror_path(self, clone_url: str) -> Path:
+        return self.root / f"{_mirror_key(clone_url)}.git"
+
+    def ensure_commit(
+        self,
+        clone_url: str,
+        repo_sha: str,
+        *,
+        token: str | None = None,
+        depth: int = 1,
+        timeout: int = 120,
+    ) -> Path:
+        """Make ``repo_sha`` (with ``depth`` commits of history) present in the mirror.
+
+        Returns the mirror's git dir.  Commits already fetched at sufficient
+        depth are not fetched again.
+        """
+        git_dir = self.mirror_path(clone_url)
+        with self._repo_lock(clone_url):
+            self._init_mirror(git_dir, clone_url)
+            if self._needs_fetch(git_dir, repo_sha, depth):
+                # An unpinned commit already in the mirror may have arrived as
+                # blob-less history; a plain fetch would not bring its blobs.
+                refetch = ["--refetch"] if self._has_commit(git_dir, repo_sha) else []
+                _git(
+                    git_dir,
+                    *self._fetch_args(depth),
+                    *refetch,
+                    "origin",
+                    f"+{repo_sha}:{_PIN_PREFIX}{repo_sha}",
+                    timeout=timeout,
+                    env=_git_env(token),
+                )
+            self._touch(git_dir)
+        return git_dir
+
+    def ensure_history(
+        self,
+        clone_url: str,
+        repo_sha: str,
+        *,
+        token: str | None = None,
+        depth: int,
+        timeout: int = 120,
+    ) -> Path:
+        """Fetch ``depth`` commits of history behind a fetched ``repo_sha``, without blobs.
+
+        Only commits and trees are transferred (``--filter=blob:none``), so
+        deep history costs no blob data. History commits stay unpinned;
+        ``ensure_commit`` refetches one with its blobs if it is ever needed.
+        """
+        git_dir = self.mirror_path(clone_url)
+        with self._repo_lock(clone_url):
+            self._init_mirror(git_dir, clone_url)
+            if depth > 1 and self._needs_history(git_dir, repo_sha, depth):
+                _git(
+                    git_dir,
+                    "fetch",
+                    "--no-tags",
+                    "--depth",
+                    str(depth),
+                    "--filter=blob:none",
+                    "origin",
+                    repo_sha,
+                    timeout=timeout,
+                    env=_git_env(token),
+                )
+            self._touch(git_dir)
+        return git_dir
+
+    def ensure_tree(
+        self,
+        clone_url: str,
+        repo_sha: str,
+        *,
+        token: str | None = None,
+        timeout: int = 120,
+    ) -> Path:
+        """Make the commit and its trees present, fetching no blobs if it is new.
+
+        Enough for ``list_tree`` and for sizing whichever blobs the mirror
+        already holds; ``ensure_commit`` later refetches it with its blobs.
+        """
+        git_dir = self.mirror_path(clone_url)
+        with self._repo_lock(clone_url):
+            self._init_mirror(git_dir, clone_url)
+            if not self._has_commit(git_dir, repo_sha):
+                _git(
+                    git_dir,
+                    "fetch",
+                    "--no-tags",
+                    "--depth",
+                    "1",
+                    "--filter=blob:none",
+                    "origin",
+                    repo_sha,
+                    timeout=timeout,
+                    env=_git_env(token),
+                )
+            self._touch(git_dir)
+        return git_dir
+
+    def ensure_branch(
+        self,
+        clone_url: str,
+        branch: str,
+        *,
+        token: str | None = None,
+        depth: int = 1,
+        timeout: int = 120,
+    ) -> str:
+        """Fetch the current tip of ``branch`` into the mirror and return its sha."""
+        git_dir = self.mirror_path(clone_url)
+        ref = f"refs/heads/{branch}"
+        with self._repo_lock(clone_url):
+            self._init_mirror(git_dir, clone_url)
+            _git(
+                git_dir,
+                *self._fetch_args(depth),
+                "origin",
+                f"+{ref}:{ref}",
+                timeout=timeout,
+                env=_git_env(token),
+            )
+            self._touch(git_dir)
+            return _git(git_dir, "rev-parse", "--verify", ref).stdout.strip()
+
+    def add_worktree(
+        self,
+        clone_url: str,
+        repo_sha: str,
+        dest: Path,
+        *,
+        token: str | None = None,
+    ) -> Path:
+        """Check ``repo_sha`` out at ``dest`` as a detached worktree of the mirror."""
+        git_dir = self.mirror_path(clone_url)
+        with self._repo_lock(clone_url):
+            shutil.rmtree(dest, ignore_errors=True)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            _git(git_dir, "worktree", "prune")
+            # Blobs left on the server by a partial fetch are fetched here in one batch.
+            _git(
+                git_dir,
+                "worktree",
+                "add",
+                "--detach",
+                "--force",
+                str(dest),
+                repo_sha,
+                timeout=300,
+                env=_git_env(token),
+            )
+            self._touch(git_dir)
+        return dest
+
+    def remove_worktree(self, clone_url: str, dest: Path) -> None:
+        git_dir = self.mirror_path(clone_url)
+        with self._repo_lock(clone_url):
+            if git_dir.exists():
+                _git(git_dir, "worktree", "remove", "--force", str(dest), check=False)
+                _git(git_dir, "worktree", "prune", check=False)
+        shutil.rmtree(dest, ignore_errors=True)
+
+    @contextmanager
+    def worktree(
+        self,
+        clone_url: str,
+        repo_sha: str,
+        dest: Path,
+        *,
+        token: str | None = None,
+        depth: int = 1,
+    ) -> Iterator[Path]:
+        """Fetch ``repo_sha`` if needed and yield a worktree removed on exit."""
+        self.ensure_commit(clone_url, repo_sha, token=token, depth=depth)
+        self.add_worktree(clone_url, repo_sha, dest, token=token)
+        try:
+            yield dest
+        finally:
+            self.remove_worktree(clone_url, dest)
+            self.evict()
+
+    # ------------------------------------------------------------------ #
+    # Reading objects without a checkout
+    # ------------------------------------------------------------------ #
+
+    @contextmanager
+    def lease(self, clone_url: str) -> Iterator[Path]:
+        """Hold the mirror against eviction while its objects are read directly."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self._lease_path(clone_url), "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_SH)
+            try:
+                yield self.mirror_path(clone_url)
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def list_tree(self, clone_url: str, repo_sha: str) -> list[TreeEntry]:
+        """List every entry of the commit's tree in index order.
+
+        Uses ``ls-tree -r`` without ``-l``: reporting sizes would read, and in
+        a partial clone lazily fetch, every blob one at a time.
+        """
+        result = _git(self.mirror_path(clone_url), "ls-tree", "-r", "-z", "--full-tree", repo_sha)
+        entries: list[TreeEntry] = []
+        for record in result.stdout.split("\0"):
+            if not record:
+                continue
+            meta, _, path = record.partition("\t")
+            mode, object_type, object_id = meta.split()
+            entries.append(TreeEntry(mode=mode, object_type=object_type, object_id=object_id, path=path))
+        return entries
+
+    def missing_objects(self, clone_url: str, repo_sha: str) -> set[str]:
+        """Objects in the commit's tree that a partial fetch left on the server."""
+        result = _git(
+            self.mirror_path(clone_url),
+            "rev-list",
+            "--objects",
+            "--no-walk",
+            "--missing=print",
+            repo_sha,
+            timeout=120,
+        )
+        return {line[1:].strip() for line in result.stdout.splitlines() if line.startswith("?")}
+
+    def oversized_objects(self, clone_url: str, repo_sha: str) -> set[str]:
+        """Blobs in the commit's tree above the blob limit, whether or not a checkout fetched them.
+
+        Sizes come from the filter walk, which never reads the omitted blobs.
+        """
+        if self.blob_limit is None:
+            return set()
+        result = _git(
+            self.mirror_path(clone_url),
+            "rev-list",
+            "--objects",
+            "--no-walk",
+            "--missing=print",
+            f"--filter={self._blob_filter()}",
+            "--filter-print-omitted",
+            repo_sha,
+            timeout=120,
+        )
+        return {line[1:].strip() for line in result.stdout.splitlines() if line[:1] in {"~", "?"}}
+
+    def blob_sizes(self, clone_url: str, object_ids: Iterable[str]) -> dict[str, int]:
+        """Sizes of blobs present in the mirror, read from object headers only.
+
+        As with ``BlobStream``, only present objects may be asked about.
+        """
+        wanted = sorted(set(object_ids))
+        if not wanted:
+            return {}
+        result = _git(
+            self.mirror_path(clone_url),
+            "cat-file",
+            "--batch-check=%(objectname) %(objectsize)",
+            input="\n".join(wanted) + "\n",
+            timeout=120,
+        )
+        sizes: dict[str, int] = {}
+        for line in result.stdout.splitlines():
+            object_id, _, size = line.partition(" ")
+            if size.isdigit():
+                sizes[object_id] = int(size)
+        return sizes
+
+    def open_blob_stream(self, clone_url: str, *, token: str | None = None) -> BlobStream:
+        return BlobStream(self.mirror_path(clone_url), _git_env(token))
+
+    # ------------------------------------------------------------------ #
+    # Disk budget
+    # ------------------------------------------------------------------ #
+
+    def evict(self) -> list[Path]:
+        """Delete least-recently-used idle mirrors until the store fits its budget."""
+        if not self.root.exists():
+            return []
+        mirrors = []
+        for git_dir in self.root.glob("*.git"):
+            marker = git_dir / _LAST_USED_MARKER
+            last_used = marker.stat().st_mtime if marker.exists() else 0.0
+            mirrors.append((last_used, git_dir, _dir_size(git_dir)))
+
+        total = sum(size for _, _, size in mirrors)
+        evicted: list[Path] = []
+        for _, git_dir, size in sorted(mirrors, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            if self._evict_one(git_dir):
+                total -= size
+                evicted.append(git_dir)
+        return evicted
+
+    def usage_bytes(self) -> int:
+        if not self.root.exists():
+            return 0
+        return sum(_dir_size(git_dir) for git_dir in self.root.glob("*.git"))
+
+    # ------------------------------------------------------------------ #
+    # Internals
+    # ------------------------------------------------------------------ #
+
+    def _lease_path(self, clone_url: str) -> Path:
+        return self.root / f"{_mirror_key(clone_url)}.lease"
+
+    @contextmanager
+    def _repo_lock(self, clone_url: str) -> Iterator[None]:
+        key = _mirror_key(clone_url)
+        with self._locks_guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.root / f"{key}.lock", "a") as handle:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _evict_one(self, git_dir: Path) -> bool:
+        key = git_dir.name[: -len(".git")]
+        with self._locks_guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        if not lock.acquire(blocking=False):
+            return False
+        try:
+            with open(self.root / f"{key}.lock", "a") as handle, open(
+                self.root / f"{key}.lease", "a"
+            ) as lease:
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return False
+                try:
+                    try:
+                        fcntl.flock(lease, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        return False
+                    _git(git_dir, "worktree", "prune", check=False)
+                    worktrees = git_dir / "worktrees"
+                    if worktrees.exists() and any(worktrees.iterdir()):
+                        return False
+                    shutil.rmtree(git_dir, ignore_errors=True)
+                    logger.info("Evicted repo mirror %s", git_dir)
+                    return True
+                finally:
+                    fcntl.flock(lease, fcntl.LOCK_UN)
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+        finally:
+            lock.release()
+
+    def _init_mirror(self, git_dir: Path, clone_url: str) -> None:
+        blob_filter = self._blob_filter()
+        if (git_dir / "HEAD").exists():
+            recorded = _git(git_dir, "config", "--get", "clarity.blobfilter", check=False).stdout.strip()
+            if recorded == blob_filter:
+                return
+            # Mixed filters would make "missing" ambiguous; start the mirror over.
+            logger.info("Repo mirror %s was fetched with another blob filter; recreating", git_dir)
+        shutil.rmtree(git_dir, ignore_errors=True)
+        _git(git_dir.parent, "init", "--bare", "--quiet", str(git_dir), git_dir_flag=False)
+        _git(git_dir, "config", "remote.origin.url", _strip_credentials(clone_url))
+        _git(git_dir, "config", "clarity.blobfilter", blob_filter)
+        # Fetched commits are pinned under refs/clarity, so background gc is safe.
+        _git(git_dir, "config", "gc.auto", "256")
+
+    def _blob_filter(self) -> str:
+        return "none" if self.blob_limit is None else f"blob:limit={self.blob_limit}"
+
+    def _fetch_args(self, depth: int) -> list[str]:
+        args = ["fetch", "--no-tags", "--depth", str(max(1, depth))]
+        # Always explicit: after a blob-less history fetch, git would otherwise
+        # default to that remote's recorded partial-clone filter.
+        if self.blob_limit is not None:
+            args.append(f"--filter={self._blob_filter()}")
+        else:
+            args.append("--no-filter")
+        return args
+
+    @staticmethod
+    def _needs_history(git_dir: Path, repo_sha: str, depth: int) -> bool:
+        """Whether fewer than ``depth`` commits are present behind a shallow boundary."""
+        shallow_file = git_dir / "shallow"
+        if not shallow_file.exists():
+            return False
+        history = _git(git_dir, "rev-list", f"--max-count={depth}", repo_sha, check=False)
+        if history.returncode != 0:
+            return True
+        commits = history.stdout.split()
+        return len(commits) < depth and not set(commits).isdisjoint(shallow_file.read_text().split())
+
+    @staticmethod
+    def _has_commit(git_dir: Path, repo_sha: str) -> bool:
+        # --missing=print keeps rev-list from lazily fetching a missing object.
+        present = _git(git_dir, "rev-list", "--no-walk", "--missing=print", repo_sha, check=False)
+        return present.returncode == 0
+
+    @staticmethod
+    def _needs_fetch(git_dir: Path, repo_sha: str, depth: int) -> bool:
+        # Check the pin ref rather than the object: reading a missing object in
+        # a partial clone would fetch it (and its full history) lazily.
+        pinned = _git(git_dir, "show-ref", "--verify", "--quiet", f"{_PIN_PREFIX}{repo_sha}", check=False)
+        if pinned.returncode != 0:
+            return True
+        if depth <= 1:
+            return False
+        # A commit first fetched as a shallow boundary has no history behind it.
+        shallow = git_dir / "shallow"
+        return shallow.exists() and repo_sha in shallow.read_text().split()
+
+    @staticmethod
+    def _touch(git_dir: Path) -> None:
+        (git_dir / _LAST_USED_MARKER).touch()
+
+
+def _git_env(token: str | None) -> dict[str, str]:
+    env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+    if token:
+        credentials = base64.b64encode(f"x-access-token:{token}".encode("utf-8")).decode("ascii")
+        env.update(
+            {
+                "GIT_CONFIG_COUNT": "1",
+                "GIT_CONFIG_KEY_0": "http.extraHeader",
+                "GIT_CONFIG_VALUE_0": f"Authorization: Basic {credentials}",
+            }
+        )
+    return env
+
+
+def _git(
+    cwd: Path,
+    *args: str,
+    timeout: int = 60,
+    check: bool = True,
+    git_dir_flag: bool = True,
+    env: dict[str, str] | None = None,
+    input: str | None = None,
+) -> subprocess.CompletedProcess[str]:
+    cmd = ["git", "--git-dir", str(cwd), *args] if git_dir_flag else ["git", *args]
+    return subprocess.run(
+        cmd,
+        cwd=None if git_dir_flag else str(cwd),
+        check=check,
+        text=True,
+        input=input,
+        capture_output=True,
+        timeout=timeout,
+        env=env or _git_env(None),
+    )
+
+
+def _strip_credentials(clone_url: str) -> str:
+    parts = urlsplit(clone_url)
+    if not parts.netloc or "@" not in parts.netloc:
+        return clone_url
+    return urlunsplit(parts._replace(netloc=parts.netloc.rsplit("@", 1)[1]))
+
+
+def _mirror_key(clone_url: str) -> str:
+    normalized = _strip_credentials(clone_url.strip()).rstrip("/")
+    if normalized.endswith(".git"):
+        normalized = normalized[: -len(".git")]
+    parts = urlsplit(normalized)
+    if parts.netloc:
+        normalized = urlunsplit(parts._replace(netloc=parts.netloc.lower()))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:24]
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+repo_mirrors = RepoMirrorStore(
+    root=Path(settings.repo_mirror_root),
+    max_bytes=int(settings.repo_mirror_max_gb * 1024 * 1024 * 1024),
+    blob_limit=(
+        settings.repo_mirror_blob_limit_mb * 1024 * 1024
+        if settings.repo_mirror_blob_limit_mb > 0
+        else None
+    ),
+)
@@ -132,6 +132,24 @@ async def create_scan_report(
     return UUID(row.data[0]["id"])
 
 
+async def get_latest_project_intake(project_id: UUID, user_id: str) -> dict | None:
+    """Return the project intake recorded with the user's most recent scan of a project."""
+    client = _client()
+    row = (
+        client.table("scan_reports")
+        .select("project_intake")
+        .eq("project_id", str(project_id))
+        .eq("user_id", str(user_id))
+        .not_.is_("project_intake", "null")
+        .order("created_at", desc=True)
+        .limit(1)
+        .execute()
+    )
+    if not row.data:
+        return None
+    return row.data[0].get("project_intake")
+
+
 async def update_scan_status(scan_id: UUID, status: ScanStatus) -> None:
     client = _client()
     client.table("scan_reports").update({"status": status.value}).eq(
@@ -377,13 +395,43 @@ async def increment_free_reports_generated(user_id: str, month_key: date) -> int
     return next_value
 
 
-async def get_project_index(project_id: UUID, repo_sha: str) -> dict | None:
-    """Return active cached project index for a commit SHA."""
+_PROJECT_INDEX_COLUMNS = "id,project_id,user_id,repo_sha,loc_total,file_count,expires_at,created_at,updated_at"
+
+
+def _project_index_select(index_fields: tuple[str, ...] | None) -> str:
+    if index_fields is None:
+        return "*"
+    # JSON path selects read single index_json fields without sending the rest of the document.
+    return ",".join([_PROJECT_INDEX_COLUMNS, *(f"index_json_{field}:index_json->{field}" for field in index_fields)])
+
+
+def _project_index_row(row: dict, index_fields: tuple[str, ...] | None) -> dict:
+    if index_fields is None:
+        return row
+    index_json = {}
+    for field in index_fields:
+        value = row.pop(f"index_json_{field}", None)
+        if value is not None:
+            index_json[field] = value
+    return {**row, "index_json": index_json}
+
+
+async def get_project_index(
+    project_id: UUID,
+    repo_sha: str,
+    *,
+    index_fields: tuple[str, ...] | None = None,
+) -> dict | None:
+    """Return active cached project index for a commit SHA.
+
+    With ``index_fields``, ``index_json`` holds only those top-level fields
+    and the rest of the stored index is not fetched.
+    """
     client = _client()
     now_iso = datetime.now(timezone.utc).isoformat()
     row = (
         client.table("project_indexes")
-        .select("*")
+        .select(_project_index_select(index_fields))
         .eq("project_id", str(project_id))
         .eq("repo_sha", repo_sha)
         .gt("expires_at", now_iso)
@@ -392,7 +440,32 @@ async def get_project_index(project_id: UUID, repo_sha: str) -> dict | None:
     )
     if not row.data:
         return None
-    return row.data[0]
+    return _project_index_row(row.data[0], index_fields)
+
+
+async def get_latest_project_index(
+    project_id: UUID,
+    *,
+    index_fields: tuple[str, ...] | None = None,
+) -> dict | None:
+    """Return the most recently updated active project index, for any commit.
+
+    ``index_fields`` narrows ``index_json`` as in ``get_project_index``.
+    """
+    client = _client()
+    now_iso = datetime.now(timezone.utc).isoformat()
+    row = (
+        client.table("project_indexes")
+        .select(_project_index_select(index_fields))
+        .eq("project_id", str(project_id))
+        .gt("expires_at", now_iso)
+        .order("updated_at", desc=True)
+        .limit(1)
+        .execute()
+    )
+    if not row.data:
+        return None
+    return _project_index_row(row.data[0], index_fields)
 
 
 async def upsert_project_index(
@@ -476,6 +549,49 @@ async def get_report_artifact(
     return row.data[0]
 
 
+async def get_cached_report_artifact(user_id: str, cache_key: str) -> dict | None:
+    """Fetch an active cached report artifact for identical report inputs."""
+    client = _client()
+    now_iso = datetime.now(timezone.utc).isoformat()
+    row = (
+        client.table("report_artifact_cache")
+        .select("*")
+        .eq("user_id", str(user_id))
+        .eq("cache_key", cache_key)
+        .gt("expires_at", now_iso)
+        .limit(1)
+        .execute()
+    )
+    if not row.data:
+        return None
+    return row.data[0]
+
+
+async def save_cached_report_artifact(
+    *,
+    user_id: str,
+    cache_key: str,
+    artifact_json: dict,
+    expires_at: datetime,
+) -> dict:
+    """Create or replace the cached report artifact for a set of report inputs."""
+    client = _client()
+    row = (
+        client.table("report_artifact_cache")
+        .upsert(
+            {
+                "user_id": str(user_id),
+                "cache_key": cache_key,
+                "artifact_json": artifact_json,
+                "expires_at": expires_at.astimezone(timezone.utc).isoformat(),
+            },
+            on_conflict="user_id,cache_key",
+        )
+        .execute()
+    )
+    return row.data[0]
+
+
 async def delete_expired_report_artifacts() -> int:
     """Delete expired report artifacts and return number deleted."""
     client = _client()
@@ -508,6 +624,22 @@ async def delete_expired_project_indexes() -> int:
     return count
 
 
+async def delete_expired_report_artifact_cache() -> int:
+    """Delete expired cached report artifacts and return number deleted."""
+    client = _client()
+    now_iso = datetime.now(timezone.utc).isoformat()
+    expired = (
+        client.table("report_artifact_cache")
+        .select("id")
+        .lte("expires_at", now_iso)
+        .execute()
+    )
+    count = len(expired.data or [])
+    if count:
+        client.table("report_artifact_cache").delete().lte("expires_at", now_iso).execute()
+    return count
+
+
 # ------------------------------------------------------------------ #
 # Findings (raw scanner output → action_items table)
 # ------------------------------------------------------------------ #
@@ -38,6 +38,10 @@ if "agents.orchestrator" not in sys.modules:
 
 from api.routes import audit  # noqa: E402
 from tier1.contracts import Tier1QuotaStatus  # noqa: E402
+from tier1.size_estimate import RepoSizeEstimate  # noqa: E402
+
+BASE_SHA = "a" * 40
+HEAD_SHA = "b" * 40
 
 
 class AuditRouteTests(unittest.TestCase):
@@ -54,6 +58,14 @@ class AuditRouteTests(unittest.TestCase):
         app.include_router(audit.router, prefix="/api")
         cls.client = TestClient(app)
 
+    def setUp(self) -> None:
+        # Preflight indexes are shared process-wide; keep tests independent.
+        audit.index_service.clear()
+        # Size estimates call GitHub; tests opt in with a patched estimator.
+        estimate_patch = patch.object(audit.settings, "tier1_size_estimate_enabled", False)
+        estimate_patch.start()
+        self.addCleanup(estimate_patch.stop)
+
     @staticmethod
     def _payload() -> dict:
         return {
@@ -115,11 +127,49 @@ class AuditRouteTests(unittest.TestCase):
         ), patch(
             "api.routes.audit.DeterministicIndexer.build_or_reuse",
             new=AsyncMock(return_value={"loc_total": 60001, "file_count": 12}),
-        ):
+        ) as build:
             resp = self.client.post("/api/audit", json=self._payload())
 
         self.assertEqual(resp.status_code, 403)
         self.assertEqual(resp.json()["detail"]["code"], "limit_loc_exceeded")
+        # The preflight index stops as soon as the cap is passed.
+        self.assertEqual(build.await_args.kwargs["loc_budget"], audit.settings.tier1_loc_cap)
+
+    def test_size_estimate_rejects_oversized_repo_before_indexing(self) -> None:
+        repo_info = SimpleNamespace(
+            full_name="octocat/Hello-World",
+            default_branch="master",
+            clone_url="https://github.com/octocat/Hello-World.git",
+        )
+        estimate = RepoSizeEstimate(source="github_tree", file_count=9000, text_bytes=12_000_000, loc_estimate=300_000)
+
+        with patch.object(audit.settings, "tier1_enabled", True), patch.object(
+            audit.settings, "tier1_size_estimate_enabled", True
+        ), patch("api.routes.audit._maybe_cleanup_tier1", new=AsyncMock()), patch(
+            "api.routes.audit.db.get_github_access_token", new=AsyncMock(return_value=None)
+        ), patch("api.routes.audit.db.is_onboarding_complete", new=AsyncMock(return_value=True)), patch(
+            "api.routes.audit.db.get_project_by_repo_url", new=AsyncMock(return_value=None)
+        ), patch(
+            "api.routes.audit.db.get_active_project_count", new=AsyncMock(return_value=0)
+        ), patch(
+            "api.routes.audit.db.get_or_create_free_usage_month",
+            new=AsyncMock(return_value={"reports_generated": 0}),
+        ), patch(
+            "api.routes.audit.parse_repo_url", new=AsyncMock(return_value=("octocat", "Hello-World"))
+        ), patch("api.routes.audit.get_repo_info", new=AsyncMock(return_value=repo_info)), patch(
+            "api.routes.audit.get_head_sha", new=AsyncMock(return_value="abc123")
+        ), patch(
+            "api.routes.audit.estimate_repo_size", new=AsyncMock(return_value=estimate)
+        ), patch(
+            "api.routes.audit.DeterministicIndexer.build_or_reuse", new=AsyncMock()
+        ) as build_mock:
+            resp = self.client.post("/api/audit", json=self._payload())
+
+        self.assertEqual(resp.status_code, 403)
+        detail = resp.json()["detail"]
+        self.assertEqual(detail["code"], "limit_loc_exceeded")
+        self.assertEqual(detail["loc_estimate"], 300_000)
+        build_mock.assert_not_called()
 
     def test_reports_cap_blocks_when_monthly_quota_used(self) -> None:
         with patch.object(audit.settings, "tier1_enabled", True), patch(
@@ -209,6 +259,37 @@ class AuditRouteTests(unittest.TestCase):
         self.assertEqual(body["mime_type"], "application/pdf")
         mock_get.assert_awaited_once_with(scan_id, "user_test", "pdf")
 
+    def test_finding_diff_missing_index_returns_404(self) -> None:
+        project_id = uuid4()
+        with patch("api.routes.audit.db.get_project_index", new=AsyncMock(return_value=None)), patch(
+            "api.routes.audit.db.get_latest_project_index", new=AsyncMock(return_value=None)
+        ), patch("api.routes.audit.db.get_latest_project_intake", new=AsyncMock(return_value=None)):
+            resp = self.client.get(f"/api/finding-diff/{project_id}?base_sha={BASE_SHA}")
+
+        self.assertEqual(resp.status_code, 404)
+        self.assertEqual(resp.json()["detail"]["code"], "project_index_missing")
+
+    def test_finding_diff_returns_changes(self) -> None:
+        project_id = uuid4()
+        diff = {"base_sha": BASE_SHA, "head_sha": HEAD_SHA, "summary": {"new": 1, "resolved": 0, "unchanged": 2}}
+        mock_diff = AsyncMock(return_value=diff)
+        with patch.object(audit.finding_diffs, "diff", new=mock_diff):
+            resp = self.client.get(f"/api/finding-diff/{project_id}?base_sha={BASE_SHA}&head_sha={HEAD_SHA}")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["summary"]["new"], 1)
+        mock_diff.assert_awaited_once_with(
+            project_id=project_id, user_id="user_test", base_sha=BASE_SHA, head_sha=HEAD_SHA
+        )
+
+    def test_finding_diff_rejects_abbreviated_sha(self) -> None:
+        mock_diff = AsyncMock()
+        with patch.object(audit.finding_diffs, "diff", new=mock_diff):
+            resp = self.client.get(f"/api/finding-diff/{uuid4()}?base_sha={BASE_SHA[:7]}")
+
+        self.assertEqual(resp.status_code, 422)
+        mock_diff.assert_not_awaited()
+
     def test_report_artifact_invalid_type_returns_400(self) -> None:
         scan_id = uuid4()
         resp = self.client.get(f"/api/report-artifacts/{scan_id}?artifact_type=zip")
@@ -241,6 +322,8 @@ class AuditRouteTests(unittest.TestCase):
             "api.routes.audit.parse_repo_url", new=AsyncMock(return_value=("octocat", "Hello-World"))
         ), patch("api.routes.audit.get_repo_info", new=AsyncMock(return_value=repo_info)), patch(
             "api.routes.audit.get_head_sha", new=AsyncMock(return_value="abc123")
+        ), patch(
+            "api.routes.audit.DeterministicIndexer.cached_index", new=AsyncMock(return_value=None)
         ), patch(
             "api.routes.audit.DeterministicIndexer.build_or_reuse",
             new=AsyncMock(return_value={"loc_total": 1200, "file_count": 42}),
@@ -254,6 +337,51 @@ class AuditRouteTests(unittest.TestCase):
         self.assertEqual(body["tier"], "free")
         self.assertEqual(body["quota_remaining"], 8)
 
+    def test_cached_index_skips_size_estimate(self) -> None:
+        project_id = uuid4()
+        repo_info = SimpleNamespace(
+            full_name="octocat/Hello-World",
+            default_branch="master",
+            clone_url="https://github.com/octocat/Hello-World.git",
+        )
+        # The estimate guesses over the cap, but the cached index of this commit is under it.
+        estimate = RepoSizeEstimate(source="github_tree", file_count=9000, text_bytes=12_000_000, loc_estimate=300_000)
+        cached = {"repo_sha": "abc123", "loc_total": 1200, "file_count": 42, "index_json": {}, "cache_hit": True}
+
+        with patch.object(audit.settings, "tier1_enabled", True), patch.object(
+            audit.settings, "tier1_size_estimate_enabled", True
+        ), patch("api.routes.audit._maybe_cleanup_tier1", new=AsyncMock()), patch(
+            "api.routes.audit._run_tier1_audit", new=AsyncMock()
+        ), patch(
+            "api.routes.audit.db.get_github_access_token", new=AsyncMock(return_value=None)
+        ), patch("api.routes.audit.db.is_onboarding_complete", new=AsyncMock(return_value=True)), patch(
+            "api.routes.audit.db.get_project_by_repo_url", new=AsyncMock(return_value={"id": str(project_id)})
+        ), patch(
+            "api.routes.audit.db.get_active_project_count", new=AsyncMock(return_value=1)
+        ), patch(
+            "api.routes.audit.db.get_or_create_free_usage_month",
+            new=AsyncMock(return_value={"reports_generated": 0}),
+        ), patch(
+            "api.routes.audit.parse_repo_url", new=AsyncMock(return_value=("octocat", "Hello-World"))
+        ), patch("api.routes.audit.get_repo_info", new=AsyncMock(return_value=repo_info)), patch(
+            "api.routes.audit.get_head_sha", new=AsyncMock(return_value="abc123")
+        ), patch(
+            "api.routes.audit.estimate_repo_size", new=AsyncMock(return_value=estimate)
+        ) as estimate_mock, patch(
+            "api.routes.audit.DeterministicIndexer.cached_index", new=AsyncMock(return_value=cached)
+        ) as cached_index_mock, patch(
+            "api.routes.audit.DeterministicIndexer.build_or_reuse", new=AsyncMock()
+        ) as build_mock, patch(
+            "api.routes.audit.db.create_scan_report", new=AsyncMock(return_value=uuid4())
+        ):
+            resp = self.client.post("/api/audit", json=self._payload())
+
+        self.assertEqual(resp.status_code, 200)
+        estimate_mock.assert_not_awaited()
+        build_mock.assert_not_called()
+        # The preflight only reads counts, so the index body is not fetched.
+        self.assertFalse(cached_index_mock.await_args.kwargs["with_body"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,171 @@
+"""Tests for the on-disk LLM response cache and coalesced chat completions."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+# Ensure config.Settings can initialize during imports in test environments.
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_JWT_SECRET", "test")
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("DAYTONA_API_KEY", "test")
+
+from services import openrouter  # noqa: E402
+from services.llm_cache import LLMResponseCache, completion_cache_key  # noqa: E402
+from services.openrouter import ChatCompletion, chat_completion  # noqa: E402
+
+USAGE = {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120}
+
+
+def _key(content: str, **overrides) -> str:
+    request = {
+        "model": "m",
+        "messages": [{"role": "user", "content": content}],
+        "temperature": 0.2,
+        "max_tokens": 100,
+        **overrides,
+    }
+    return completion_cache_key(**request)
+
+
+class LLMResponseCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_key_normalizes_whitespace_but_tracks_sampling_settings(self) -> None:
+        key = _key("hello\nworld")
+        self.assertEqual(key, _key("  hello  \r\nworld\n"))
+        self.assertNotEqual(key, _key("hello world"))
+        self.assertNotEqual(key, _key("hello\nworld", model="other"))
+        self.assertNotEqual(key, _key("hello\nworld", temperature=0.7))
+        self.assertNotEqual(key, _key("hello\nworld", max_tokens=200))
+
+    def test_entries_expire_after_ttl(self) -> None:
+        cache = LLMResponseCache(self.root, max_bytes=1024 * 1024, ttl_seconds=60)
+        cache.put("a", {"content": "x"})
+        self.assertEqual(cache.get("a"), {"content": "x"})
+
+        stale = time.time() - 120
+        os.utime(self.root / "a.json", (stale, stale))
+        self.assertIsNone(cache.get("a"))
+        self.assertFalse((self.root / "a.json").exists())
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_least_recently_used_entries_are_evicted_beyond_budget(self) -> None:
+        cache = LLMResponseCache(self.root, max_bytes=250, ttl_seconds=60)
+        for index, name in enumerate(["a", "b"]):
+            cache.put(name, {"content": name * 80})
+            past = time.time() - 30 + index
+            os.utime(self.root / f"{name}.json", (past, past))
+        self.assertIsNotNone(cache.get("a"))
+
+        cache.put("c", {"content": "c" * 80})
+
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_zero_budget_disables_cache(self) -> None:
+        cache = LLMResponseCache(self.root, max_bytes=0, ttl_seconds=60)
+        cache.put("a", {"content": "x"})
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(list(self.root.iterdir()), [])
+
+
+class ChatCompletionTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        cache = LLMResponseCache(Path(self._tmp.name), max_bytes=1024 * 1024, ttl_seconds=60)
+        self._patch = patch("services.openrouter.llm_cache", new=cache)
+        self._patch.start()
+
+    def tearDown(self) -> None:
+        self._patch.stop()
+        self._tmp.cleanup()
+
+    async def _complete(self, content: str = "prompt", **kwargs) -> ChatCompletion:
+        return await chat_completion(
+            model="m",
+            messages=[{"role": "user", "content": content}],
+            temperature=0.2,
+            max_tokens=100,
+            **kwargs,
+        )
+
+    async def test_repeat_requests_are_served_from_cache(self) -> None:
+        upstream = AsyncMock(return_value=ChatCompletion(content="answer", usage=USAGE))
+        with patch("services.openrouter._post_chat_completion", new=upstream):
+            first = await self._complete()
+            second = await self._complete()
+            other = await self._complete("another prompt")
+
+        self.assertEqual(upstream.await_count, 2)
+        self.assertFalse(first.cached)
+        self.assertEqual(second, ChatCompletion(content="answer", usage=USAGE, cached=True))
+        self.assertFalse(other.cached)
+
+    async def test_cache_bypass_always_calls_the_model(self) -> None:
+        upstream = AsyncMock(
+            side_effect=[
+                ChatCompletion(content="first", usage=USAGE),
+                ChatCompletion(content="second", usage=USAGE),
+            ]
+        )
+        with patch("services.openrouter._post_chat_completion", new=upstream):
+            await self._complete()
+            bypassed = await self._complete(use_cache=False)
+            reused = await self._complete()
+
+        self.assertEqual(upstream.await_count, 2)
+        self.assertEqual(bypassed, ChatCompletion(content="second", usage=USAGE))
+        # The bypassing call's response is still stored for later callers.
+        self.assertEqual(reused, ChatCompletion(content="second", usage=USAGE, cached=True))
+
+    async def test_concurrent_identical_requests_share_one_call(self) -> None:
+        release = asyncio.Event()
+
+        async def slow_upstream(**_kwargs) -> ChatCompletion:
+            await release.wait()
+            return ChatCompletion(content="answer", usage=USAGE)
+
+        upstream = AsyncMock(side_effect=slow_upstream)
+        with patch("services.openrouter._post_chat_completion", new=upstream):
+            callers = [asyncio.create_task(self._complete()) for _ in range(3)]
+            await asyncio.sleep(0)
+            release.set()
+            results = await asyncio.gather(*callers)
+
+        self.assertEqual(upstream.await_count, 1)
+        self.assertEqual(sorted(result.cached for result in results), [False, True, True])
+        self.assertEqual({result.content for result in results}, {"answer"})
+        self.assertEqual(openrouter._inflight, {})
+
+    async def test_rejected_and_failed_responses_are_not_cached(self) -> None:
+        upstream = AsyncMock(return_value=ChatCompletion(content="not json", usage=USAGE))
+        with patch("services.openrouter._post_chat_completion", new=upstream):
+            await self._complete(cacheable=lambda content: content.startswith("{"))
+            retried = await self._complete(cacheable=lambda content: content.startswith("{"))
+        self.assertFalse(retried.cached)
+        self.assertEqual(upstream.await_count, 2)
+
+        with patch("services.openrouter._post_chat_completion", new=AsyncMock(side_effect=RuntimeError("502"))):
+            with self.assertRaises(RuntimeError):
+                await self._complete("fails")
+        self.assertEqual(openrouter._inflight, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
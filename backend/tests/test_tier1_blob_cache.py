@@ -0,0 +1,129 @@
+"""Tests for the content-addressed Tier 1 blob signal cache."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Ensure config.Settings can initialize during imports in test environments.
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_JWT_SECRET", "test")
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("DAYTONA_API_KEY", "test")
+
+from tier1 import indexer  # noqa: E402
+from tier1.blob_cache import BlobSignalCache, CachedBlob  # noqa: E402
+from tier1.index_records import SignalHit  # noqa: E402
+
+
+def _blob(snippet: str = "x") -> CachedBlob:
+    return CachedBlob(
+        indexable=True,
+        loc=3,
+        sha256="f" * 64,
+        signals={"env_usage": [SignalHit("", 1, snippet, "os.getenv(")]},
+    )
+
+
+class _WorktreeReader:
+    """Reads tracked files from a checked-out working tree, as the indexer's object reader does from the mirror."""
+
+    def __init__(self, repo_dir: Path) -> None:
+        self.repo_dir = repo_dir
+
+    def iter_contents(self, paths: list[str]):
+        for rel_path in paths:
+            abs_path = self.repo_dir / rel_path
+            yield indexer._within_blob_limit(abs_path.read_bytes()) if abs_path.is_file() else None
+
+
+class BlobSignalCacheTests(unittest.TestCase):
+    def test_lru_eviction_respects_byte_budget_and_recency(self) -> None:
+        entry_size = _blob().approx_bytes()
+        cache = BlobSignalCache(max_bytes=entry_size * 2)
+
+        cache.put("a", "k", _blob())
+        cache.put("b", "k", _blob())
+        self.assertIsNotNone(cache.get("a", "k"))  # refresh "a"
+        cache.put("c", "k", _blob())
+
+        self.assertIsNone(cache.get("b", "k"))
+        self.assertIsNotNone(cache.get("a", "k"))
+        self.assertIsNotNone(cache.get("c", "k"))
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 1))
+        self.assertLessEqual(stats["bytes"], stats["max_bytes"])
+
+    def test_extraction_key_separates_entries(self) -> None:
+        cache = BlobSignalCache(max_bytes=1_000_000)
+        cache.put("a", "v1", _blob())
+
+        self.assertIsNone(cache.get("a", "v2"))
+        self.assertIsNotNone(cache.get("a", "v1"))
+
+    def test_oversized_entries_and_disabled_cache_store_nothing(self) -> None:
+        cache = BlobSignalCache(max_bytes=10)
+        cache.put("a", "k", _blob("y" * 100))
+        self.assertEqual(cache.stats()["entries"], 0)
+        self.assertFalse(BlobSignalCache(max_bytes=0).enabled)
+
+
+class IndexerBlobCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.repo_dir = Path(self._tmp.name)
+        self.cache = BlobSignalCache(max_bytes=1_000_000)
+        self._patch = patch.object(indexer, "blob_cache", self.cache)
+        self._patch.start()
+
+    def tearDown(self) -> None:
+        self._patch.stop()
+        self._tmp.cleanup()
+
+    def _write(self, rel_path: str, content: str) -> None:
+        path = self.repo_dir / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+    def test_identical_blobs_are_scanned_once_and_replayed_per_path(self) -> None:
+        shared = "token = os.getenv('TOKEN')\n@app.get('/x')\n"
+        self._write("vendor/a/util.py", shared)
+        self._write("vendor/b/util.py", shared)
+        self._write("docs/util.md", shared)
+        self._write("assets/blob.bin", "\x00binary")
+        files = ["assets/blob.bin", "vendor/a/util.py", "vendor/b/util.py", "docs/util.md"]
+        blob_ids = {
+            "assets/blob.bin": "bin1",
+            "vendor/a/util.py": "same",
+            "vendor/b/util.py": "same",
+            "docs/util.md": "same",
+        }
+
+        reader = _WorktreeReader(self.repo_dir)
+        uncached = indexer._index_tracked_files(reader, files, workers=0)
+        stats = indexer._IndexStats()
+        with patch.object(indexer, "_index_content", wraps=indexer._index_content) as index_content:
+            cached = indexer._index_tracked_files(reader, files, workers=0, blob_ids=blob_ids, stats=stats)
+            again = indexer._index_tracked_files(
+                reader, files, workers=0, blob_ids=blob_ids, stats=indexer._IndexStats()
+            )
+
+        self.assertEqual(cached, uncached)
+        self.assertEqual(again, uncached)
+        # First pass reads the binary and the shared blob once per rule group; the second reads nothing.
+        self.assertEqual(index_content.call_count, 3)
+        self.assertEqual((stats.blob_cache_hits, stats.blob_cache_misses), (1, 3))
+        self.assertEqual(self.cache.stats()["entries"], 3)
+        indexed_files, signals, _ = again
+        self.assertEqual([f["ext"] for f in indexed_files], [".py", ".py", ".md"])
+        # Docs do not run code rules, so the Markdown copy has no env usage.
+        self.assertEqual([row["file_path"] for row in signals["env_usage"]], ["vendor/a/util.py", "vendor/b/util.py"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+"""Tests for commit-to-commit Tier 1 finding diffs over cached indexes."""
+
+from __future__ import annotations
+
+import os
+import unittest
+from uuid import uuid4
+from unittest.mock import AsyncMock, patch
+
+# Ensure config.Settings can initialize during imports in test environments.
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_JWT_SECRET", "test")
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("DAYTONA_API_KEY", "test")
+
+from tier1 import indexer  # noqa: E402
+from tier1.contracts import Tier1Evidence  # noqa: E402
+from tier1.finding_diff import FindingDiffService, IndexMissingError, evidence_key  # noqa: E402
+from tier1.index_codec import encode_index  # noqa: E402
+from tier1.rules import ScanPlan, compile_scan_plan  # noqa: E402
+
+BASE_FILES: dict[str, str] = {
+    "api/service.py": "\n".join(
+        [
+            "import os",
+            "API_KEY = 'sk_live_abc123'",
+            "def items():",
+            "    q = \"SELECT * FROM items WHERE id = \" + item_id",
+            "    return q",
+        ]
+    ),
+    "package.json": "{}\n",
+}
+# The secret moves down two lines, the SQL concatenation is fixed and eval() appears.
+HEAD_FILES: dict[str, str] = {
+    "api/service.py": "\n".join(
+        [
+            "import os",
+            "",
+            "# settings",
+            "API_KEY  =  'sk_live_abc123'",
+            "def items():",
+            "    eval(user_input)",
+            "    return db.query(item_id)",
+        ]
+    ),
+    "package.json": "{}\n",
+}
+
+
+def _index_json(files: dict[str, str], repo_sha: str, plan: ScanPlan | None = None) -> dict:
+    collectors = indexer._plan_collectors(plan) if plan else None
+    results = [indexer._index_content(path, content.encode("utf-8"), collectors) for path, content in files.items()]
+    indexed_files, signals, _loc_total = indexer._merge_file_results(results)
+    index_json = {
+        "repo_sha": repo_sha,
+        "generated_at": f"2026-10-01T00:00:00+00:00/{repo_sha}",
+        "files": indexed_files,
+        "signals": signals,
+        "signal_counts": indexer._signal_totals(indexed_files),
+        "facts": indexer._path_facts(list(files)),
+        "linter_probes": [],
+    }
+    if plan is not None:
+        index_json["scan_plan"] = {"signals": sorted(plan.signals), "git_metadata": plan.git_metadata}
+    return index_json
+
+
+def _row(project_id, repo_sha: str, index_json: dict, user_id: str = "user_1") -> dict:
+    return {
+        "project_id": str(project_id),
+        "user_id": user_id,
+        "repo_sha": repo_sha,
+        "index_json": encode_index(index_json),
+    }
+
+
+class Tier1FindingDiffTests(unittest.IsolatedAsyncioTestCase):
+    async def _diff(
+        self, service: FindingDiffService, rows: dict[str, dict], intake: dict | None = None, **kwargs
+    ) -> dict:
+        async def get_project_index(_project_id, repo_sha):
+            return rows.get(repo_sha)
+
+        with patch("tier1.finding_diff.db.get_project_index", new=AsyncMock(side_effect=get_project_index)), patch(
+            "tier1.finding_diff.db.get_latest_project_index", new=AsyncMock(return_value=rows.get("head"))
+        ), patch("tier1.finding_diff.db.get_latest_project_intake", new=AsyncMock(return_value=intake)):
+            return await service.diff(**kwargs)
+
+    def test_evidence_key_ignores_line_numbers_and_whitespace(self) -> None:
+        moved = evidence_key(Tier1Evidence(file_path="a.py", line_number=2, snippet="API_KEY = 'x'"))
+        self.assertEqual(moved, evidence_key(Tier1Evidence(file_path="a.py", line_number=9, snippet="API_KEY  =  'x'")))
+        self.assertNotEqual(moved, evidence_key(Tier1Evidence(file_path="b.py", line_number=2, snippet="API_KEY = 'x'")))
+
+    async def test_diff_reports_new_resolved_and_line_shifted_findings(self) -> None:
+        project_id = uuid4()
+        rows = {
+            "base": _row(project_id, "base", _index_json(BASE_FILES, "base")),
+            "head": _row(project_id, "head", _index_json(HEAD_FILES, "head")),
+        }
+
+        result = await self._diff(
+            FindingDiffService(), rows, project_id=project_id, user_id="user_1", base_sha="base", head_sha="head"
+        )
+
+        self.assertEqual((result["base_sha"], result["head_sha"]), ("base", "head"))
+        self.assertEqual(len(result["checks"]), 15)
+        self.assertIn("SEC_005", [finding["check_id"] for finding in result["new"]])
+        self.assertIn("SEC_006", [finding["check_id"] for finding in result["resolved"]])
+        secrets = next(entry for entry in result["unchanged"] if entry["check_id"] == "SEC_001")
+        self.assertEqual((secrets["evidence"]["new"], secrets["evidence"]["resolved"]), ([], []))
+        (moved,) = secrets["evidence"]["unchanged"]
+        self.assertEqual((moved["base_line_number"], moved["line_number"]), (2, 4))
+
+        scores = result["scores"]
+        for key, delta in scores["delta"].items():
+            self.assertEqual(delta, scores["head"][key] - scores["base"][key])
+        # Trading SQL concatenation for eval() is a wash on security; nothing else moved.
+        self.assertEqual(scores["delta"]["reliability_score"], 0)
+        self.assertEqual(result["summary"]["new"], len(result["new"]))
+
+    async def test_repeat_diffs_reuse_scans_and_head_defaults_to_latest(self) -> None:
+        project_id = uuid4()
+        rows = {
+            "base": _row(project_id, "base", _index_json(BASE_FILES, "base")),
+            "head": _row(project_id, "head", _index_json(HEAD_FILES, "head")),
+        }
+        service = FindingDiffService()
+
+        first = await self._diff(service, rows, project_id=project_id, user_id="user_1", base_sha="base", head_sha="head")
+        second = await self._diff(service, rows, project_id=project_id, user_id="user_1", base_sha="base")
+
+        self.assertEqual(second["head_sha"], "head")
+        self.assertEqual({k: v for k, v in first.items() if k != "metrics"}, {k: v for k, v in second.items() if k != "metrics"})
+        self.assertEqual(service.stats(), {"entries": 2, "hits": 2, "misses": 2})
+
+    async def test_sensitive_data_from_intake_escalates_like_an_audit_run(self) -> None:
+        project_id = uuid4()
+        rows = {
+            "base": _row(project_id, "base", _index_json(BASE_FILES, "base")),
+            "head": _row(project_id, "head", _index_json(HEAD_FILES, "head")),
+        }
+        service = FindingDiffService()
+        kwargs = {"project_id": project_id, "user_id": "user_1", "base_sha": "base", "head_sha": "head"}
+
+        plain = await self._diff(service, rows, intake={"sensitive_data": ["none"]}, **kwargs)
+        sensitive = await self._diff(service, rows, intake={"sensitive_data": ["payments"]}, **kwargs)
+
+        # Different sensitive data must not be served from the memoized scans.
+        self.assertEqual(service.stats(), {"entries": 4, "hits": 0, "misses": 4})
+        escalated = {entry["check_id"]: entry for entry in sensitive["new"]}["SEC_005"]
+        unescalated = {entry["check_id"]: entry for entry in plain["new"]}["SEC_005"]
+        self.assertEqual((unescalated["severity"], escalated["severity"]), ("high", "critical"))
+        self.assertLess(sensitive["scores"]["head"]["security_score"], plain["scores"]["head"]["security_score"])
+
+    async def test_checks_missing_from_either_index_are_skipped(self) -> None:
+        project_id = uuid4()
+        rows = {
+            "base": _row(project_id, "base", _index_json(BASE_FILES, "base", compile_scan_plan("security"))),
+            "head": _row(project_id, "head", _index_json(HEAD_FILES, "head")),
+        }
+
+        result = await self._diff(
+            FindingDiffService(), rows, project_id=project_id, user_id="user_1", base_sha="base", head_sha="head"
+        )
+
+        self.assertIn("SEC_001", result["checks"])
+        self.assertIn("REL_004", result["skipped_checks"])
+        self.assertFalse(set(result["checks"]) & set(result["skipped_checks"]))
+
+    async def test_missing_or_foreign_index_raises(self) -> None:
+        project_id = uuid4()
+        rows = {"base": _row(project_id, "base", _index_json(BASE_FILES, "base"), user_id="someone_else")}
+
+        with self.assertRaises(IndexMissingError) as ctx:
+            await self._diff(
+                FindingDiffService(), rows, project_id=project_id, user_id="user_1", base_sha="base", head_sha="head"
+            )
+        self.assertEqual(ctx.exception.repo_sha, "base")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""Tests for the Tier 1 index build benchmark and its synthetic repo generator."""
+
+from __future__ import annotations
+
+import copy
+import importlib.util
+import json
+import os
+import sys
+import unittest
+from pathlib import Path
+
+# Ensure config.Settings can initialize during imports in test environments.
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_JWT_SECRET", "test")
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("DAYTONA_API_KEY", "test")
+
+from services import repo_mirror  # noqa: E402
+from tier1 import indexer  # noqa: E402
+
+SCRIPT_PATH = Path(__file__).resolve().parents[1] / "scripts" / "benchmark_tier1_index_build.py"
+spec = importlib.util.spec_from_file_location("index_build_benchmark", SCRIPT_PATH)
+assert spec and spec.loader
+bench = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = bench
+spec.loader.exec_module(bench)
+
+
+class SyntheticRepoGeneratorTests(unittest.TestCase):
+    def test_generated_files_are_deterministic_and_follow_the_mix(self) -> None:
+        repo_spec = bench.SyntheticRepoSpec(
+            files=300, mix=bench.parse_mix("python=3,markdown=1"), signal_ratio=0.2, minified=2, binaries=3
+        )
+        files = bench.synthetic_files(repo_spec)
+
+        self.assertEqual(files, bench.synthetic_files(repo_spec))
+        extensions = [Path(path).suffix for path in files]
+        self.assertEqual(len(files), 305)
+        self.assertGreater(extensions.count(".py"), 2 * extensions.count(".md"))
+        self.assertEqual(sum(path.endswith(".min.js") for path in files), 2)
+        self.assertTrue(all(files[path][8:9] == b"\x00" for path in files if path.endswith(".png")))
+        corpus = b"".join(files.values())
+        for needle in (b"sk_live_", b"@app.get(", b"SELECT * FROM", b"os.getenv("):
+            self.assertIn(needle, corpus)
+
+    def test_unknown_languages_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            bench.parse_mix("python=1,cobol=2")
+
+
+class IndexBuildBenchmarkTests(unittest.TestCase):
+    def test_benchmark_reports_throughput_phases_and_buckets(self) -> None:
+        repo_spec = bench.SyntheticRepoSpec(files=40, mean_lines=30, signal_ratio=0.2, minified=1, binaries=2)
+        index_tracked_files = indexer._index_tracked_files
+        result = bench.run_benchmark(repo_spec, repeats=1)
+
+        json.dumps(result)
+        self.assertEqual(result["repo"]["file_count"], 43)
+        self.assertEqual(result["indexer_version"], indexer.INDEXER_VERSION)
+        cold, warm = result["builds"]["cold"], result["builds"]["warm"]
+        # Binaries are not indexed; every other file is, cold or warm.
+        self.assertEqual(cold["files_indexed"], 41)
+        self.assertEqual((cold["loc_total"], cold["signal_rows"]), (warm["loc_total"], warm["signal_rows"]))
+        self.assertGreater(cold["signal_rows"], 0)
+        self.assertEqual(warm["blob_cache"]["misses"], 0)
+        self.assertGreater(cold["files_per_s"], 0)
+        self.assertLessEqual({"fetch", "classify", "index_files", "git_metadata"}, set(cold["phases"]))
+        self.assertEqual(
+            set(result["buckets"]),
+            {
+                "base",
+                "secret_matches",
+                "private_key_matches",
+                "insecure_cors_matches",
+                "dangerous_exec_matches",
+                "sql_matches",
+                "route_hints",
+                "env_usage",
+                "weak_error_logging",
+                "blocking_sync",
+            },
+        )
+        self.assertTrue(all(seconds > 0 for seconds in result["buckets"].values()))
+        self.assertEqual((result["profile"], result["repeats"]), ("balanced", 1))
+        self.assertEqual(len(result["repo"]["sha"]), 40)
+        self.assertGreater(result["peak_rss_mb"], 0)
+        # The indexer is restored to the process-wide mirror store and unwrapped phases.
+        self.assertIs(indexer.repo_mirrors, repo_mirror.repo_mirrors)
+        self.assertIs(indexer._index_tracked_files, index_tracked_files)
+
+    def test_comparison_flags_only_regressions_beyond_the_threshold(self) -> None:
+        baseline = {
+            "commit": "abc",
+            "spec": {"files": 10},
+            "peak_rss_mb": 100.0,
+            "builds": {"cold": {"files_per_s": 1000.0, "mb_per_s": 10.0, "phases": {"index_files": 1.0}}},
+            "buckets": {"sql_matches": 0.5},
+        }
+        current = copy.deepcopy(baseline)
+        current["builds"]["cold"]["files_per_s"] = 950.0
+        current["builds"]["cold"]["phases"]["index_files"] = 1.5
+        current["buckets"]["sql_matches"] = 0.25
+
+        comparison = bench.compare_results(current, baseline, max_regression=0.1)
+
+        self.assertEqual(comparison["regressions"], ["builds.cold.phases.index_files"])
+        self.assertEqual(comparison["metrics"]["buckets.sql_matches"]["change"], 0.5)
+        self.assertEqual(comparison["metrics"]["builds.cold.files_per_s"]["change"], -0.05)
+        self.assertTrue(comparison["same_workload"])
+
+
+
+class SignalAndRecordModeTests(unittest.TestCase):
+    def test_signal_mode_reports_what_rule_dispatch_saves(self) -> None:
+        repo_spec = bench.SyntheticRepoSpec(files=30, mean_lines=30, signal_ratio=0.3, minified=1, binaries=2)
+        result = bench.run_signal_benchmark(bench.synthetic_files(repo_spec), repeats=1)
+
+        json.dumps(result)
+        # Binaries are dropped before scanning.
+        self.assertEqual(result["file_count"], 31)
+        dispatch = result["dispatch"]
+        self.assertEqual(
+            dispatch["pattern_evaluations_saved"],
+            dispatch["pattern_evaluations_all_rules"] - dispatch["pattern_evaluations"],
+        )
+        self.assertGreater(dispatch["pattern_evaluations_saved"], 0)
+        self.assertGreaterEqual(dispatch["rows_dropped"], 0)
+
+    def test_record_variants_index_the_same_sources(self) -> None:
+        repo_spec = bench.SyntheticRepoSpec(files=30, mean_lines=30, signal_ratio=0.3)
+        reader = bench.SyntheticReader(repo_spec)
+        self.assertEqual(len(reader.paths), 30)
+        self.assertEqual(
+            list(reader.iter_contents(reader.paths[:3])),
+            [content for path, content in bench.synthetic_files(repo_spec).items() if path in reader.paths[:3]],
+        )
+
+        records = bench.run_record_variant(repo_spec, "records")
+        dicts = bench.run_record_variant(repo_spec, "dicts")
+        for key in ("file_count", "signal_rows_in_flight", "loc_total"):
+            self.assertEqual(records[key], dicts[key])
+        self.assertEqual(records["file_count"], 30)
+
+if __name__ == "__main__":
+    unittest.main()
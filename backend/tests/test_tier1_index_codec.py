@@ -0,0 +1,224 @@
+"""Tests for the compact project index storage encoding."""
+
+from __future__ import annotations
+
+import json
+import os
+import unittest
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+# Ensure config.Settings can initialize during imports in test environments.
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_JWT_SECRET", "test")
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("DAYTONA_API_KEY", "test")
+
+from services import supabase_client  # noqa: E402
+from tier1 import index_codec  # noqa: E402
+from tier1.index_codec import LazyIndex, decode_index, encode_index, storage_stats  # noqa: E402
+from tier1.indexer import INDEXER_VERSION, DeterministicIndexer  # noqa: E402
+from tier1.rules import compile_scan_plan  # noqa: E402
+
+
+def _stored_rows(*rows: dict | None) -> AsyncMock:
+    """A project index lookup serving ``rows`` in turn, narrowed like the database to ``index_fields``."""
+    queue = list(rows)
+
+    async def lookup(*_args, index_fields=None):
+        row = queue.pop(0)
+        if row is None or index_fields is None:
+            return row
+        stored = row["index_json"]
+        return {**row, "index_json": {field: stored[field] for field in index_fields if field in stored}}
+
+    return AsyncMock(side_effect=lookup)
+
+
+def _sample_index(file_count: int = 400) -> dict:
+    files = []
+    secret_matches = []
+    route_hints = []
+    for idx in range(file_count):
+        path = f"src/services/module_{idx:04d}/handlers.py"
+        entry = {"path": path, "ext": ".py", "loc": 40 + idx, "sha256": f"{idx:064x}", "path_role": "backend"}
+        if idx % 50 == 0:
+            entry = {**entry, "loc": 0, "file_class": "minified"}
+        files.append(entry)
+        if idx % 3 == 0:
+            secret_matches.append(
+                {"file_path": path, "line_number": idx, "snippet": "API_KEY = 'sk-live-123'", "match": "generic_key"}
+            )
+        if idx % 7 == 0:
+            route_hints.append({"file_path": path, "line_number": 3, "snippet": "@app.get('/x')", "match": "route"})
+    # Rows of one bucket need not share a shape.
+    route_hints.append({"file_path": "src/app.py", "line_number": None, "snippet": "router", "match": "route", "auth": 1})
+    return {
+        "indexer_version": INDEXER_VERSION,
+        "repo_url": "https://github.com/example/repo",
+        "repo_sha": "abc123",
+        "generated_at": "2026-01-01T00:00:00+00:00",
+        "classifier_key": "c1",
+        "scan_plan": {"signals": ["route_hints", "secret_matches", "sql_matches"], "git_metadata": True},
+        "files": files,
+        "signals": {"secret_matches": secret_matches, "route_hints": route_hints, "sql_matches": []},
+        "facts": {"has_ci": True, "git_metadata": {"commit_count_90d": 12}},
+        "linter_probes": [{"tool": "ruff", "exit_code": 0, "issue_count": 0, "stderr": ""}],
+    }
+
+
+class IndexCodecTests(unittest.TestCase):
+    def test_round_trip_is_exact(self) -> None:
+        index_json = _sample_index()
+
+        decoded = dict(decode_index(encode_index(index_json)))
+
+        self.assertEqual(decoded, index_json)
+        self.assertEqual(list(decoded), list(index_json))
+        self.assertEqual(json.dumps(decoded), json.dumps(index_json))
+
+    def test_encoded_index_is_much_smaller(self) -> None:
+        index_json = _sample_index()
+
+        envelope = encode_index(index_json)
+        stats = storage_stats(envelope)
+
+        self.assertEqual(stats["raw_bytes"], len(json.dumps(index_json, separators=(",", ":")).encode()))
+        self.assertLess(len(json.dumps(envelope)), stats["raw_bytes"] // 4)
+        self.assertGreater(stats["reduction"], 0.75)
+
+    def test_header_reads_do_not_inflate_the_body(self) -> None:
+        view = decode_index(encode_index(_sample_index()))
+
+        self.assertIsInstance(view, LazyIndex)
+        self.assertTrue(view)
+        self.assertEqual(view.get("repo_sha"), "abc123")
+        self.assertEqual(view.get("indexer_version"), INDEXER_VERSION)
+        self.assertIsNone(view.get("missing"))
+        self.assertFalse(view.inflated)
+
+        self.assertEqual(len(view["files"]), 400)
+        self.assertTrue(view.inflated)
+
+    def test_plain_rows_pass_through_and_unknown_versions_fail(self) -> None:
+        legacy = {"repo_sha": "abc", "files": []}
+        self.assertIs(decode_index(legacy), legacy)
+        self.assertEqual(decode_index(None), {})
+        self.assertEqual(storage_stats(legacy)["encoding"], "json")
+
+        envelope = {**encode_index(legacy), "encoding_version": index_codec.INDEX_ENCODING_VERSION + 1}
+        with self.assertRaises(ValueError):
+            decode_index(envelope)
+
+
+class IndexStorageIntegrationTests(unittest.IsolatedAsyncioTestCase):
+    async def test_cache_hit_answers_counts_without_inflating(self) -> None:
+        cached_row = {"loc_total": 123, "file_count": 400, "index_json": encode_index(_sample_index())}
+
+        with patch("tier1.indexer.db.get_project_index", new=AsyncMock(return_value=cached_row)), patch.object(
+            index_codec.zlib, "decompress", wraps=index_codec.zlib.decompress
+        ) as decompress:
+            result = await DeterministicIndexer(plan=compile_scan_plan(["SEC_001", "SEC_006"])).build_or_reuse(
+                project_id=uuid4(),
+                user_id="user_1",
+                repo_url="https://github.com/example/repo",
+                clone_url="https://github.com/example/repo.git",
+                repo_sha="abc123",
+                github_token=None,
+            )
+            self.assertEqual((result["loc_total"], result["file_count"]), (123, 400))
+            self.assertGreater(result["metrics"]["index_storage"]["reduction"], 0.75)
+            decompress.assert_not_called()
+
+            self.assertEqual(len(result["index_json"].get("files")), 400)
+            decompress.assert_called_once()
+
+    async def test_header_only_lookups_leave_the_body_unfetched(self) -> None:
+        cached_row = {
+            "repo_sha": "abc123",
+            "loc_total": 123,
+            "file_count": 400,
+            "index_json": encode_index(_sample_index()),
+        }
+        lookup = _stored_rows(cached_row)
+
+        with patch("tier1.indexer.db.get_project_index", new=lookup):
+            result = await DeterministicIndexer(plan=compile_scan_plan(["SEC_001", "SEC_006"])).cached_index(
+                uuid4(), "abc123", with_body=False
+            )
+
+        self.assertEqual(lookup.await_count, 1)
+        self.assertEqual(lookup.await_args.kwargs["index_fields"], index_codec.ENVELOPE_HEADER_FIELDS)
+        self.assertEqual((result["loc_total"], result["file_count"]), (123, 400))
+        self.assertEqual(result["index_json"]["repo_sha"], "abc123")
+        self.assertNotIn("files", result["index_json"])
+        self.assertGreater(result["metrics"]["index_storage"]["reduction"], 0.75)
+
+        narrow = {**cached_row, "index_json": encode_index({**_sample_index(), "scan_plan": {"signals": []}})}
+        lookup = _stored_rows(narrow)
+        with patch("tier1.indexer.db.get_project_index", new=lookup):
+            self.assertIsNone(await DeterministicIndexer().cached_index(uuid4(), "abc123"))
+        # An index that does not cover the plan is rejected on its header alone.
+        self.assertEqual(lookup.await_count, 1)
+
+    def test_index_field_selects_are_reassembled_into_index_json(self) -> None:
+        select = supabase_client._project_index_select(("encoding", "repo_sha"))
+        self.assertNotIn("*", select)
+        self.assertTrue(
+            select.endswith("index_json_encoding:index_json->encoding,index_json_repo_sha:index_json->repo_sha")
+        )
+
+        row = {"repo_sha": "abc", "index_json_encoding": None, "index_json_repo_sha": "abc"}
+        self.assertEqual(
+            supabase_client._project_index_row(row, ("encoding", "repo_sha")),
+            {"repo_sha": "abc", "index_json": {"repo_sha": "abc"}},
+        )
+        self.assertEqual(supabase_client._project_index_select(None), "*")
+
+    async def test_encoded_rows_serve_as_incremental_bases(self) -> None:
+        index_json = _sample_index()
+        stale = {**index_json, "indexer_version": INDEXER_VERSION - 1}
+        rows = [{"repo_sha": "abc123", "index_json": encode_index(row)} for row in (index_json, stale)]
+        body_lookup = _stored_rows(rows[0])
+
+        with patch("tier1.indexer.db.get_latest_project_index", new=_stored_rows(*rows)), patch(
+            "tier1.indexer.db.get_project_index", new=body_lookup
+        ), patch.object(index_codec.zlib, "decompress", wraps=index_codec.zlib.decompress) as decompress:
+            base = await DeterministicIndexer._incremental_base(uuid4(), "def456")
+            stale_base = await DeterministicIndexer._incremental_base(uuid4(), "def456")
+
+        self.assertEqual(base, index_json)
+        self.assertIsNone(stale_base)
+        decompress.assert_called_once()
+        # The stale row's body is never fetched.
+        self.assertEqual(body_lookup.await_count, 1)
+        self.assertEqual(body_lookup.await_args.args[1], "abc123")
+
+    async def test_fresh_index_is_stored_encoded(self) -> None:
+        index_json = _sample_index()
+        built = {"repo_sha": "abc123", "loc_total": 42, "file_count": 400, "index_json": index_json}
+
+        with patch("tier1.indexer.db.get_project_index", new=AsyncMock(return_value=None)), patch(
+            "tier1.indexer.db.get_latest_project_index", new=AsyncMock(return_value=None)
+        ), patch("tier1.indexer.asyncio.to_thread", new=AsyncMock(return_value=built)), patch(
+            "tier1.indexer.db.upsert_project_index", new=AsyncMock()
+        ) as upsert_mock:
+            result = await DeterministicIndexer().build_or_reuse(
+                project_id=uuid4(),
+                user_id="user_1",
+                repo_url="https://github.com/example/repo",
+                clone_url="https://github.com/example/repo.git",
+                repo_sha="abc123",
+                github_token=None,
+            )
+
+        stored = upsert_mock.call_args.kwargs["index_json"]
+        self.assertEqual(stored["encoding"], index_codec.INDEX_ENCODING)
+        self.assertEqual(dict(decode_index(stored)), index_json)
+        self.assertIs(result["index_json"], index_json)
+        self.assertEqual(result["metrics"]["index_storage"]["encoded_bytes"], stored["encoded_bytes"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+"""Tests for single-flight Tier 1 index sharing."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import unittest
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+# Ensure config.Settings can initialize during imports in test environments.
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_JWT_SECRET", "test")
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("DAYTONA_API_KEY", "test")
+
+from tier1.index_service import SharedIndexService  # noqa: E402
+from tier1.indexer import DeterministicIndexer  # noqa: E402
+from tier1.rules import compile_scan_plan  # noqa: E402
+
+CLONE_URL = "https://github.com/example/repo.git"
+
+
+def _payload(repo_sha: str = "abc") -> dict:
+    return {
+        "repo_sha": repo_sha,
+        "loc_total": 10,
+        "file_count": 2,
+        "index_json": {"repo_sha": repo_sha, "files": []},
+        "cache_hit": False,
+        "metrics": {"cache_hit": False},
+    }
+
+
+class SharedIndexServiceTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.service = SharedIndexService(ttl_seconds=60)
+        self.indexer = DeterministicIndexer()
+
+    def _request(self, repo_sha: str = "abc", project_id=None, user_id=None) -> dict:
+        return {
+            "project_id": project_id,
+            "user_id": user_id,
+            "repo_url": "https://github.com/example/repo",
+            "clone_url": CLONE_URL,
+            "repo_sha": repo_sha,
+            "github_token": None,
+        }
+
+    async def test_concurrent_requests_share_one_build(self) -> None:
+        release = asyncio.Event()
+
+        async def _slow_build(**kwargs):
+            await release.wait()
+            return _payload(kwargs["repo_sha"])
+
+        with patch.object(self.indexer, "build_or_reuse", side_effect=_slow_build) as build:
+            tasks = [asyncio.create_task(self.service.build_or_reuse(self.indexer, **self._request())) for _ in range(4)]
+            await asyncio.sleep(0)
+            self.assertTrue(self.service.is_shared(self.indexer, clone_url=CLONE_URL, repo_sha="abc"))
+            release.set()
+            results = await asyncio.gather(*tasks)
+
+        self.assertTrue(self.service.is_shared(self.indexer, clone_url=CLONE_URL, repo_sha="abc"))
+        self.assertFalse(self.service.is_shared(self.indexer, clone_url=CLONE_URL, repo_sha="def"))
+        build.assert_called_once()
+        self.assertEqual({result["repo_sha"] for result in results}, {"abc"})
+        self.assertEqual(sum(bool(result["metrics"].get("shared_index")) for result in results), 3)
+
+    async def test_preflight_index_is_handed_to_the_run_and_stored_for_its_project(self) -> None:
+        project_id = uuid4()
+
+        with patch.object(self.indexer, "build_or_reuse", new=AsyncMock(return_value=_payload())) as build, patch.object(
+            self.indexer, "store_index", new=AsyncMock(return_value={})
+        ) as store:
+            # New project: the preflight indexes without a project row.
+            await self.service.build_or_reuse(self.indexer, **self._request())
+            run = await self.service.build_or_reuse(
+                self.indexer, **self._request(project_id=project_id, user_id="user_1")
+            )
+            again = await self.service.build_or_reuse(
+                self.indexer, **self._request(project_id=project_id, user_id="user_1")
+            )
+
+        build.assert_called_once()
+        store.assert_awaited_once()
+        self.assertEqual(store.await_args.kwargs["project_id"], project_id)
+        self.assertEqual((run["loc_total"], again["file_count"]), (10, 2))
+        self.assertEqual(self.service.stats()["builds"], 1)
+
+    async def test_failures_reach_waiters_and_are_not_cached(self) -> None:
+        release = asyncio.Event()
+
+        async def _failing_build(**kwargs):
+            await release.wait()
+            raise RuntimeError("clone failed")
+
+        with patch.object(self.indexer, "build_or_reuse", side_effect=_failing_build) as build:
+            tasks = [asyncio.create_task(self.service.build_or_reuse(self.indexer, **self._request())) for _ in range(2)]
+            await asyncio.sleep(0)
+            release.set()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+            self.assertEqual(build.call_count, 1)
+
+            with self.assertRaises(RuntimeError):
+                await self.service.build_or_reuse(self.indexer, **self._request())
+            self.assertEqual(build.call_count, 2)
+
+    async def test_expired_slots_and_other_commits_rebuild(self) -> None:
+        build = AsyncMock(side_effect=lambda **kwargs: _payload(kwargs["repo_sha"]))
+        with patch.object(self.indexer, "build_or_reuse", new=build):
+            await self.service.build_or_reuse(self.indexer, **self._request("abc"))
+            await self.service.build_or_reuse(self.indexer, **self._request("def"))
+            with patch("tier1.index_service.time.monotonic", return_value=10**9):
+                await self.service.build_or_reuse(self.indexer, **self._request("abc"))
+
+        self.assertEqual([call.kwargs["repo_sha"] for call in build.call_args_list], ["abc", "def", "abc"])
+
+    async def test_indexers_with_different_scan_plans_do_not_share(self) -> None:
+        security = DeterministicIndexer(plan=compile_scan_plan("security"))
+        balanced_build = AsyncMock(side_effect=lambda **kwargs: _payload())
+        security_build = AsyncMock(side_effect=lambda **kwargs: _payload())
+        with patch.object(self.indexer, "build_or_reuse", new=balanced_build), patch.object(
+            security, "build_or_reuse", new=security_build
+        ):
+            await self.service.build_or_reuse(self.indexer, **self._request())
+            await self.service.build_or_reuse(security, **self._request())
+            await self.service.build_or_reuse(security, **self._request())
+
+        self.assertNotEqual(security.plan_key, self.indexer.plan_key)
+        self.assertEqual((balanced_build.await_count, security_build.await_count), (1, 1))
+        self.assertEqual(self.service.stats()["shared"], 1)
+
+    async def test_truncated_builds_are_not_shared_across_budgets(self) -> None:
+        release = asyncio.Event()
+
+        async def _budgeted_build(**kwargs):
+            await release.wait()
+            return {**_payload(), "truncated": kwargs["loc_budget"] is not None}
+
+        with patch.object(self.indexer, "build_or_reuse", side_effect=_budgeted_build) as build, patch.object(
+            self.indexer, "store_index", new=AsyncMock()
+        ) as store:
+            budgeted = asyncio.create_task(self.service.build_or_reuse(self.indexer, **self._request(), loc_budget=5))
+            same = asyncio.create_task(self.service.build_or_reuse(self.indexer, **self._request(), loc_budget=5))
+            unbounded = asyncio.create_task(
+                self.service.build_or_reuse(self.indexer, **self._request(project_id=uuid4(), user_id="user_1"))
+            )
+            await asyncio.sleep(0)
+            release.set()
+            results = await asyncio.gather(budgeted, same, unbounded)
+
+        self.assertEqual([call.kwargs["loc_budget"] for call in build.call_args_list], [5, None])
+        self.assertEqual([bool(result["truncated"]) for result in results], [True, True, False])
+        store.assert_not_awaited()
+        # Only the complete index is kept for later callers.
+        self.assertEqual(self.service.stats()["entries"], 1)
+        self.assertFalse((await self.service.build_or_reuse(self.indexer, **self._request()))["truncated"])
+
+
+if __name__ == "__main__":
+    unittest.main()
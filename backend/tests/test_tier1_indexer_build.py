@@ -0,0 +1,662 @@
+"""Tests for Tier 1 index building over a checked-out working tree."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+# Ensure config.Settings can initialize during imports in test environments.
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_JWT_SECRET", "test")
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("DAYTONA_API_KEY", "test")
+
+from services.repo_mirror import RepoMirrorStore  # noqa: E402
+from tier1 import indexer  # noqa: E402
+from tier1.index_progress import IndexProgress  # noqa: E402
+from tier1.index_records import SignalHit  # noqa: E402
+from tier1.rules import compile_scan_plan  # noqa: E402
+
+
+def _fixture_files(count: int) -> dict[str, str]:
+    files: dict[str, str] = {}
+    for idx in range(count):
+        body = [f"# module {idx}", "def handler(request):", "    return request"]
+        if idx % 3 == 0:
+            body.append("token = os.getenv('TOKEN')")
+        if idx % 5 == 0:
+            body.append("@app.get('/items')")
+            body.append("def items(current_user=Depends(require_auth)):")
+        if idx % 7 == 0:
+            body.append("    subprocess.run(['ls'])")
+        files[f"backend/pkg_{idx % 4}/module_{idx:03d}.py"] = "\n".join(body) + "\n"
+    files["README.md"] = "# Demo\n\nNothing to see.\n"
+    files["assets/logo.bin"] = "\x00\x01binary"
+    return files
+
+
+def _git(cwd: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", *args],
+        cwd=str(cwd),
+        check=True,
+        text=True,
+        capture_output=True,
+        env={
+            **os.environ,
+            "GIT_AUTHOR_NAME": "Test",
+            "GIT_AUTHOR_EMAIL": "test@example.com",
+            "GIT_COMMITTER_NAME": "Test",
+            "GIT_COMMITTER_EMAIL": "test@example.com",
+        },
+    )
+    return result.stdout.strip()
+
+
+class _WorktreeReader:
+    """Reads tracked files from a checked-out working tree, as the indexer's object reader does from the mirror."""
+
+    def __init__(self, repo_dir: Path) -> None:
+        self.repo_dir = repo_dir
+
+    def iter_contents(self, paths: list[str]):
+        for rel_path in paths:
+            abs_path = self.repo_dir / rel_path
+            yield indexer._within_blob_limit(abs_path.read_bytes()) if abs_path.is_file() else None
+
+
+class _OriginRepo:
+    """A local git repository served to the indexer over file://."""
+
+    def __init__(self, root: Path) -> None:
+        self.path = root / "origin"
+        self.path.mkdir()
+        _git(self.path, "init", "-q", "-b", "main")
+        _git(self.path, "config", "uploadpack.allowReachableSHA1InWant", "true")
+        _git(self.path, "config", "uploadpack.allowFilter", "true")
+
+    @property
+    def clone_url(self) -> str:
+        return self.path.as_uri()
+
+    def commit(self, files: dict[str, str | None], message: str) -> str:
+        for rel_path, content in files.items():
+            path = self.path / rel_path
+            if content is None:
+                path.unlink()
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content, encoding="utf-8")
+        _git(self.path, "add", "-A")
+        _git(self.path, "commit", "-q", "-m", message)
+        return _git(self.path, "rev-parse", "HEAD")
+
+
+def _comparable(index_json: dict) -> dict:
+    return {k: v for k, v in index_json.items() if k != "generated_at"}
+
+
+class Tier1IndexerBuildTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.repo_dir = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _write(self, files: dict[str, str]) -> list[str]:
+        for rel_path, content in files.items():
+            path = self.repo_dir / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content, encoding="utf-8")
+        return sorted(files)
+
+    def test_parallel_indexing_matches_serial_order_and_content(self) -> None:
+        files = self._write(_fixture_files(60))
+        # A tracked path missing from the working tree is skipped by both modes.
+        files.append("deleted/ghost.py")
+
+        reader = _WorktreeReader(self.repo_dir)
+        serial = indexer._index_tracked_files(reader, files, workers=0)
+        parallel = indexer._index_tracked_files(reader, files, workers=2)
+
+        self.assertEqual(parallel, serial)
+        indexed_files, signals, loc_total = serial
+        expected_paths = [p for p in files if p.endswith((".py", ".md")) and not p.startswith("deleted/")]
+        self.assertEqual([f["path"] for f in indexed_files], expected_paths)
+        self.assertEqual(loc_total, sum(f["loc"] for f in indexed_files))
+        self.assertEqual(len(signals["env_usage"]), 20)
+        self.assertTrue(all(row["has_auth"] for row in signals["route_hints"]))
+
+    def test_worker_count_respects_settings_threshold(self) -> None:
+        original = (indexer.settings.tier1_index_workers, indexer.settings.tier1_index_parallel_min_files)
+        try:
+            indexer.settings.tier1_index_workers = 4
+            indexer.settings.tier1_index_parallel_min_files = 100
+            self.assertEqual(indexer._index_worker_count(99), 0)
+            self.assertEqual(indexer._index_worker_count(100), 4)
+            indexer.settings.tier1_index_workers = 1
+            self.assertEqual(indexer._index_worker_count(10_000), 0)
+        finally:
+            indexer.settings.tier1_index_workers, indexer.settings.tier1_index_parallel_min_files = original
+
+    def test_path_facts_are_derived_from_tracked_paths(self) -> None:
+        facts = indexer._path_facts(
+            [
+                ".github/workflows/ci.yml",
+                "backend/tests/test_app.py",
+                ".env.example",
+                ".env.production",
+                "package.json",
+                "package-lock.json",
+            ]
+        )
+
+        self.assertTrue(facts["has_ci"])
+        self.assertTrue(facts["has_tests"])
+        self.assertTrue(facts["has_env_example"])
+        self.assertEqual(facts["tracked_env_files"], [".env.production"])
+        self.assertEqual(facts["manifests_present"], ["package.json"])
+        self.assertEqual(facts["lockfiles_present"], ["package-lock.json"])
+
+
+class Tier1FileClassifierTests(unittest.TestCase):
+    def test_path_and_size_heuristics(self) -> None:
+        files = [
+            "src/app.py",
+            "node_modules/react/index.js",
+            "third_party/lib.c",
+            "web/dist/app.js",
+            "web/app.js.map",
+            "package-lock.json",
+            "api/service_pb2.py",
+            "web/static/vendor.min.js",
+            "fixtures/big.json",
+            "fixtures/small.json",
+        ]
+        sizes = {"fixtures/big.json": indexer.LARGE_DATA_FILE_BYTES + 1, "fixtures/small.json": 10}
+
+        classes = indexer._classify_files(files, sizes, [])
+
+        self.assertEqual(
+            classes,
+            {
+                "node_modules/react/index.js": "vendored",
+                "third_party/lib.c": "vendored",
+                "web/dist/app.js": "generated",
+                "web/app.js.map": "generated",
+                "package-lock.json": "generated",
+                "api/service_pb2.py": "generated",
+                "web/static/vendor.min.js": "minified",
+                "fixtures/big.json": "large_data",
+            },
+        )
+
+    def test_gitattributes_override_heuristics_with_git_precedence(self) -> None:
+        rules = indexer._gitattribute_rules(
+            [
+                ("web/.gitattributes", b"dist/** !linguist-generated\n"),
+                (
+                    ".gitattributes",
+                    b"# generated clients\n"
+                    b"src/api/**/*.ts linguist-generated=true\n"
+                    b"vendor/** -linguist-vendored\n"
+                    b"*.snap linguist-generated=false\n"
+                    b"web/dist/** linguist-generated=false\n",
+                ),
+            ]
+        )
+        files = [
+            "src/api/v1/client.ts",
+            "src/app.ts",
+            "vendor/patched/lib.py",
+            "ui/__tests__/x.snap",
+            "web/dist/app.js",
+        ]
+
+        classes = indexer._classify_files(files, {}, rules)
+
+        # The nested web/.gitattributes unsets what the root file set, so the
+        # dist/ heuristic applies again.
+        self.assertEqual(classes, {"src/api/v1/client.ts": "generated", "web/dist/app.js": "generated"})
+
+
+class Tier1CheckoutFreeIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.origin = _OriginRepo(self.root)
+        self.mirrors = RepoMirrorStore(root=self.root / "mirrors", max_bytes=1 << 30, blob_limit=4096)
+        self._mirror_patch = patch.object(indexer, "repo_mirrors", self.mirrors)
+        self._mirror_patch.start()
+
+    def tearDown(self) -> None:
+        self._mirror_patch.stop()
+        self._tmp.cleanup()
+
+    def test_object_store_index_matches_checkout_and_skips_oversized_blobs(self) -> None:
+        files = _fixture_files(12)
+        files["dist/bundle.js"] = "token = os.getenv('TOKEN')\n" * 400
+        files["backend/huge_module.py"] = "token = os.getenv('TOKEN')\n" * 400
+        repo_sha = self.origin.commit(files, "initial")
+        (self.origin.path / "linked.py").symlink_to("backend/pkg_0/module_000.py")
+        (self.origin.path / "dangling.py").symlink_to("missing/target.py")
+        repo_sha = self.origin.commit({}, "add symlinks")
+
+        with patch("tier1.indexer.shutil.which", return_value=None):
+            result = indexer.DeterministicIndexer()._build_index_sync(
+                self.origin.clone_url, self.origin.clone_url, repo_sha, None, uuid4(), None
+            )
+
+        checkout = self.root / "checkout"
+        _git(self.root, "clone", "-q", str(self.origin.path), str(checkout))
+        tracked = _git(checkout, "ls-files").splitlines()
+        expected = indexer._index_tracked_files(_WorktreeReader(checkout), tracked, workers=0)
+
+        indexed_files, signals, loc_total = expected
+        self.assertEqual(result["index_json"]["files"], indexed_files)
+        self.assertEqual(result["index_json"]["signals"], {**signals, "lint_issues": []})
+        self.assertEqual(result["loc_total"], loc_total)
+        paths = [f["path"] for f in indexed_files]
+        self.assertIn("linked.py", paths)
+        self.assertNotIn("dangling.py", paths)
+        # Oversized blobs are never fetched into the mirror, let alone indexed.
+        self.assertNotIn("dist/bundle.js", paths)
+        self.assertNotIn("backend/huge_module.py", paths)
+        bundle_id = _git(self.origin.path, "rev-parse", f"{repo_sha}:dist/bundle.js")
+        self.assertIn(bundle_id, self.mirrors.missing_objects(self.origin.clone_url, repo_sha))
+        # The index lists the ones it would otherwise have scanned; generated files are skipped anyway.
+        self.assertEqual(result["index_json"]["facts"]["oversized_files"], ["backend/huge_module.py"])
+        # No working tree was checked out.
+        self.assertFalse((self.mirrors.mirror_path(self.origin.clone_url) / "worktrees").exists())
+
+    def test_progress_reports_each_phase_and_throttles_file_counts(self) -> None:
+        repo_sha = self.origin.commit(_fixture_files(40), "initial")
+        indexer.blob_cache.clear()
+        snapshots: list[dict] = []
+        progress = IndexProgress(snapshots.append, interval=3600)
+
+        with patch.object(indexer, "_linter_probes_for_commit", return_value=([], [])):
+            result = indexer.DeterministicIndexer()._build_index_sync(
+                self.origin.clone_url, self.origin.clone_url, repo_sha, None, uuid4(), None, progress=progress
+            )
+
+        phases = [snapshot["phase"] for snapshot in snapshots]
+        self.assertEqual(list(dict.fromkeys(phases)), ["clone", "checkout", "index", "linters", "git-history"])
+        # The long interval leaves only the phase change and the end-of-index flush.
+        self.assertEqual(phases.count("index"), 2)
+        done = [snapshot for snapshot in snapshots if snapshot["phase"] == "index"][-1]
+        self.assertEqual(done["files_done"], done["files_total"])
+        self.assertEqual(done["files_total"], result["file_count"] + 1)  # the binary is read, not indexed
+        self.assertGreater(done["bytes_read"], 0)
+
+        # Replayed from the blob cache, every file is still counted, with nothing read.
+        snapshots.clear()
+        with patch.object(indexer, "_linter_probes_for_commit", return_value=([], [])):
+            indexer.DeterministicIndexer()._build_index_sync(
+                self.origin.clone_url,
+                self.origin.clone_url,
+                repo_sha,
+                None,
+                uuid4(),
+                None,
+                progress=IndexProgress(snapshots.append, interval=0),
+            )
+        indexed = [snapshot for snapshot in snapshots if snapshot["phase"] == "index"]
+        self.assertEqual([s["files_done"] for s in indexed[1:-1]], list(range(1, done["files_total"] + 1)))
+        self.assertEqual(indexed[-1]["bytes_read"], 0)
+
+    def test_classified_files_are_skipped_or_sampled_and_counted(self) -> None:
+        self.mirrors.blob_limit = None
+        files = _fixture_files(3)
+        files.update(
+            {
+                ".gitattributes": "gen/** linguist-generated\n",
+                "gen/client.py": "API_KEY = 'sk_live_generated'\n",
+                "vendor/lib/util.py": "API_KEY = 'sk_live_vendored'\n",
+                "static/app.min.js": "const k='sk_live_minified';" + "x" * indexer.SAMPLED_FILE_BYTES + "\nghp_" + "a" * 30,
+                "fixtures/dump.json": '{"a": 1}\n' * (indexer.LARGE_DATA_FILE_BYTES // 9 + 1),
+            }
+        )
+        repo_sha = self.origin.commit(files, "initial")
+        read_paths: list[str] = []
+        real_iter_contents = indexer._ObjectReader.iter_contents
+
+        def _recording_iter_contents(reader, paths):
+            read_paths.extend(paths)
+            return real_iter_contents(reader, paths)
+
+        with patch("tier1.indexer.shutil.which", return_value=None), patch.object(
+            indexer._ObjectReader, "iter_contents", _recording_iter_contents
+        ):
+            result = indexer.DeterministicIndexer()._build_index_sync(
+                self.origin.clone_url, self.origin.clone_url, repo_sha, None, uuid4(), None
+            )
+
+        index_json = result["index_json"]
+        entries = {entry["path"]: entry for entry in index_json["files"]}
+        self.assertNotIn("gen/client.py", read_paths)
+        self.assertNotIn("vendor/lib/util.py", read_paths)
+        self.assertNotIn("gen/client.py", entries)
+        self.assertEqual(entries["static/app.min.js"]["file_class"], "minified")
+        self.assertEqual(entries["fixtures/dump.json"]["loc"], 0)
+        self.assertEqual(result["loc_total"], sum(entry["loc"] for entry in entries.values()))
+        # Only the leading sample of a minified file is scanned.
+        secrets = {row["match"] for row in index_json["signals"]["secret_matches"]}
+        self.assertEqual(secrets, {"sk_live"})
+        self.assertEqual(index_json["signals"]["secret_matches"][0]["file_path"], "static/app.min.js")
+        self.assertEqual(
+            index_json["facts"]["file_classes"],
+            {"generated": 1, "vendored": 1, "minified": 1, "large_data": 1, "long_lines": 0, "slow_scan": 0},
+        )
+        self.assertEqual(index_json["facts"]["files_skipped"], 2)
+        self.assertEqual(index_json["facts"]["files_sampled"], 2)
+        self.assertEqual(index_json["facts"]["files_downgraded"], 0)
+
+        # A .gitattributes change reclassifies unchanged files, so the next
+        # build cannot carry the previous index over.
+        head_sha = self.origin.commit({".gitattributes": None}, "drop attributes")
+        with patch("tier1.indexer.shutil.which", return_value=None):
+            rebuilt = indexer.DeterministicIndexer()._build_index_sync(
+                self.origin.clone_url, self.origin.clone_url, head_sha, None, uuid4(), index_json
+            )
+        self.assertEqual(rebuilt["index_mode"], "full")
+        self.assertIn("gen/client.py", [entry["path"] for entry in rebuilt["index_json"]["files"]])
+
+    def test_loc_budget_stops_indexing_early_and_leaves_the_stream_usable(self) -> None:
+        files = _fixture_files(indexer.BUDGET_BATCH_FILES * 3)
+        repo_sha = self.origin.commit(files, "initial")
+        read_paths: list[str] = []
+        real_index_content = indexer._index_content
+
+        def _recording_index_content(rel_path, raw, collectors=None):
+            read_paths.append(rel_path)
+            return real_index_content(rel_path, raw, collectors)
+
+        with patch("tier1.indexer.shutil.which", return_value=None), patch.object(
+            indexer, "_index_content", _recording_index_content
+        ), patch.object(indexer.settings, "tier1_index_workers", 0), patch.object(
+            indexer, "_git_metadata_for_commit"
+        ) as git_metadata:
+            truncated = indexer.DeterministicIndexer()._build_index_sync(
+                self.origin.clone_url, self.origin.clone_url, repo_sha, None, uuid4(), None, loc_budget=100
+            )
+
+        git_metadata.assert_not_called()
+        self.assertTrue(truncated["truncated"])
+        self.assertTrue(truncated["index_json"]["truncated"])
+        self.assertGreater(truncated["loc_total"], 100)
+        # Indexing stopped within the first batch instead of reading the whole repo.
+        self.assertLessEqual(len(read_paths), indexer.BUDGET_BATCH_FILES)
+        self.assertEqual(truncated["index_json"]["linter_probes"], [])
+
+        with patch("tier1.indexer.shutil.which", return_value=None):
+            full = indexer.DeterministicIndexer()._build_index_sync(
+                self.origin.clone_url, self.origin.clone_url, repo_sha, None, uuid4(), None
+            )
+        self.assertFalse(full["truncated"])
+        self.assertNotIn("truncated", full["index_json"])
+        self.assertEqual(full["file_count"], len(files) - 1)
+        # The partial index is a prefix of the full one.
+        self.assertEqual(full["index_json"]["files"][: truncated["file_count"]], truncated["index_json"]["files"])
+
+    def test_git_metadata_comes_from_blobless_history_of_configured_depth(self) -> None:
+        self.origin.commit({"app.py": "a = 1\n", "lib.py": "b = 1\n"}, "one")
+        self.origin.commit({"app.py": "a = 2\n"}, "two")
+        (self.origin.path / "lib.py").write_text("b = 2\n", encoding="utf-8")
+        _git(self.origin.path, "add", "-A")
+        _git(self.origin.path, "commit", "-q", "--author", "Other <other@example.com>", "-m", "three")
+        repo_sha = self.origin.commit({"app.py": "a = 3\n"}, "four")
+
+        def _build(depth: int) -> dict:
+            with patch.object(indexer.settings, "tier1_git_history_depth", depth), patch(
+                "tier1.indexer.shutil.which", return_value=None
+            ):
+                result = indexer.DeterministicIndexer()._build_index_sync(
+                    self.origin.clone_url, self.origin.clone_url, repo_sha, None, uuid4(), None
+                )
+            return result["index_json"]["facts"]["git_metadata"]
+
+        shallow = _build(2)
+        self.assertEqual(shallow["commit_count_90d"], 2)
+
+        metadata = _build(10)
+        self.assertTrue(metadata["history_available"])
+        self.assertEqual(metadata["commit_count_90d"], 4)
+        self.assertEqual(metadata["contributors_90d"], 2)
+        self.assertEqual(metadata["latest_commit_at"], _git(self.origin.path, "log", "-1", "--format=%cI"))
+        self.assertEqual(
+            metadata["top_churn_files_90d"],
+            [{"file_path": "app.py", "touch_count": 3}, {"file_path": "lib.py", "touch_count": 2}],
+        )
+        # Only the indexed commit's blobs were fetched.
+        git_dir = self.mirrors.mirror_path(self.origin.clone_url)
+        missing = _git(git_dir, "rev-list", "--objects", "--missing=print", repo_sha).splitlines()
+        self.assertEqual(len([line for line in missing if line.startswith("?")]), 3)
+
+    def test_git_metadata_of_quiet_repo_still_reports_latest_commit(self) -> None:
+        repo_dir = self.origin.path
+        with patch.dict(os.environ, {"GIT_COMMITTER_DATE": "2001-01-01T00:00:00+00:00"}):
+            self.origin.commit({"app.py": "a = 1\n"}, "old")
+
+        metadata = indexer._collect_git_metadata(repo_dir)
+
+        self.assertEqual(metadata["commit_count_90d"], 0)
+        self.assertEqual(metadata["latest_commit_at"], "2001-01-01T00:00:00+00:00")
+        self.assertTrue(metadata["history_available"])
+
+
+class Tier1IncrementalIndexTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.origin = _OriginRepo(Path(self._tmp.name))
+        self.indexer = indexer.DeterministicIndexer()
+        mirrors = RepoMirrorStore(root=Path(self._tmp.name) / "mirrors", max_bytes=1 << 30)
+        self._mirror_patch = patch.object(indexer, "repo_mirrors", mirrors)
+        self._mirror_patch.start()
+
+    def tearDown(self) -> None:
+        self._mirror_patch.stop()
+        self._tmp.cleanup()
+
+    def _build(self, repo_sha: str, base_index: dict | None = None, progress: IndexProgress | None = None) -> dict:
+        return self.indexer._build_index_sync(
+            self.origin.clone_url,
+            self.origin.clone_url,
+            repo_sha,
+            None,
+            uuid4(),
+            base_index,
+            progress=progress,
+        )
+
+    def test_incremental_build_matches_full_build(self) -> None:
+        files = _fixture_files(30)
+        base_sha = self.origin.commit(files, "initial")
+        base = self._build(base_sha)
+        self.assertEqual(base["index_mode"], "full")
+
+        head_sha = self.origin.commit(
+            {
+                "backend/pkg_0/module_000.py": "API_KEY = 'sk_live_rotated'\n",
+                "backend/pkg_1/module_001.py": None,
+                "backend/pkg_2/new_routes.py": "@router.post('/x')\ndef x():\n    return 1\n",
+            },
+            "change a few files",
+        )
+        progress = IndexProgress(lambda snapshot: None)
+        incremental = self._build(head_sha, base["index_json"], progress=progress)
+        full = self._build(head_sha)
+
+        self.assertEqual(incremental["index_mode"], "incremental")
+        self.assertEqual(incremental["files_rescanned"], 2)
+        self.assertEqual(progress.files_done, progress.files_total)
+        self.assertEqual(_comparable(incremental["index_json"]), _comparable(full["index_json"]))
+        self.assertEqual(incremental["loc_total"], full["loc_total"])
+        self.assertEqual(incremental["file_count"], full["file_count"])
+        paths = [f["path"] for f in incremental["index_json"]["files"]]
+        self.assertNotIn("backend/pkg_1/module_001.py", paths)
+        self.assertIn("backend/pkg_2/new_routes.py", paths)
+
+    def test_narrow_plan_skips_unread_collectors_and_extras(self) -> None:
+        files = _fixture_files(30)
+        files["backend/pkg_0/secrets.py"] = "API_KEY = 'sk_live_abc123'\n"
+        base_sha = self.origin.commit(files, "initial")
+        security = indexer.DeterministicIndexer(plan=compile_scan_plan("security"))
+
+        with patch.object(indexer, "_linter_probes_for_commit") as linters, patch.object(
+            indexer, "_git_metadata_for_commit"
+        ) as git_metadata:
+            narrow = security._build_index_sync(
+                self.origin.clone_url, self.origin.clone_url, base_sha, None, uuid4(), None
+            )
+        linters.assert_not_called()
+        git_metadata.assert_not_called()
+
+        full = self._build(base_sha)
+        index_json = narrow["index_json"]
+        self.assertEqual(index_json["scan_plan"]["signals"], sorted(compile_scan_plan("security").signals))
+        self.assertFalse(index_json["scan_plan"]["git_metadata"])
+        self.assertEqual(
+            [(f["path"], f["loc"]) for f in index_json["files"]],
+            [(f["path"], f["loc"]) for f in full["index_json"]["files"]],
+        )
+        self.assertEqual(index_json["signals"]["secret_matches"], full["index_json"]["signals"]["secret_matches"])
+        self.assertEqual(index_json["signals"]["route_hints"], full["index_json"]["signals"]["route_hints"])
+        self.assertFalse(index_json["signals"]["env_usage"] or index_json["signals"]["blocking_sync"])
+        self.assertTrue(full["index_json"]["signals"]["env_usage"])
+
+        self.assertFalse(indexer.index_covers_plan(index_json, self.indexer.plan))
+        self.assertTrue(indexer.index_covers_plan(full["index_json"], security.plan))
+        # A narrow base is never carried over into a build for a wider plan.
+        head_sha = self.origin.commit({"backend/pkg_0/module_000.py": "x = 1\n"}, "change one file")
+        self.assertEqual(self._build(head_sha, index_json)["index_mode"], "full")
+
+    def test_unknown_base_commit_falls_back_to_full_index(self) -> None:
+        head_sha = self.origin.commit(_fixture_files(5), "initial")
+        base_index = {"repo_sha": "0" * 40, "indexer_version": indexer.INDEXER_VERSION, "files": []}
+
+        result = self._build(head_sha, base_index)
+
+        self.assertEqual(result["index_mode"], "full")
+        self.assertEqual(result["file_count"], 6)
+
+    def test_capped_signal_buckets_keep_exact_counts_and_match_full_builds(self) -> None:
+        files = _fixture_files(40)
+        files["backend/settings.py"] = "".join(f"V{idx} = os.getenv('V{idx}')\n" for idx in range(300))
+        files["backend/routes.py"] = "".join(f"@app.get('/r{idx}')\ndef r{idx}():\n    return 1\n" for idx in range(120))
+        base_sha = self.origin.commit(files, "initial")
+        head_sha = self.origin.commit(
+            {
+                "backend/settings.py": None,
+                "backend/pkg_0/module_000.py": "token = os.getenv('ROTATED')\n",
+            },
+            "drop settings",
+        )
+
+        with patch.object(indexer.settings, "tier1_signal_bucket_cap", 0):
+            uncapped = self._build(head_sha)
+        with patch.object(indexer.settings, "tier1_signal_bucket_cap", 25):
+            base = self._build(base_sha)
+            incremental = self._build(head_sha, base["index_json"])
+            full = self._build(head_sha)
+
+        self.assertEqual(incremental["index_mode"], "incremental")
+        self.assertEqual(_comparable(incremental["index_json"]), _comparable(full["index_json"]))
+        signals = full["index_json"]["signals"]
+        all_rows = uncapped["index_json"]["signals"]
+        counts = full["index_json"]["signal_counts"]
+        # Without the dominant settings file every env row fits again, including
+        # rows of unchanged files that the base index's sample had dropped.
+        self.assertEqual(signals["env_usage"], all_rows["env_usage"])
+        self.assertLess(len(signals["route_hints"]), len(all_rows["route_hints"]))
+        self.assertEqual(counts["env_usage"], len(all_rows["env_usage"]))
+        self.assertEqual(counts["route_hints"], len(all_rows["route_hints"]))
+        self.assertEqual(counts["route_hints.no_auth"], sum(not row["has_auth"] for row in all_rows["route_hints"]))
+        self.assertEqual(full["index_json"]["signal_counts"], uncapped["index_json"]["signal_counts"])
+        entries = {entry["path"]: entry for entry in full["index_json"]["files"]}
+        self.assertEqual(entries["backend/routes.py"]["signal_counts"]["route_hints"], 120)
+        self.assertEqual(len(base["index_json"]["signals"]["env_usage"]), 25)
+        # The sample is the repo-wide bottom-k of every row, kept in index order.
+        reservoir = indexer._SignalReservoir(25)
+        for bucket, rows in all_rows.items():
+            if bucket != "lint_issues":
+                reservoir.extend(bucket, [SignalHit.from_json(row) for row in rows])
+        sample = {bucket: [row.as_json() for row in rows] for bucket, rows in reservoir.signals().items()}
+        self.assertEqual({**sample, "lint_issues": []}, signals)
+        # Route hints are sampled per auth/rate-limit class, so both flags keep evidence.
+        self.assertTrue(any(not row["has_auth"] for row in signals["route_hints"]))
+        self.assertTrue(any(row["has_auth"] for row in signals["route_hints"]))
+
+    async def test_build_or_reuse_passes_latest_compatible_index_as_base(self) -> None:
+        base_index = {"repo_sha": "old", "indexer_version": indexer.INDEXER_VERSION, "files": []}
+        built = {"repo_sha": "new", "loc_total": 1, "file_count": 1, "index_json": {}, "index_mode": "incremental"}
+        # No index for the new commit; the base's body is fetched by its own commit.
+        rows = {"new": None, "old": {"repo_sha": "old", "index_json": base_index}}
+
+        with patch(
+            "tier1.indexer.db.get_project_index",
+            new=AsyncMock(side_effect=lambda _project_id, repo_sha, **_kwargs: rows[repo_sha]),
+        ), patch(
+            "tier1.indexer.db.get_latest_project_index",
+            new=AsyncMock(return_value={"repo_sha": "old", "index_json": base_index}),
+        ), patch("tier1.indexer.asyncio.to_thread", new=AsyncMock(return_value=built)) as to_thread, patch(
+            "tier1.indexer.db.upsert_project_index", new=AsyncMock()
+        ):
+            result = await self.indexer.build_or_reuse(
+                project_id=uuid4(),
+                user_id="user_1",
+                repo_url="https://github.com/example/repo",
+                clone_url="https://github.com/example/repo.git",
+                repo_sha="new",
+                github_token=None,
+            )
+
+        self.assertIs(to_thread.await_args.args[-1], base_index)
+        self.assertEqual(result["metrics"]["index_mode"], "incremental")
+
+    async def test_truncated_builds_are_not_stored_or_used_as_base(self) -> None:
+        built = {"repo_sha": "new", "loc_total": 9, "file_count": 1, "index_json": {}, "truncated": True}
+
+        with patch("tier1.indexer.db.get_project_index", new=AsyncMock(return_value=None)), patch(
+            "tier1.indexer.db.get_latest_project_index", new=AsyncMock(return_value=None)
+        ), patch("tier1.indexer.asyncio.to_thread", new=AsyncMock(return_value=built)) as to_thread, patch(
+            "tier1.indexer.db.upsert_project_index", new=AsyncMock()
+        ) as upsert:
+            result = await self.indexer.build_or_reuse(
+                project_id=uuid4(),
+                user_id="user_1",
+                repo_url="https://github.com/example/repo",
+                clone_url="https://github.com/example/repo.git",
+                repo_sha="new",
+                github_token=None,
+                loc_budget=5,
+            )
+
+        upsert.assert_not_awaited()
+        self.assertEqual(to_thread.await_args.kwargs["loc_budget"], 5)
+        self.assertTrue(result["metrics"]["truncated"])
+
+        row = {
+            "repo_sha": "old",
+            "index_json": {"repo_sha": "old", "indexer_version": indexer.INDEXER_VERSION, "truncated": True},
+        }
+        with patch("tier1.indexer.db.get_latest_project_index", new=AsyncMock(return_value=row)):
+            self.assertIsNone(await self.indexer._incremental_base(uuid4(), "new"))
+
+    async def test_stale_indexer_version_is_not_used_as_base(self) -> None:
+        row = {"repo_sha": "old", "index_json": {"repo_sha": "old", "files": []}}
+        with patch("tier1.indexer.db.get_latest_project_index", new=AsyncMock(return_value=row)):
+            base = await self.indexer._incremental_base(uuid4(), "new")
+
+        self.assertIsNone(base)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+"""Tests for concurrent, structured Tier 1 linter probes."""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Ensure config.Settings can initialize during imports in test environments.
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_JWT_SECRET", "test")
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("DAYTONA_API_KEY", "test")
+
+from tier1 import indexer  # noqa: E402
+
+
+def _python_command(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+class LinterOutputParsingTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.repo_dir = Path("/tmp/clarity-check/tier1/scan/repo")
+
+    def test_each_tool_report_becomes_compact_issue_rows(self) -> None:
+        reports = {
+            "ruff": [
+                {
+                    "code": "F401",
+                    "message": "`os` imported but unused",
+                    "filename": f"{self.repo_dir}/app/main.py",
+                    "location": {"row": 3, "column": 8},
+                }
+            ],
+            "eslint": [
+                {
+                    "filePath": f"{self.repo_dir}/src/index.js",
+                    "messages": [{"ruleId": "no-unused-vars", "severity": 2, "message": "'x' is unused", "line": 7}],
+                }
+            ],
+            "bandit": {
+                "results": [
+                    {
+                        "filename": "./app/db.py",
+                        "line_number": 12,
+                        "test_id": "B608",
+                        "issue_severity": "MEDIUM",
+                        "issue_text": "Possible SQL injection",
+                    }
+                ]
+            },
+            "semgrep": {
+                "results": [
+                    {
+                        "check_id": "python.flask.debug",
+                        "path": "app/server.py",
+                        "start": {"line": 40},
+                        "extra": {"severity": "ERROR", "message": "Debug mode enabled"},
+                    }
+                ]
+            },
+        }
+
+        rows = {
+            tool: indexer._parse_linter_output(tool, json.dumps(report), self.repo_dir)
+            for tool, report in reports.items()
+        }
+
+        self.assertEqual(
+            rows["ruff"],
+            [
+                {
+                    "file_path": "app/main.py",
+                    "line_number": 3,
+                    "tool": "ruff",
+                    "rule": "F401",
+                    "severity": "warning",
+                    "message": "`os` imported but unused",
+                }
+            ],
+        )
+        self.assertEqual((rows["eslint"][0]["file_path"], rows["eslint"][0]["severity"]), ("src/index.js", "error"))
+        self.assertEqual((rows["bandit"][0]["file_path"], rows["bandit"][0]["rule"]), ("app/db.py", "B608"))
+        self.assertEqual(rows["bandit"][0]["severity"], "warning")
+        self.assertEqual((rows["semgrep"][0]["line_number"], rows["semgrep"][0]["severity"]), (40, "error"))
+
+    def test_unparseable_output_yields_no_issues(self) -> None:
+        self.assertEqual(indexer._parse_linter_output("ruff", "Traceback (most recent call last)", self.repo_dir), [])
+        self.assertEqual(indexer._parse_linter_output("bandit", "", self.repo_dir), [])
+
+
+class LinterProbeRunTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.repo_dir = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_probes_run_concurrently_within_the_overall_budget(self) -> None:
+        report = json.dumps([{"code": "E501", "message": "long", "filename": "a.py", "location": {"row": 1}}])
+        pid_file = self.repo_dir / "bandit.pid"
+        commands = {
+            "ruff": _python_command(f"import sys, time; time.sleep(0.6); print({report!r}); sys.exit(1)"),
+            "eslint": _python_command("import time; time.sleep(0.6); print('[]')"),
+            "bandit": _python_command(
+                f"import os, time; open({str(pid_file)!r}, 'w').write(str(os.getpid())); time.sleep(30)"
+            ),
+            "semgrep": _python_command("while True: pass"),
+        }
+
+        with patch.dict(indexer.LINTER_COMMANDS, commands), patch.object(
+            indexer.settings, "tier1_linter_budget_seconds", 3.0
+        ), patch.object(indexer.settings, "tier1_linter_cpu_seconds", 1):
+            started = time.monotonic()
+            probes, issues = indexer._run_linter_probes(self.repo_dir, list(commands))
+            elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 5.0)
+        by_tool = {probe["tool"]: probe for probe in probes}
+        self.assertEqual([probe["tool"] for probe in probes], list(commands))
+        self.assertEqual((by_tool["ruff"]["exit_code"], by_tool["ruff"]["issue_count"]), (1, 1))
+        self.assertNotIn("stdout", by_tool["ruff"])
+        self.assertEqual(by_tool["eslint"]["exit_code"], 0)
+        self.assertTrue(by_tool["bandit"]["timed_out"])
+        # The timed-out probe's child is killed, not left running past the budget.
+        with self.assertRaises(ProcessLookupError):
+            os.kill(int(pid_file.read_text()), 0)
+        # The busy loop is stopped by its CPU limit before the wall-clock budget.
+        self.assertIn("CPU limit", by_tool["semgrep"]["error"])
+        self.assertEqual([(issue["tool"], issue["rule"]) for issue in issues], [("ruff", "E501")])
+
+    def test_only_sigxcpu_counts_as_a_cpu_overrun(self) -> None:
+        commands = {"ruff": _python_command("import os, signal; os.kill(os.getpid(), signal.SIGKILL)")}
+
+        with patch.dict(indexer.LINTER_COMMANDS, commands), patch.object(
+            indexer.settings, "tier1_linter_cpu_seconds", 5
+        ):
+            probes, _issues = indexer._run_linter_probes(self.repo_dir, ["ruff"])
+
+        self.assertNotIn("error", probes[0])
+        self.assertEqual(probes[0]["exit_code"], -signal.SIGKILL)
+
+    def test_tools_without_files_in_their_language_are_skipped(self) -> None:
+        with patch("tier1.indexer.shutil.which", return_value="/usr/bin/tool"), patch.object(
+            indexer.repo_mirrors, "worktree"
+        ) as worktree, patch.object(indexer, "_run_linter_probes", return_value=([], [])) as run:
+            result = indexer._linter_probes_for_commit("url", "sha", None, None, ["README.md", "docs/a.txt"])
+            self.assertEqual(result, ([], []))
+            worktree.assert_not_called()
+
+            indexer._linter_probes_for_commit("url", "sha", None, None, ["web/app.tsx"])
+
+        self.assertEqual(run.call_args.args[1], ["eslint", "semgrep"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,11 +2,23 @@
 
 from __future__ import annotations
 
+import base64
+import os
+import re
 import unittest
 from unittest.mock import AsyncMock, patch
 
-from tier1.contracts import Tier1Evidence, Tier1Finding
-from tier1.reporter import Tier1Reporter
+# Ensure config.Settings can initialize during imports in test environments.
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_JWT_SECRET", "test")
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("DAYTONA_API_KEY", "test")
+
+from services.openrouter import ChatCompletion  # noqa: E402
+from tier1.contracts import Tier1Evidence, Tier1Finding  # noqa: E402
+from tier1.report_cache import ReportArtifactCache, report_cache_key  # noqa: E402
+from tier1.reporter import Tier1Reporter, _PdfLayout  # noqa: E402
 
 
 def _warn_finding() -> Tier1Finding:
@@ -31,6 +43,11 @@ def _warn_finding() -> Tier1Finding:
     )
 
 
+def _page_count(pdf: bytes | str | None) -> int:
+    raw = pdf if isinstance(pdf, bytes) else base64.b64decode(str(pdf))
+    return int(re.findall(rb"/Count (\d+)", raw)[-1])
+
+
 class Tier1ReporterTests(unittest.IsolatedAsyncioTestCase):
     async def test_generate_report_includes_rich_sections_and_cost(self) -> None:
         reporter = Tier1Reporter()
@@ -74,6 +91,7 @@ class Tier1ReporterTests(unittest.IsolatedAsyncioTestCase):
                     "cache_hit": False,
                     "file_count": 42,
                     "loc_total": 7600,
+                    "oversized_files": ["data/model_weights.py"],
                     "index_ms": 2200,
                     "scan_ms": 180,
                     "total_before_report_ms": 2500,
@@ -105,6 +123,7 @@ class Tier1ReporterTests(unittest.IsolatedAsyncioTestCase):
         self.assertIn("![Score profile chart](data:image/png;base64,", markdown)
         self.assertIn("![Findings by severity chart](data:image/png;base64,", markdown)
         self.assertIn("Monthly usage before this run: 1 / 10 reports", markdown)
+        self.assertIn("Not scanned (over the blob size limit): **1** files: `data/model_weights.py`", markdown)
         self.assertIn("Copy the prompt block below into your coding agent as-is.", artifact.agent_markdown)
         self.assertIn("```text", artifact.agent_markdown)
         self.assertIn("Target provider: anthropic", artifact.agent_markdown)
@@ -153,6 +172,178 @@ class Tier1ReporterTests(unittest.IsolatedAsyncioTestCase):
         usage = artifact.summary_json["run_details"]["model_usage"]
         self.assertEqual(usage["total_tokens"], 0)
 
+    async def test_cached_model_usage_is_reported_but_not_billed(self) -> None:
+        reporter = Tier1Reporter()
+        completion = ChatCompletion(
+            content='{"executive_summary": "Missing CI.", "educational_moments": [], "risk_narrative": "Risky."}',
+            usage={"prompt_tokens": 1200, "completion_tokens": 300, "total_tokens": 1500},
+            cached=True,
+        )
+
+        with patch("tier1.reporter.chat_completion", new=AsyncMock(return_value=completion)):
+            artifact = await reporter.generate_report(
+                findings=[_warn_finding()],
+                score_summary={"health_score": 91},
+                intake_context={"product_summary": "Demo product", "target_users": "internal"},
+                run_details={"scan_id": "scan-1", "total_before_report_ms": 10},
+            )
+
+        self.assertFalse(artifact.fallback_used)
+        self.assertIn("LLM usage served from cache (not billed): total_tokens=1500", artifact.markdown)
+        run_details = artifact.summary_json["run_details"]
+        self.assertEqual(run_details["model_usage"]["total_tokens"], 0)
+        self.assertEqual(run_details["cached_model_usage"]["total_tokens"], 1500)
+        self.assertEqual(run_details["cost_breakdown"]["llm_usd"], 0.0)
+
+
+class Tier1ReportCacheTests(unittest.IsolatedAsyncioTestCase):
+    REPORT_INPUTS = {
+        "score_summary": {"health_score": 91, "security_score": 100, "reliability_score": 84, "scalability_score": 90},
+        "intake_context": {"product_summary": "Demo product", "target_users": "Engineering teams"},
+        "user_preferences": {"shipping_posture": "balanced"},
+        "git_metadata": {"history_available": False},
+        "index_facts": {"has_ci": False},
+    }
+
+    async def _generate(self, reporter: Tier1Reporter, cache: ReportArtifactCache, scan_id: str, **overrides):
+        inputs = {**self.REPORT_INPUTS, **overrides}
+        with patch("tier1.reporter.report_cache", new=cache):
+            return await reporter.generate_report(
+                findings=[_warn_finding()],
+                run_details={"scan_id": scan_id, "repo_sha": "abc123", "total_before_report_ms": 40},
+                user_id="user_1",
+                **inputs,
+            )
+
+    async def test_identical_inputs_reuse_cached_artifacts(self) -> None:
+        reporter = Tier1Reporter()
+        cache = ReportArtifactCache()
+        rows: dict[tuple[str, str], dict] = {}
+
+        async def get_row(user_id, cache_key):
+            return rows.get((user_id, cache_key))
+
+        async def save_row(*, user_id, cache_key, artifact_json, expires_at):
+            rows[(user_id, cache_key)] = {"artifact_json": artifact_json, "expires_at": expires_at}
+
+        model = AsyncMock(
+            return_value=(
+                {"executive_summary": "Missing CI.", "educational_moments": [], "risk_narrative": "Risky."},
+                {"prompt_tokens": 1200, "completion_tokens": 300, "total_tokens": 1500},
+            )
+        )
+        with patch.object(reporter, "_generate_assistant_context", new=model), patch(
+            "tier1.report_cache.db.get_cached_report_artifact", new=AsyncMock(side_effect=get_row)
+        ), patch("tier1.report_cache.db.save_cached_report_artifact", new=AsyncMock(side_effect=save_row)):
+            first = await self._generate(reporter, cache, "scan-first")
+            second = await self._generate(reporter, cache, "scan-second")
+
+        self.assertEqual(model.await_count, 1)
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "stores": 1, "errors": 0, "hit_rate": 0.5})
+        self.assertEqual(first.summary_json["run_details"]["report_cache"], "miss")
+
+        run_details = second.summary_json["run_details"]
+        self.assertEqual(run_details["report_cache"], "hit")
+        self.assertEqual(run_details["scan_id"], "scan-second")
+        self.assertEqual(run_details["model_usage"]["total_tokens"], 0)
+        self.assertEqual(run_details["git_metadata"], {"history_available": False})
+        self.assertEqual(second.summary_json["execution_plan"], first.summary_json["execution_plan"])
+        self.assertEqual(second.model_used, first.model_used)
+
+        self.assertIn("- Scan id: `scan-second`", second.markdown)
+        self.assertIn("Report reused from an earlier run", second.markdown)
+        self.assertNotIn("scan-first", second.markdown)
+        self.assertEqual(second.markdown.split("## Run Details")[0], first.markdown.split("## Run Details")[0])
+        self.assertIn("## Personalization Profile", second.markdown)
+        self.assertIn("scan-second", second.agent_markdown)
+        self.assertNotIn("scan-first", second.agent_markdown)
+
+        # The hit redraws only the run details, keeping the layout of a fresh report.
+        self.assertEqual(_page_count(second.pdf_base64), _page_count(first.pdf_base64))
+        (entry,) = (row["artifact_json"] for row in rows.values())
+        self.assertEqual(set(entry["pdf_draft"]), {"pages_pdf_base64", "page_png_base64", "y"})
+
+    def test_cached_pdf_draft_matches_a_fresh_render_page_for_page(self) -> None:
+        reporter = Tier1Reporter()
+        inputs = {
+            "intake_context": {"product_summary": "Demo product", "target_users": "Engineering teams"},
+            "score_summary": self.REPORT_INPUTS["score_summary"],
+            # Long enough to spill onto a second page.
+            "strengths": ["Tests cover the checkout flow end to end. " * 10] * 6,
+            "actionable_findings": [_warn_finding()] * 8,
+            "execution_plan": [],
+            "launch_guidance": {"decision": "ship", "reason": "No blockers."},
+        }
+        run_details = {"scan_id": "scan-2", "repo_sha": "abc123", "report_cache": "hit"}
+
+        fresh = reporter._layout_report_pdf(**inputs)
+        finished_pages = len(fresh.pages)
+        reopened, body = _PdfLayout.from_snapshot(reporter._layout_report_pdf(**inputs).snapshot())
+        fresh_pdf = Tier1Reporter._finish_report_pdf(fresh, run_details)
+        cached_pdf = Tier1Reporter._finish_report_pdf(reopened, run_details, body)
+
+        self.assertGreater(finished_pages, 0)
+        self.assertEqual(_page_count(body), finished_pages)
+        self.assertEqual(
+            [page.tobytes() for page in reopened.close()],
+            [page.tobytes() for page in fresh.close()[finished_pages:]],
+        )
+        # Finished pages are reused as-is; only the rest is encoded, as an incremental update.
+        self.assertTrue(base64.b64decode(cached_pdf).startswith(body))
+        self.assertEqual(_page_count(cached_pdf), _page_count(fresh_pdf))
+
+    async def test_fallback_reports_are_not_cached(self) -> None:
+        reporter = Tier1Reporter()
+        cache = ReportArtifactCache()
+        save = AsyncMock()
+
+        with patch.object(
+            reporter, "_generate_assistant_context", new=AsyncMock(side_effect=RuntimeError("model failed"))
+        ), patch("tier1.report_cache.db.get_cached_report_artifact", new=AsyncMock(return_value=None)), patch(
+            "tier1.report_cache.db.save_cached_report_artifact", new=save
+        ):
+            artifact = await self._generate(reporter, cache, "scan-1")
+
+        self.assertTrue(artifact.fallback_used)
+        save.assert_not_awaited()
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    async def test_cache_lookup_failure_still_generates_report(self) -> None:
+        reporter = Tier1Reporter()
+        cache = ReportArtifactCache()
+
+        with patch.object(
+            reporter, "_generate_assistant_context", new=AsyncMock(side_effect=RuntimeError("model failed"))
+        ), patch(
+            "tier1.report_cache.db.get_cached_report_artifact", new=AsyncMock(side_effect=RuntimeError("db down"))
+        ):
+            artifact = await self._generate(reporter, cache, "scan-1")
+
+        self.assertIn("- Scan id: `scan-1`", artifact.markdown)
+        self.assertEqual(cache.stats()["errors"], 1)
+
+    def test_cache_key_tracks_report_inputs(self) -> None:
+        base = {
+            "findings": [_warn_finding()],
+            "score_summary": {"health_score": 91},
+            "intake_context": {"product_summary": "Demo"},
+            "user_preferences": None,
+            "git_metadata": {},
+            "index_facts": {},
+            "reporter_version": 1,
+            "model": "m",
+        }
+        key = report_cache_key(**base)
+        self.assertEqual(key, report_cache_key(**{**base, "user_preferences": {}}))
+        for change in (
+            {"findings": []},
+            {"score_summary": {"health_score": 90}},
+            {"user_preferences": {"technical_level": "founder"}},
+            {"reporter_version": 2},
+            {"model": "other"},
+        ):
+            self.assertNotEqual(key, report_cache_key(**{**base, **change}), change)
+
 
 if __name__ == "__main__":
     unittest.main()
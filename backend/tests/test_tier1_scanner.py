@@ -95,6 +95,65 @@ class Tier1ScannerTests(unittest.TestCase):
         self.assertEqual(scl.status, "pass")
         self.assertEqual(len(scl.evidence), 0)
 
+    def test_reliability_cites_structured_lint_issues(self) -> None:
+        payload = self._base_payload()
+        payload["index_json"]["linter_probes"] = [
+            {"tool": "ruff", "exit_code": 1, "issue_count": 1, "stderr": ""},
+            {"tool": "eslint", "error": "timed out after 30s", "timed_out": True},
+        ]
+        payload["index_json"]["signals"]["lint_issues"] = [
+            {
+                "file_path": "app/main.py",
+                "line_number": 3,
+                "tool": "ruff",
+                "rule": "F401",
+                "severity": "warning",
+                "message": "`os` imported but unused",
+            }
+        ]
+
+        findings = self.scanner.scan(index_payload=payload, sensitive_data=[])
+        rel = self._check(findings, "REL_005")
+        self.assertEqual(rel.status, "warn")
+        self.assertEqual([(e.file_path, e.line_number) for e in rel.evidence], [("app/main.py", 3)])
+        self.assertIn("ruff F401", rel.evidence[0].snippet)
+
+    def test_count_rules_use_exact_counts_of_sampled_buckets(self) -> None:
+        payload = self._base_payload()
+        sql_row = {"file_path": "db/dump.py", "line_number": 4, "snippet": "q = 'SELECT ' + x", "match": "sql_concat"}
+        payload["index_json"]["signals"]["sql_matches"] = [sql_row]
+        payload["index_json"]["signals"]["route_hints"] = [
+            {"file_path": "api.py", "line_number": 1, "snippet": "@app.get('/')", "has_auth": True, "has_rate_limit": True}
+        ]
+        payload["index_json"]["signal_counts"] = {"sql_matches": 4000, "route_hints": 900, "route_hints.no_auth": 0}
+
+        findings = self.scanner.scan(index_payload=payload, sensitive_data=[])
+
+        self.assertEqual(self._check(findings, "SEC_006").status, "fail")
+        self.assertEqual(self._check(findings, "SEC_007").status, "pass")
+        self.assertEqual(self._check(findings, "SCL_003").status, "pass")
+
+        # Indexes without counts held every row.
+        del payload["index_json"]["signal_counts"]
+        self.assertEqual(self._check(self.scanner.scan(index_payload=payload), "SEC_006").status, "warn")
+
+    def test_each_finding_is_reported_once_final(self) -> None:
+        payload = self._base_payload()
+        payload["index_json"]["signals"]["dangerous_exec_matches"] = [
+            {"file_path": "src/run.py", "line_number": 3, "snippet": "eval(user_input)", "match": "eval"}
+        ]
+        reported = []
+
+        findings = self.scanner.scan(
+            index_payload=payload,
+            sensitive_data=["payments"],
+            on_finding=lambda finding: reported.append((finding.check_id, finding.severity)),
+        )
+
+        # Callbacks arrive in check order and already carry the escalated severity.
+        self.assertEqual(reported, [(f.check_id, f.severity) for f in findings])
+        self.assertEqual(self._check(findings, "SEC_005").severity, "critical")
+
 
 if __name__ == "__main__":
     unittest.main()
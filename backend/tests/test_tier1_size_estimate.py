@@ -0,0 +1,244 @@
+"""Accuracy tests for pre-clone Tier 1 repository size estimates."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import httpx
+
+# Ensure config.Settings can initialize during imports in test environments.
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("SUPABASE_JWT_SECRET", "test")
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("DAYTONA_API_KEY", "test")
+
+from services.repo_mirror import RepoMirrorStore  # noqa: E402
+from tier1 import indexer, size_estimate  # noqa: E402
+from tier1.size_estimate import RepoSizeEstimate, estimate_from_entries, estimate_repo_size  # noqa: E402
+
+# Estimates must land this close to the real loc_total on every fixture.
+MAX_RELATIVE_ERROR = 0.25
+# Known (counted text bytes, indexed loc_total) of each synthetic fixture.
+FIXTURE_TOTALS = {"python": (93_122, 1_993), "web": (142_968, 3_699)}
+
+_PY_LINES = [
+    "from __future__ import annotations",
+    "",
+    "import logging",
+    "",
+    "logger = logging.getLogger(__name__)",
+    "",
+    "",
+    "async def fetch_items(client: ApiClient, *, limit: int = 50) -> list[dict]:",
+    "    \"\"\"Fetch one page of items and drop the archived ones.\"\"\"",
+    "    response = await client.get('/api/items', params={'limit': limit})",
+    "    response.raise_for_status()",
+    "    items = [item for item in response.json() if not item.get('archived')]",
+    "    logger.info('fetched %d items', len(items))",
+    "    return items",
+    "",
+]
+_TS_LINES = [
+    "import { useEffect, useState } from 'react';",
+    "export function useItems(client: ApiClient) {",
+    "  const [items, setItems] = useState<Item[]>([]);",
+    "  useEffect(() => {",
+    "    client.get('/api/items').then((res) => setItems(res.data));",
+    "  }, [client]);",
+    "  if (!items.length) return null;",
+    "  return items.map((item) => ({ ...item, label: item.name.trim() }));",
+    "}",
+    "",
+]
+
+
+def _git(cwd: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", *args],
+        cwd=str(cwd),
+        check=True,
+        text=True,
+        capture_output=True,
+        env={
+            **os.environ,
+            "GIT_AUTHOR_NAME": "Test",
+            "GIT_AUTHOR_EMAIL": "test@example.com",
+            "GIT_COMMITTER_NAME": "Test",
+            "GIT_COMMITTER_EMAIL": "test@example.com",
+        },
+    )
+    return result.stdout
+
+
+def _python_fixture() -> dict[str, bytes]:
+    files: dict[str, bytes] = {}
+    for idx in range(40):
+        lines = _PY_LINES * (2 + idx % 7)
+        files[f"app/services/service_{idx:02d}.py"] = "\n".join(lines).encode()
+    files["README.md"] = b"# Service\n\nRun `make dev` to start the API.\n" * 20
+    files["requirements.txt"] = b"fastapi==0.110.0\nhttpx==0.27.0\npydantic==2.6.4\n"
+    return files
+
+
+def _web_fixture() -> dict[str, bytes]:
+    files: dict[str, bytes] = {}
+    for idx in range(60):
+        lines = _TS_LINES * (3 + idx % 9)
+        ext = ".tsx" if idx % 2 else ".ts"
+        files[f"src/features/feature_{idx:02d}/index{ext}"] = "\n".join(lines).encode()
+    # None of these count toward loc_total.
+    files["package-lock.json"] = b'{"lockfileVersion": 3}\n' * 4000
+    files["public/vendor/jquery.min.js"] = b"!function(e){" + b"var a=1;" * 20000 + b"}\n"
+    files["node_modules/lib/index.js"] = b"module.exports = 1;\n" * 2000
+    files["dist/app.js"] = b"console.log(1);\n" * 2000
+    files["assets/logo.png"] = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 40
+    files["fixtures/dump.json"] = b'{"id": 1, "name": "row"},\n' * 20000
+    return files
+
+
+class _Fixture:
+    def __init__(self, root: Path, name: str, files: dict[str, bytes]) -> None:
+        self.path = root / name
+        self.path.mkdir()
+        _git(self.path, "init", "-q", "-b", "main")
+        _git(self.path, "config", "uploadpack.allowReachableSHA1InWant", "true")
+        _git(self.path, "config", "uploadpack.allowFilter", "true")
+        for rel_path, content in files.items():
+            target = self.path / rel_path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(content)
+        _git(self.path, "add", "-A")
+        _git(self.path, "commit", "-q", "-m", "fixture")
+        self.sha = _git(self.path, "rev-parse", "HEAD").strip()
+
+    @property
+    def clone_url(self) -> str:
+        return self.path.as_uri()
+
+    def github_tree(self) -> dict:
+        """The fixture's tree in the shape GitHub's recursive tree endpoint returns."""
+        tree = []
+        for record in _git(self.path, "ls-tree", "-r", "-l", "-z", self.sha).split("\0"):
+            if not record:
+                continue
+            meta, _, path = record.partition("\t")
+            mode, object_type, object_id, size = meta.split()
+            tree.append({"path": path, "mode": mode, "type": object_type, "sha": object_id, "size": int(size)})
+        return {"sha": self.sha, "tree": tree, "truncated": False}
+
+
+class RepoSizeEstimateAccuracyTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.mirrors = RepoMirrorStore(root=self.root / "mirrors", max_bytes=1 << 30)
+        self._patches = [
+            patch.object(indexer, "repo_mirrors", self.mirrors),
+            patch.object(size_estimate, "repo_mirrors", self.mirrors),
+            patch("tier1.indexer.shutil.which", return_value=None),
+        ]
+        for active in self._patches:
+            active.start()
+
+    def tearDown(self) -> None:
+        for active in self._patches:
+            active.stop()
+        self._tmp.cleanup()
+
+    def _loc_total(self, fixture: _Fixture) -> int:
+        result = indexer.DeterministicIndexer()._build_index_sync(
+            fixture.clone_url, fixture.clone_url, fixture.sha, None, uuid4(), None
+        )
+        return int(result["loc_total"])
+
+    async def _github_estimate(self, fixture: _Fixture) -> RepoSizeEstimate:
+        with patch.object(size_estimate, "get_tree", new=AsyncMock(return_value=fixture.github_tree())):
+            return await estimate_repo_size(
+                owner="o", repo="r", repo_sha=fixture.sha, clone_url=fixture.clone_url, token=None
+            )
+
+    def assertClose(self, estimate: RepoSizeEstimate, loc_total: int) -> None:
+        error = abs(estimate.loc_estimate - loc_total) / loc_total
+        self.assertLessEqual(error, MAX_RELATIVE_ERROR, f"{estimate} vs loc_total={loc_total} (error {error:.1%})")
+
+    async def test_github_tree_estimates_track_real_loc_totals(self) -> None:
+        for name, files in (("python", _python_fixture()), ("web", _web_fixture())):
+            with self.subTest(fixture=name):
+                fixture = _Fixture(self.root, name, files)
+                estimate = await self._github_estimate(fixture)
+                loc_total = self._loc_total(fixture)
+
+                self.assertEqual(estimate.source, "github_tree")
+                self.assertEqual(estimate.unknown_sizes, 0)
+                self.assertEqual((estimate.text_bytes, loc_total), FIXTURE_TOTALS[name])
+                self.assertClose(estimate, loc_total)
+
+    async def test_mirror_fallback_uses_sizes_of_blobs_already_mirrored(self) -> None:
+        fixture = _Fixture(self.root, "python", _python_fixture())
+        offline = httpx.ConnectError("offline")
+
+        with patch.object(size_estimate, "get_tree", new=AsyncMock(side_effect=offline)):
+            # A new repo: only trees are fetched, so sizes are guessed and never rejected.
+            cold = await estimate_repo_size(
+                owner="o", repo="r", repo_sha=fixture.sha, clone_url=fixture.clone_url, token=None
+            )
+            self.assertEqual(cold.source, "mirror_tree")
+            self.assertEqual(cold.unknown_sizes, cold.file_count)
+            self.assertNotEqual(cold.verdict(loc_cap=1, margin=0.5), "over_cap")
+            self.assertTrue(self.mirrors.missing_objects(fixture.clone_url, fixture.sha))
+
+            loc_total = self._loc_total(fixture)
+            warm = await estimate_repo_size(
+                owner="o", repo="r", repo_sha=fixture.sha, clone_url=fixture.clone_url, token=None
+            )
+
+        self.assertEqual(warm.unknown_sizes, 0)
+        self.assertClose(warm, loc_total)
+
+    async def test_truncated_trees_fall_back_to_language_totals(self) -> None:
+        truncated = {"tree": [], "truncated": True}
+        languages = {"Python": 4_000_000, "Go": 300_000}
+        with patch.object(size_estimate, "get_tree", new=AsyncMock(return_value=truncated)), patch.object(
+            size_estimate, "get_languages", new=AsyncMock(return_value=languages)
+        ):
+            estimate = await estimate_repo_size(owner="o", repo="r", repo_sha="abc", clone_url="unused", token=None)
+
+        self.assertEqual(estimate.source, "github_languages")
+        self.assertEqual(estimate.loc_estimate, 110_000)
+
+
+class RepoSizeEstimateVerdictTests(unittest.TestCase):
+    def test_verdict_rejects_only_clear_overruns(self) -> None:
+        def _estimate(loc: int) -> RepoSizeEstimate:
+            return RepoSizeEstimate(source="github_tree", file_count=10, text_bytes=loc * 38, loc_estimate=loc)
+
+        self.assertEqual(_estimate(20_000).verdict(50_000, 0.5), "ok")
+        self.assertEqual(_estimate(40_000).verdict(50_000, 0.5), "borderline")
+        self.assertEqual(_estimate(90_000).verdict(50_000, 0.5), "borderline")
+        self.assertEqual(_estimate(120_000).verdict(50_000, 0.5), "over_cap")
+
+    def test_uncounted_files_are_left_out(self) -> None:
+        estimate = estimate_from_entries(
+            [
+                ("src/app.py", 4000),
+                ("package-lock.json", 900_000),
+                ("vendor/lib.py", 50_000),
+                ("static/app.min.js", 80_000),
+                ("img/logo.png", 20_000),
+                ("data/big.csv", 2_000_000),
+            ],
+            source="github_tree",
+        )
+
+        self.assertEqual((estimate.file_count, estimate.text_bytes, estimate.loc_estimate), (1, 4000, 100))
+
+
+if __name__ == "__main__":
+    unittest.main()
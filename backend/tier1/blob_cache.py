@@ -0,0 +1,104 @@
+"""Content-addressed cache of per-blob Tier 1 extraction results.
+
+Entries are keyed by git blob id plus an extraction key (rule-set version and
+extraction settings), so identical files across repos, forks and commits are
+read and scanned once per process. Stored results are path-independent; the
+indexer re-attaches paths when it replays a hit.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from config import settings
+from tier1.index_records import SignalHit
+
+
+@dataclass(frozen=True)
+class CachedBlob:
+    indexable: bool
+    loc: int = 0
+    sha256: str = ""
+    # Content-detected class (long lines, slow scan); path classes are reapplied on replay.
+    file_class: str | None = None
+    # Signal hits with an empty ``file_path``, keyed by bucket (at most the bucket cap each).
+    signals: dict[str, list[SignalHit]] = field(default_factory=dict)
+    # Exact per-bucket row counts before capping.
+    signal_counts: dict[str, int] = field(default_factory=dict)
+
+    def approx_bytes(self) -> int:
+        size = 160 + len(self.sha256) + 64 * len(self.signal_counts)
+        for rows in self.signals.values():
+            for row in rows:
+                size += 96 + len(row.snippet) + len(row.match or "")
+        return size
+
+
+class BlobSignalCache:
+    """Thread-safe LRU bounded by the approximate size of its entries."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries: OrderedDict[tuple[str, str], CachedBlob] = OrderedDict()
+        self._sizes: dict[tuple[str, str], int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, blob_id: str, extraction_key: str) -> CachedBlob | None:
+        key = (blob_id, extraction_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, blob_id: str, extraction_key: str, entry: CachedBlob) -> None:
+        size = entry.approx_bytes()
+        if size > self.max_bytes:
+            return
+        key = (blob_id, extraction_key)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._sizes[key]
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+blob_cache = BlobSignalCache(max_bytes=settings.tier1_blob_cache_max_mb * 1024 * 1024)
@@ -0,0 +1,225 @@
+"""Commit-to-commit Tier 1 finding diffs over cached project indexes.
+
+Answers "what changed since the last scan" without a new audit run: the
+``project_indexes`` rows of both commits are scanned with
+``DeterministicScanner`` and the findings compared check by check. Evidence is
+matched on file path plus a fingerprint of the whitespace-normalized snippet,
+so a finding whose code only moved lines counts as unchanged. Scan results
+are memoized per index row, so repeat diffs against a commit skip decoding
+and scanning it again.
+
+Both commits are scanned with the sensitive data declared in the project's
+latest intake, so severities and scores match what an audit run reports.
+
+Evidence is compared over each finding's reported sample (at most five rows
+per check), not every signal row in the index.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from uuid import UUID
+
+from config import settings
+from services import supabase_client as db
+from tier1.contracts import Tier1Evidence, Tier1Finding
+from tier1.index_codec import decode_index
+from tier1.indexer import index_covers_plan
+from tier1.orchestrator import score_findings
+from tier1.rules import compile_scan_plan
+from tier1.scanner import DeterministicScanner
+
+# Scanned findings are small; keep enough for a handful of active projects.
+MAX_CACHED_SCANS = 64
+
+SCORE_KEYS = ("health_score", "security_score", "reliability_score", "scalability_score")
+
+
+class IndexMissingError(LookupError):
+    """No active ``project_indexes`` row the caller owns exists for a commit."""
+
+    def __init__(self, repo_sha: str | None) -> None:
+        super().__init__(f"no cached index for commit {repo_sha or '(latest)'}")
+        self.repo_sha = repo_sha
+
+
+def evidence_key(evidence: Tier1Evidence) -> tuple[str, str]:
+    """Line-independent identity of one evidence row: (file path, snippet fingerprint)."""
+    normalized = " ".join(evidence.snippet.split()) or evidence.match
+    return evidence.file_path, hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def diff_findings(base: list[Tier1Finding], head: list[Tier1Finding]) -> dict:
+    """Split findings into new, resolved and unchanged between two scans.
+
+    A check is new when it passes (or did not run) at the base and not at the
+    head, resolved for the reverse, and unchanged when it fails or warns on
+    both sides; unchanged checks carry their own evidence-level diff.
+    """
+    base_by_check = {finding.check_id: finding for finding in base}
+    new: list[dict] = []
+    resolved: list[dict] = []
+    unchanged: list[dict] = []
+
+    for finding in head:
+        prior = base_by_check.pop(finding.check_id, None)
+        was_open = prior is not None and prior.status != "pass"
+        if finding.status == "pass":
+            if was_open:
+                resolved.append(prior.model_dump(mode="json"))
+            continue
+        if not was_open:
+            new.append(finding.model_dump(mode="json"))
+            continue
+        entry = finding.model_dump(mode="json", exclude={"evidence"})
+        entry["base_status"] = prior.status
+        entry["base_severity"] = prior.severity
+        entry["evidence"] = _diff_evidence(prior.evidence, finding.evidence)
+        unchanged.append(entry)
+
+    # Checks the head scan no longer runs are reported as resolved.
+    resolved.extend(prior.model_dump(mode="json") for prior in base_by_check.values() if prior.status != "pass")
+    return {"new": new, "resolved": resolved, "unchanged": unchanged}
+
+
+def _diff_evidence(base: list[Tier1Evidence], head: list[Tier1Evidence]) -> dict:
+    remaining: dict[tuple[str, str], list[Tier1Evidence]] = {}
+    for item in base:
+        remaining.setdefault(evidence_key(item), []).append(item)
+
+    new: list[dict] = []
+    unchanged: list[dict] = []
+    for item in head:
+        matches = remaining.get(evidence_key(item))
+        if not matches:
+            new.append(item.model_dump(mode="json"))
+            continue
+        prior = matches.pop(0)
+        unchanged.append({**item.model_dump(mode="json"), "base_line_number": prior.line_number})
+
+    resolved = [item.model_dump(mode="json") for matches in remaining.values() for item in matches]
+    return {"new": new, "resolved": resolved, "unchanged": unchanged}
+
+
+def _score_delta(base: dict, head: dict) -> dict:
+    return {key: int(head[key]) - int(base[key]) for key in SCORE_KEYS}
+
+
+class FindingDiffService:
+    """Diffs Tier 1 findings between two cached commits of a project."""
+
+    def __init__(self, profile: str = "balanced", max_entries: int = MAX_CACHED_SCANS) -> None:
+        self.plan = compile_scan_plan(profile)
+        self.max_entries = max(1, int(max_entries))
+        self._scans: OrderedDict[tuple, list[Tier1Finding]] = OrderedDict()
+        self.scan_hits = 0
+        self.scan_misses = 0
+
+    async def diff(
+        self,
+        *,
+        project_id: UUID,
+        user_id: str,
+        base_sha: str,
+        head_sha: str | None = None,
+    ) -> dict:
+        """Diff ``base_sha`` against ``head_sha`` (default: the latest cached index).
+
+        Raises ``IndexMissingError`` when either commit has no active index row
+        owned by ``user_id``.
+        """
+        started = time.perf_counter()
+        base_row, head_row, intake = await asyncio.gather(
+            db.get_project_index(project_id, base_sha),
+            db.get_project_index(project_id, head_sha) if head_sha else db.get_latest_project_index(project_id),
+            db.get_latest_project_intake(project_id, user_id),
+        )
+        base_row = _owned_row(base_row, user_id, base_sha)
+        head_row = _owned_row(head_row, user_id, head_sha)
+        sensitive_data = tuple(sorted({str(item) for item in (intake or {}).get("sensitive_data") or ()}))
+        base_index = decode_index(base_row.get("index_json"))
+        head_index = decode_index(head_row.get("index_json"))
+
+        # Only checks both indexes collected inputs for are comparable.
+        check_ids = tuple(
+            check_id
+            for check_id in self.plan.check_ids
+            if all(index_covers_plan(index, compile_scan_plan([check_id])) for index in (base_index, head_index))
+        )
+        base_findings = self._scan(base_row, base_index, check_ids, sensitive_data)
+        head_findings = self._scan(head_row, head_index, check_ids, sensitive_data)
+
+        base_scores = score_findings(base_findings)
+        head_scores = score_findings(head_findings)
+        changes = diff_findings(base_findings, head_findings)
+        return {
+            "project_id": str(project_id),
+            "base_sha": str(base_row.get("repo_sha") or base_sha),
+            "head_sha": str(head_row.get("repo_sha") or head_sha or ""),
+            "checks": list(check_ids),
+            "skipped_checks": [check_id for check_id in self.plan.check_ids if check_id not in check_ids],
+            "summary": {
+                "new": len(changes["new"]),
+                "resolved": len(changes["resolved"]),
+                "unchanged": len(changes["unchanged"]),
+                "new_evidence": sum(len(entry["evidence"]["new"]) for entry in changes["unchanged"]),
+                "resolved_evidence": sum(len(entry["evidence"]["resolved"]) for entry in changes["unchanged"]),
+            },
+            **changes,
+            "scores": {
+                "base": base_scores,
+                "head": head_scores,
+                "delta": _score_delta(base_scores, head_scores),
+            },
+            "metrics": {"elapsed_ms": round((time.perf_counter() - started) * 1000, 2)},
+        }
+
+    def _scan(
+        self,
+        row: dict,
+        index_json,
+        check_ids: tuple[str, ...],
+        sensitive_data: tuple[str, ...],
+    ) -> list[Tier1Finding]:
+        # Rows are upserted per (project, commit); generated_at changes on every rebuild.
+        key = (
+            str(row.get("project_id")),
+            str(row.get("repo_sha")),
+            str(index_json.get("generated_at") or row.get("updated_at") or ""),
+            check_ids,
+            sensitive_data,
+        )
+        cached = self._scans.get(key)
+        if cached is not None:
+            self._scans.move_to_end(key)
+            self.scan_hits += 1
+            return cached
+
+        self.scan_misses += 1
+        findings = DeterministicScanner(profile=check_ids).scan(
+            index_payload={"index_json": index_json},
+            sensitive_data=list(sensitive_data),
+        )
+        self._scans[key] = findings
+        while len(self._scans) > self.max_entries:
+            self._scans.popitem(last=False)
+        return findings
+
+    def clear(self) -> None:
+        self._scans.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._scans), "hits": self.scan_hits, "misses": self.scan_misses}
+
+
+def _owned_row(row: dict | None, user_id: str, repo_sha: str | None) -> dict:
+    # Another user's row is reported as missing rather than forbidden.
+    if not row or str(row.get("user_id")) != str(user_id):
+        raise IndexMissingError(repo_sha)
+    return row
+
+
+finding_diffs = FindingDiffService(profile=settings.tier1_check_profile)
@@ -0,0 +1,197 @@
+"""Compact storage encoding for ``project_indexes.index_json``.
+
+Indexes are stored as a small JSON envelope: the header fields cache lookups
+need, plus a zlib-compressed columnar body. In the body, file entries are
+stored column by column, paths are interned into one table, and signal rows
+are positional tuples keyed by a per-bucket shape. Decoding is lazy: reading a
+header field never inflates the body. Rows written before the encoding existed
+are plain ``index_json`` dicts and are returned unchanged.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import zlib
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+INDEX_ENCODING = "tier1-columnar-zlib"
+# Bump whenever the columnar body layout changes.
+INDEX_ENCODING_VERSION = 1
+# Top-level fields copied into the envelope so they can be read without inflating.
+HEADER_KEYS = (
+    "indexer_version",
+    "repo_url",
+    "repo_sha",
+    "generated_at",
+    "classifier_key",
+    "scan_plan",
+    "truncated",
+)
+# Envelope fields outside the compressed payload: all a cache check or storage stats read.
+ENVELOPE_HEADER_FIELDS = ("encoding", "encoding_version", *HEADER_KEYS, "raw_bytes", "encoded_bytes")
+ZLIB_LEVEL = 6
+
+
+def encode_index(index_json: Mapping[str, Any]) -> dict:
+    """Encode ``index_json`` into its compact storage envelope."""
+    index_json = dict(index_json)
+    raw = _dumps(index_json)
+    body = _dumps(_columnar(index_json))
+    payload = base64.b64encode(zlib.compress(body, ZLIB_LEVEL)).decode("ascii")
+    return {
+        "encoding": INDEX_ENCODING,
+        "encoding_version": INDEX_ENCODING_VERSION,
+        **{key: index_json[key] for key in HEADER_KEYS if key in index_json},
+        "keys": list(index_json),
+        "raw_bytes": len(raw),
+        "encoded_bytes": len(payload),
+        "payload": payload,
+    }
+
+
+def decode_index(stored: Mapping[str, Any] | None) -> Mapping[str, Any]:
+    """Return a read-only view of a stored index; encoded bodies inflate on first use."""
+    if not stored:
+        return {}
+    if stored.get("encoding") != INDEX_ENCODING:
+        return stored
+    if stored.get("encoding_version") != INDEX_ENCODING_VERSION:
+        raise ValueError(f"Unsupported index encoding version: {stored.get('encoding_version')}")
+    return LazyIndex(stored)
+
+
+def storage_stats(stored: Mapping[str, Any]) -> dict:
+    """Return the raw and encoded byte counts recorded in an envelope."""
+    raw_bytes = int(stored.get("raw_bytes") or 0)
+    encoded_bytes = int(stored.get("encoded_bytes") or 0)
+    return {
+        "encoding": stored.get("encoding") or "json",
+        "raw_bytes": raw_bytes,
+        "encoded_bytes": encoded_bytes,
+        "reduction": round(1 - encoded_bytes / raw_bytes, 4) if raw_bytes else 0.0,
+    }
+
+
+class LazyIndex(Mapping):
+    """Mapping over an encoded envelope that inflates the body on first non-header read."""
+
+    def __init__(self, envelope: Mapping[str, Any]) -> None:
+        self._envelope = envelope
+        self._keys = list(envelope.get("keys") or ())
+        self._decoded: dict | None = None
+
+    @property
+    def inflated(self) -> bool:
+        return self._decoded is not None
+
+    def __getitem__(self, key: str) -> Any:
+        if self._decoded is None and key in HEADER_KEYS and key in self._envelope:
+            return self._envelope[key]
+        if key not in self._keys:
+            raise KeyError(key)
+        return self.materialize()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def materialize(self) -> dict:
+        """Inflate and return the full ``index_json`` dict."""
+        if self._decoded is None:
+            body = zlib.decompress(base64.b64decode(self._envelope["payload"]))
+            self._decoded = _from_columnar(json.loads(body))
+        return self._decoded
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class _PathTable:
+    def __init__(self) -> None:
+        self.paths: list[str] = []
+        self._ids: dict[str, int] = {}
+
+    def intern(self, path: str) -> int:
+        idx = self._ids.get(path)
+        if idx is None:
+            idx = self._ids[path] = len(self.paths)
+            self.paths.append(path)
+        return idx
+
+
+def _columnar(index_json: dict) -> dict:
+    table = _PathTable()
+    files = list(index_json.get("files") or [])
+    columns: dict[str, Any] = {}
+    for name in dict.fromkeys(key for entry in files for key in entry):
+        present = [row for row, entry in enumerate(files) if name in entry]
+        values = [files[row][name] for row in present]
+        if name == "path":
+            values = [table.intern(value) if isinstance(value, str) else value for value in values]
+        # Keys every entry carries are dense; the rest record which rows have them.
+        columns[name] = values if len(present) == len(files) else {"rows": present, "values": values}
+
+    signals: dict[str, dict] = {}
+    for bucket, rows in (index_json.get("signals") or {}).items():
+        shapes: dict[tuple[str, ...], int] = {}
+        encoded_rows = []
+        for row in rows:
+            shape = tuple(row)
+            shape_id = shapes.setdefault(shape, len(shapes))
+            values = [
+                table.intern(value) if key == "file_path" and isinstance(value, str) else value
+                for key, value in row.items()
+            ]
+            encoded_rows.append([shape_id, *values])
+        signals[bucket] = {"shapes": [list(shape) for shape in shapes], "rows": encoded_rows}
+
+    rest = {key: value for key, value in index_json.items() if key not in ("files", "signals")}
+    return {
+        "paths": table.paths,
+        "file_count": len(files),
+        "files": columns,
+        "signals": signals,
+        "signals_present": "signals" in index_json,
+        "files_present": "files" in index_json,
+        "rest": rest,
+        "order": list(index_json),
+    }
+
+
+def _from_columnar(body: dict) -> dict:
+    paths = body["paths"]
+    file_count = int(body["file_count"])
+    files: list[dict] = [{} for _ in range(file_count)]
+    for name, column in body["files"].items():
+        if isinstance(column, dict):
+            rows, values = column["rows"], column["values"]
+        else:
+            rows, values = range(file_count), column
+        if name == "path":
+            values = [paths[value] if isinstance(value, int) else value for value in values]
+        for row, value in zip(rows, values):
+            files[row][name] = value
+
+    signals: dict[str, list[dict]] = {}
+    for bucket, encoded in body["signals"].items():
+        shapes = encoded["shapes"]
+        bucket_rows = []
+        for shape_id, *values in encoded["rows"]:
+            row = dict(zip(shapes[shape_id], values))
+            file_path = row.get("file_path")
+            if isinstance(file_path, int):
+                row["file_path"] = paths[file_path]
+            bucket_rows.append(row)
+        signals[bucket] = bucket_rows
+
+    decoded = dict(body["rest"])
+    if body["files_present"]:
+        decoded["files"] = files
+    if body["signals_present"]:
+        decoded["signals"] = signals
+    return {key: decoded[key] for key in body["order"]}
@@ -0,0 +1,70 @@
+"""Throttled progress reporting for Tier 1 index builds.
+
+A build runs in a worker thread and touches every tracked file, so progress
+is counted in plain integers and handed to the callback only when the phase
+changes or at most once per ``interval`` seconds. The callback runs on the
+build thread; callers on an event loop should hop back with
+``loop.call_soon_threadsafe``.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# Build phases, in the order a full build passes through them.
+INDEX_PHASES = ("clone", "checkout", "index", "linters", "git-history")
+
+
+class IndexProgress:
+    """Counts files and bytes indexed and reports throttled snapshots."""
+
+    __slots__ = ("_report", "_interval", "_next_report_at", "phase", "files_done", "files_total", "bytes_read", "reports")
+
+    def __init__(self, report: Callable[[dict], None], *, interval: float = 0.5) -> None:
+        self._report = report
+        self._interval = max(0.0, float(interval))
+        self._next_report_at = 0.0
+        self.phase: str | None = None
+        self.files_done = 0
+        self.files_total = 0
+        self.bytes_read = 0
+        self.reports = 0
+
+    def start(self, phase: str, *, files_total: int | None = None) -> None:
+        """Enter ``phase``; always reported."""
+        if phase not in INDEX_PHASES:
+            raise ValueError(f"Unknown Tier1 index phase {phase!r}")
+        self.phase = phase
+        if files_total is not None:
+            self.files_total = int(files_total)
+        self.flush()
+
+    def advance(self, files: int = 1, bytes_read: int = 0) -> None:
+        """Count finished files; reported once the throttle interval has passed."""
+        self.files_done += files
+        self.bytes_read += bytes_read
+        now = time.monotonic()
+        if now >= self._next_report_at:
+            self.flush(now)
+
+    def flush(self, now: float | None = None) -> None:
+        """Report the current snapshot regardless of the throttle."""
+        self._next_report_at = (time.monotonic() if now is None else now) + self._interval
+        self.reports += 1
+        try:
+            self._report(self.snapshot())
+        except Exception:
+            # Progress is best-effort; it never fails a build.
+            logger.exception("Tier1 index progress callback failed")
+
+    def snapshot(self) -> dict:
+        return {
+            "phase": self.phase,
+            "files_done": min(self.files_done, self.files_total) if self.files_total else self.files_done,
+            "files_total": self.files_total,
+            "bytes_read": self.bytes_read,
+        }
@@ -0,0 +1,104 @@
+"""Compact in-flight records for Tier 1 indexing.
+
+Every indexed file and every signal hit stays in memory until an index is
+merged, and by then a large repo holds hundreds of thousands of them. They are
+kept as slotted records instead of per-row dicts. ``as_json`` produces the
+public ``index_json`` shapes, and ``from_json`` reads stored indexes back.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class FileRecord:
+    path: str
+    ext: str
+    loc: int
+    sha256: str
+    path_role: str
+    # Set for sampled file classes (minified, large data), which count 0 LOC,
+    # and for files downgraded to sampled scanning (long lines, slow scan).
+    file_class: str | None = None
+    # Exact per-bucket signal counts; None for files without signals.
+    signal_counts: dict[str, int] | None = None
+
+    def as_json(self) -> dict:
+        entry = {
+            "path": self.path,
+            "ext": self.ext,
+            "loc": self.loc,
+            "sha256": self.sha256,
+            "path_role": self.path_role,
+        }
+        if self.file_class is not None:
+            entry["file_class"] = self.file_class
+        if self.signal_counts:
+            entry["signal_counts"] = dict(self.signal_counts)
+        return entry
+
+    @classmethod
+    def from_json(cls, entry: Mapping) -> FileRecord:
+        return cls(
+            path=str(entry.get("path")),
+            ext=str(entry.get("ext") or ""),
+            loc=int(entry.get("loc") or 0),
+            sha256=str(entry.get("sha256") or ""),
+            path_role=str(entry.get("path_role") or ""),
+            file_class=entry.get("file_class"),
+            signal_counts=dict(entry["signal_counts"]) if entry.get("signal_counts") else None,
+        )
+
+
+@dataclass(slots=True)
+class SignalHit:
+    file_path: str
+    line_number: int | None
+    snippet: str
+    match: str | None = None
+    # Set on route hints only, which carry these flags instead of a match.
+    has_auth: bool | None = None
+    has_rate_limit: bool | None = None
+
+    @property
+    def is_route_hint(self) -> bool:
+        return self.has_auth is not None
+
+    def as_json(self) -> dict:
+        if self.is_route_hint:
+            return {
+                "file_path": self.file_path,
+                "line_number": self.line_number,
+                "snippet": self.snippet,
+                "has_auth": self.has_auth,
+                "has_rate_limit": self.has_rate_limit,
+            }
+        return {
+            "file_path": self.file_path,
+            "line_number": self.line_number,
+            "snippet": self.snippet,
+            "match": self.match,
+        }
+
+    @classmethod
+    def from_json(cls, row: Mapping) -> SignalHit:
+        if "has_auth" in row:
+            return cls(
+                file_path=str(row.get("file_path")),
+                line_number=row.get("line_number"),
+                snippet=str(row.get("snippet") or ""),
+                has_auth=bool(row.get("has_auth")),
+                has_rate_limit=bool(row.get("has_rate_limit")),
+            )
+        return cls(
+            file_path=str(row.get("file_path")),
+            line_number=row.get("line_number"),
+            snippet=str(row.get("snippet") or ""),
+            match=row.get("match"),
+        )
+
+
+# One indexed file: its record plus its non-empty signal buckets.
+FileResult = tuple[FileRecord, dict[str, list[SignalHit]]]
@@ -0,0 +1,201 @@
+"""Process-wide single-flight sharing of Tier 1 index builds.
+
+The audit preflight and the background Tier 1 run both need the index for
+the same commit. Builds are keyed by ``(clone_url, repo_sha)`` and the
+indexer's scan plan, since a narrower plan collects less. Concurrent
+requests for a key await one build, and the finished payload is held in a
+short-lived in-memory slot so the run that follows a preflight reuses it
+instead of cloning and indexing again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from uuid import UUID
+
+from config import settings
+from tier1.index_progress import IndexProgress
+from tier1.indexer import DeterministicIndexer
+
+logger = logging.getLogger(__name__)
+
+# Index payloads can be large; only the most recent few are held.
+MAX_SHARED_INDEXES = 16
+
+
+@dataclass
+class _IndexSlot:
+    payload: dict
+    expires_at: float
+    # (loc_budget, byte_budget) the payload was built under.
+    budget: tuple[int | None, int | None] = (None, None)
+    # Projects whose project_indexes row already holds this payload.
+    stored_for: set[UUID] = field(default_factory=set)
+
+
+class SharedIndexService:
+    """Collapses concurrent index builds per commit and shares results briefly."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = MAX_SHARED_INDEXES) -> None:
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_entries = max(1, int(max_entries))
+        self._slots: OrderedDict[tuple[str, str, str], _IndexSlot] = OrderedDict()
+        self._inflight: dict[tuple[str, str, str], asyncio.Future[_IndexSlot]] = {}
+        self.builds = 0
+        self.shared = 0
+
+    async def build_or_reuse(
+        self,
+        indexer: DeterministicIndexer,
+        *,
+        project_id: UUID | None,
+        user_id: str | None,
+        repo_url: str,
+        clone_url: str,
+        repo_sha: str,
+        github_token: str | None,
+        scan_id: UUID | None = None,
+        loc_budget: int | None = None,
+        byte_budget: int | None = None,
+        progress: IndexProgress | None = None,
+    ) -> dict:
+        """Return the index for ``(clone_url, repo_sha)``, building it at most once per scan plan.
+
+        A shared payload is persisted for ``project_id`` if it was built for
+        another (or no) project, so the project cache stays populated.
+        Budget-truncated payloads are never held in a slot, and in-flight
+        ones are only shared with callers passing the same budget. Only the
+        caller that starts a build receives its ``progress``.
+        """
+        key = (clone_url, repo_sha, indexer.plan_key)
+        budget = (loc_budget, byte_budget)
+        slot = self._live_slot(key)
+        if slot is None:
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                try:
+                    slot = await asyncio.shield(inflight)
+                except asyncio.CancelledError:
+                    # Only the original caller was cancelled; build here instead.
+                    if not inflight.cancelled():
+                        raise
+                if slot is not None and slot.payload.get("truncated") and slot.budget != budget:
+                    slot = None
+        if slot is None:
+            return await self._build(
+                key,
+                indexer,
+                project_id=project_id,
+                user_id=user_id,
+                repo_url=repo_url,
+                github_token=github_token,
+                scan_id=scan_id,
+                budget=budget,
+                progress=progress,
+            )
+
+        self.shared += 1
+        if (
+            project_id is not None
+            and user_id is not None
+            and project_id not in slot.stored_for
+            and not slot.payload.get("truncated")
+        ):
+            slot.stored_for.add(project_id)
+            try:
+                await indexer.store_index(project_id=project_id, user_id=user_id, result=slot.payload)
+            except Exception:
+                slot.stored_for.discard(project_id)
+                logger.exception("Tier1 shared index could not be stored for project %s", project_id)
+        return _shared_copy(slot.payload)
+
+    async def _build(
+        self,
+        key: tuple[str, str, str],
+        indexer: DeterministicIndexer,
+        *,
+        project_id: UUID | None,
+        user_id: str | None,
+        repo_url: str,
+        github_token: str | None,
+        scan_id: UUID | None,
+        budget: tuple[int | None, int | None],
+        progress: IndexProgress | None = None,
+    ) -> dict:
+        future: asyncio.Future[_IndexSlot] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            payload = await indexer.build_or_reuse(
+                project_id=project_id,
+                user_id=user_id,
+                repo_url=repo_url,
+                clone_url=key[0],
+                repo_sha=key[1],
+                github_token=github_token,
+                scan_id=scan_id,
+                loc_budget=budget[0],
+                byte_budget=budget[1],
+                progress=progress,
+            )
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            # Waiters see the same failure; nothing is cached.
+            future.set_exception(exc)
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        self.builds += 1
+        stored_for = {project_id} if project_id is not None and user_id is not None else set()
+        slot = _IndexSlot(
+            payload=payload,
+            expires_at=time.monotonic() + self.ttl_seconds,
+            budget=budget,
+            stored_for=stored_for,
+        )
+        if self.ttl_seconds > 0 and not payload.get("truncated"):
+            self._slots[key] = slot
+            self._slots.move_to_end(key)
+            while len(self._slots) > self.max_entries:
+                self._slots.popitem(last=False)
+        future.set_result(slot)
+        return payload
+
+    def is_shared(self, indexer: DeterministicIndexer, *, clone_url: str, repo_sha: str) -> bool:
+        """Whether an index for the commit is held or already being built for this indexer's plan."""
+        key = (clone_url, repo_sha, indexer.plan_key)
+        return key in self._inflight or self._live_slot(key) is not None
+
+    def _live_slot(self, key: tuple[str, str, str]) -> _IndexSlot | None:
+        now = time.monotonic()
+        for expired in [k for k, slot in self._slots.items() if slot.expires_at <= now]:
+            del self._slots[expired]
+        return self._slots.get(key)
+
+    def clear(self) -> None:
+        self._slots.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._slots),
+            "inflight": len(self._inflight),
+            "builds": self.builds,
+            "shared": self.shared,
+        }
+
+
+def _shared_copy(payload: dict) -> dict:
+    return {
+        **payload,
+        "metrics": {**(payload.get("metrics") or {}), "shared_index": True},
+    }
+
+
+index_service = SharedIndexService(ttl_seconds=settings.tier1_index_share_ttl_seconds)
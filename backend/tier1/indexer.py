@@ -3,20 +3,131 @@
 from __future__ import annotations
 
 import asyncio
+import bisect
+import functools
 import hashlib
+import heapq
+import json
 import logging
+import multiprocessing
+import posixpath
 import re
+import resource
 import shutil
+import signal
 import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from uuid import UUID, uuid4
 
+try:
+    # Optional linear-time engine (google-re2), selected by tier1_regex_engine.
+    import re2
+except ImportError:
+    re2 = None
+
 from config import settings
 from services import supabase_client as db
+from services.repo_mirror import BlobStream, TreeEntry, repo_mirrors
+from tier1.blob_cache import CachedBlob, blob_cache
+from tier1.index_codec import (
+    ENVELOPE_HEADER_FIELDS,
+    HEADER_KEYS,
+    LazyIndex,
+    decode_index,
+    encode_index,
+    storage_stats,
+)
+from tier1.index_progress import IndexProgress
+from tier1.index_records import FileRecord, FileResult, SignalHit
+from tier1.rules import ScanPlan, compile_scan_plan
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever extraction rules or the index_json shape change, so indexes
+# built by an older rule set are never carried over by incremental re-indexing.
+INDEXER_VERSION = 12
+
+# Files are indexed up to this many bytes; part of the blob cache key.
+MAX_INDEXED_FILE_BYTES = 1_500_000
+# A NUL byte within this many leading bytes marks a file as binary (as git does).
+BINARY_SNIFF_BYTES = 8000
+# Window of history summarized into git metadata signals.
+GIT_HISTORY_WINDOW = "90.days"
+# Separates commit headers from --name-only paths in the history stream; git
+# quotes control characters in paths, so no path line starts with it.
+_GIT_LOG_COMMIT_MARKER = "\x1e"
+# File content handed to the worker pool per batch while blobs are streamed.
+READ_BATCH_BYTES = 32 * 1024 * 1024
+# Smaller batches under a LOC/byte budget, so indexing stops soon after it is spent.
+BUDGET_BATCH_BYTES = 1024 * 1024
+BUDGET_BATCH_FILES = 256
+# Blobs requested from the cat-file stream at a time; stopping early drains at most one chunk.
+READ_CHUNK_OBJECTS = 256
+# Extra ``signal_counts`` keys: route hints without auth / rate-limit hints.
+ROUTE_NO_AUTH_COUNT = "route_hints.no_auth"
+ROUTE_NO_RATE_LIMIT_COUNT = "route_hints.no_rate_limit"
+
+# Git tree modes of regular (non-symlink, non-submodule) files.
+REGULAR_FILE_MODES = frozenset({"100644", "100755"})
+_SYMLINK_MODE = "120000"
+
+# File classes decided from path, blob size and .gitattributes before any
+# content is read. Skipped classes are never read; sampled classes are scanned
+# on their first SAMPLED_FILE_BYTES only and kept out of loc_total.
+SKIPPED_FILE_CLASSES = ("generated", "vendored")
+SAMPLED_FILE_CLASSES = ("minified", "large_data")
+SAMPLED_FILE_BYTES = 64 * 1024
+# Classes decided while a file is scanned: a line longer than
+# tier1_scan_max_line_bytes ("long_lines", 0 LOC like minified files) or more
+# candidate rule evaluations than tier1_scan_file_rule_budget ("slow_scan",
+# which keeps its LOC). Both are decided from content alone, never from timing,
+# so a commit's index is the same on every machine. Their signals come from
+# the first SAMPLED_FILE_BYTES with every line clipped to the line budget.
+DOWNGRADED_FILE_CLASSES = ("long_lines", "slow_scan")
+# Data files above this size are treated as fixtures/dumps, not source.
+LARGE_DATA_FILE_BYTES = 256 * 1024
+
+_VENDORED_PATH_PATTERN = re.compile(
+    r"(?:^|/)(?:vendor|vendors|node_modules|bower_components|jspm_packages|third[_-]?party|pods|carthage/checkouts)/"
+)
+_GENERATED_PATH_PATTERN = re.compile(
+    r"(?:^|/)(?:dist|__generated__|\.next|\.nuxt|coverage|__snapshots__)/"
+    r"|\.(?:map|snap)$"
+    r"|\.(?:pb\.go|pb\.cc|pb\.h|g\.dart|designer\.cs)$"
+    r"|\.generated\.[a-z0-9]+$"
+    r"|_pb2(?:_grpc)?\.pyi?$"
+)
+_MINIFIED_PATH_PATTERN = re.compile(r"[.-]min\.(?:js|mjs|cjs|css)$")
+_DATA_FILE_EXTENSIONS = frozenset(
+    {".json", ".jsonl", ".ndjson", ".geojson", ".csv", ".tsv", ".xml", ".svg", ".txt", ".log"}
+)
+_LINGUIST_ATTRIBUTES = ("linguist-generated", "linguist-vendored")
+
+LINTER_COMMANDS: dict[str, list[str]] = {
+    "ruff": ["ruff", "check", ".", "--output-format", "json"],
+    "eslint": ["eslint", ".", "-f", "json"],
+    "bandit": ["bandit", "-r", ".", "-f", "json"],
+    "semgrep": ["semgrep", "--config", "auto", "--json", "."],
+}
+# A linter only runs when the commit tracks files it can check.
+_PYTHON_EXTENSIONS = frozenset({".py", ".pyi"})
+_JAVASCRIPT_EXTENSIONS = frozenset({".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx"})
+LINTER_EXTENSIONS: dict[str, frozenset[str]] = {
+    "ruff": _PYTHON_EXTENSIONS,
+    "eslint": _JAVASCRIPT_EXTENSIONS,
+    "bandit": _PYTHON_EXTENSIONS,
+    "semgrep": _PYTHON_EXTENSIONS
+    | _JAVASCRIPT_EXTENSIONS
+    | frozenset({".go", ".java", ".kt", ".rb", ".php", ".cs", ".rs", ".scala", ".swift", ".c", ".cpp"}),
+}
+# Structured issues kept per tool; probes still report the full count.
+MAX_LINT_ISSUES_PER_TOOL = 200
+
 
 SECRET_PATTERNS: list[tuple[str, re.Pattern[str]]] = [
     ("sk_live", re.compile(r"sk_live_[A-Za-z0-9]+")),
@@ -68,10 +179,309 @@ SYNC_BLOCKING_PATTERNS: list[tuple[str, re.Pattern[str]]] = [
     ("requests_blocking", re.compile(r"\brequests\.(get|post|put|delete)\s*\(")),
 ]
 
+PRIVATE_KEY_PATTERN = re.compile(r"BEGIN (?:RSA )?PRIVATE KEY")
+
+# Literal anchors per pattern for the fused scanner: every line a pattern can
+# match contains at least one of its anchors (compared case-insensitively when
+# the pattern is IGNORECASE). Adding a pattern without anchors fails at import.
+PATTERN_ANCHORS: dict[str, tuple[str, ...]] = {
+    "sk_live": ("sk_live_",),
+    "sk_test": ("sk_test_",),
+    "aws_access_key": ("AKIA",),
+    "slack_bot": ("xoxb-",),
+    "github_pat": ("ghp_",),
+    "private_key": ("PRIVATE KEY",),
+    "eval": ("eval",),
+    "new_function": ("Function",),
+    "child_process_exec": ("child_process.",),
+    "python_exec": ("exec",),
+    "pickle_loads": ("pickle.loads",),
+    "sql_concat": ("select", "insert", "update", "delete"),
+    "raw_query": ("query", "execute"),
+    "env_usage": ("process.env.", "os.getenv(", "os.environ[", "import.meta.env."),
+    "bare_except": ("except",),
+    "print_in_except": ("except",),
+    "console_log_error": ("console.log(",),
+    "fs_sync": ("fs.",),
+    "sync_subprocess": ("subprocess.",),
+    "requests_blocking": ("requests.",),
+    "route": ("app.", "router."),
+}
+
+
+@dataclass(frozen=True)
+class _LineRule:
+    """One per-line pattern routed to a ``signals`` bucket by the fused scanner."""
+
+    bucket: str
+    name: str
+    pattern: re.Pattern[str]
+    # Report the first capture group as ``match`` instead of the rule name.
+    match_group: bool = False
+
+
+def _line_rules(bucket: str, patterns: list[tuple[str, re.Pattern[str]]]) -> list[_LineRule]:
+    return [_LineRule(bucket, name, pattern) for name, pattern in patterns]
+
+
+# Order matters: rows within a bucket are emitted in rule order per line.
+LINE_RULES: list[_LineRule] = [
+    *_line_rules("secret_matches", SECRET_PATTERNS),
+    _LineRule("private_key_matches", "private_key", PRIVATE_KEY_PATTERN),
+    *_line_rules("dangerous_exec_matches", DANGEROUS_PATTERNS),
+    *_line_rules("sql_matches", SQL_PATTERNS),
+    _LineRule("env_usage", "env_usage", ENV_USAGE_PATTERN, match_group=True),
+    *_line_rules("weak_error_logging", WEAK_ERROR_LOGGING_PATTERNS),
+    *_line_rules("blocking_sync", SYNC_BLOCKING_PATTERNS),
+]
+# Pseudo rule id for ROUTE_PATTERNS, which feed the windowed route_hints pass.
+_ROUTE_RULE_ID = len(LINE_RULES)
+
+# Rule dispatch: every file belongs to one group, decided by its extension,
+# and runs only the rules dispatched to that group. Unknown extensions are
+# "other", which runs every rule. "config" (YAML/TOML: CI workflows, compose
+# files) keeps the language-neutral code rules, since those files embed shell
+# and SQL that really runs. "docs" and "data" run only secrets and private
+# keys: code samples in prose are not executed, so their env/exec/SQL rows
+# are dropped on purpose.
+RULE_GROUPS = ("python", "javascript", "docs", "data", "config", "other")
+_RULE_GROUP_EXTENSIONS: dict[str, str] = {
+    **{ext: "python" for ext in _PYTHON_EXTENSIONS},
+    **{ext: "javascript" for ext in _JAVASCRIPT_EXTENSIONS},
+    **{ext: "docs" for ext in (".md", ".markdown", ".mdx", ".rst", ".adoc", ".txt")},
+    **{
+        ext: "data"
+        for ext in (".json", ".jsonl", ".ndjson", ".geojson", ".csv", ".tsv", ".xml", ".svg")
+        + (".lock", ".css", ".scss", ".sass", ".less")
+    },
+    **{ext: "config" for ext in (".yaml", ".yml", ".toml")},
+}
+_CODE_RULE_GROUPS = frozenset({"python", "javascript", "other"})
+_SHARED_RULE_GROUPS = _CODE_RULE_GROUPS | {"config"}
+_JAVASCRIPT_RULE_GROUPS = frozenset({"javascript", "other"})
+_PYTHON_RULE_GROUPS = frozenset({"python", "other"})
+# Rule manifest: the groups each rule runs on; rules not listed (secrets,
+# private keys) run on every group. python_exec stays on JavaScript, where a
+# bare ``exec(`` is child_process.exec.
+RULE_DISPATCH: dict[str, frozenset[str]] = {
+    "eval": _SHARED_RULE_GROUPS,
+    "new_function": _JAVASCRIPT_RULE_GROUPS,
+    "child_process_exec": _JAVASCRIPT_RULE_GROUPS,
+    "python_exec": _SHARED_RULE_GROUPS,
+    "pickle_loads": _PYTHON_RULE_GROUPS,
+    "sql_concat": _SHARED_RULE_GROUPS,
+    "raw_query": _SHARED_RULE_GROUPS,
+    "env_usage": _SHARED_RULE_GROUPS,
+    "bare_except": _PYTHON_RULE_GROUPS,
+    "print_in_except": _PYTHON_RULE_GROUPS,
+    "console_log_error": _JAVASCRIPT_RULE_GROUPS,
+    "fs_sync": _JAVASCRIPT_RULE_GROUPS,
+    "sync_subprocess": _PYTHON_RULE_GROUPS,
+    "requests_blocking": _PYTHON_RULE_GROUPS,
+    "route": _CODE_RULE_GROUPS,
+}
+
+
+def _rule_group(rel_path: str) -> str:
+    return _RULE_GROUP_EXTENSIONS.get(posixpath.splitext(rel_path)[1].lower(), "other")
+
+
+def _anchor_table(
+    group: str | None = None, collectors: frozenset[str] | None = None
+) -> list[tuple[str, bool, tuple[int, ...]]]:
+    """Group rule ids by (anchor, case-folded) so each anchor is searched once.
+
+    With a ``group``, only the rules dispatched to it are included; with
+    ``collectors``, only the rules a scan plan needs.
+    """
+    grouped: dict[tuple[str, bool], list[int]] = {}
+    entries = [(rule.name, rule.pattern) for rule in LINE_RULES]
+    entries.append(("route", ROUTE_PATTERNS[0]))
+    for rule_id, (name, pattern) in enumerate(entries):
+        if group is not None and group not in RULE_DISPATCH.get(name, RULE_GROUPS):
+            continue
+        if collectors is not None and name not in collectors:
+            continue
+        folded = bool(pattern.flags & re.IGNORECASE)
+        for anchor in PATTERN_ANCHORS[name]:
+            key = (anchor.lower() if folded else anchor, folded)
+            grouped.setdefault(key, []).append(rule_id)
+    return [(anchor, folded, tuple(ids)) for (anchor, folded), ids in grouped.items()]
+
+
+@functools.lru_cache(maxsize=16)
+def _anchor_tables(collectors: frozenset[str] | None = None) -> tuple[dict, dict]:
+    """(str, bytes) anchor tables keyed by rule group, where None runs every rule."""
+    tables = {group: _anchor_table(group, collectors) for group in (None, *RULE_GROUPS)}
+    bytes_tables = {
+        group: [(anchor.encode("ascii"), folded, ids) for anchor, folded, ids in table]
+        for group, table in tables.items()
+    }
+    return tables, bytes_tables
+
+
+def _bucket_collectors() -> dict[str, frozenset[str]]:
+    """Scan plans name signal buckets; these are the collectors feeding each one.
+
+    ``lint_issues`` is filled by the linter probes instead.
+    """
+    collectors: dict[str, set[str]] = {"insecure_cors_matches": {"cors"}, "route_hints": {"route"}}
+    for rule in LINE_RULES:
+        collectors.setdefault(rule.bucket, set()).add(rule.name)
+    return {bucket: frozenset(names) for bucket, names in collectors.items()}
+
+
+_BUCKET_COLLECTORS = _bucket_collectors()
+PLAN_SIGNALS = frozenset(_BUCKET_COLLECTORS) | {"lint_issues"}
+
+
+def _plan_collectors(plan: ScanPlan | None) -> frozenset[str] | None:
+    """Collectors a plan needs, or None when it needs every one."""
+    if plan is None or plan.signals >= frozenset(_BUCKET_COLLECTORS):
+        return None
+    return frozenset().union(
+        *(_BUCKET_COLLECTORS[bucket] for bucket in plan.signals if bucket in _BUCKET_COLLECTORS)
+    )
+
+
+# ASCII separators ``str.splitlines`` breaks on besides "\n".
+_BYTES_LINE_BREAK_CHARS = (b"\r", b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e")
+_BYTES_LINE_BREAKS = re.compile(rb"\r\n?|[\x0b\x0c\x1c-\x1e]")
+# Lines the byte path cannot judge exactly: non-ASCII text, and \x1f, which
+# ``str.strip`` and ``\s`` treat as whitespace but their bytes forms do not.
+_BYTES_SPECIAL_LINE = re.compile(rb"[^\n]*[\x1f\x80-\xff][^\n]*")
+_UNICODE_LINE_BREAKS = re.compile("[\x85\u2028\u2029]")
+
+_INLINE_FLAGS = ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"))
+
+
+@dataclass(frozen=True)
+class _ScanPatterns:
+    """The patterns the fused scanner runs, compiled by one regex engine.
+
+    ``line_bytes`` and ``route_bytes`` are byte-level twins used by
+    ``_scan_buffer`` on ASCII lines, where they match exactly what the str
+    patterns match.
+    """
+
+    engine: str
+    line: tuple
+    line_bytes: tuple
+    route: tuple
+    route_bytes: tuple
+    auth_hint: object
+    rate_hint: object
+
+
+def _compile_scan_patterns(engine_name: str, engine) -> _ScanPatterns:
+    """Compile every shipped scanner pattern with ``engine`` (``re`` or an RE2 binding).
+
+    Flags are passed inline so any ``re``-compatible module works. Raises
+    RuntimeError naming each pattern the engine rejects, so an unsupported
+    pattern fails at startup instead of mid-scan.
+    """
+    unsupported: list[str] = []
+
+    def compile_pattern(name: str, pattern: re.Pattern[str], as_bytes: bool = False):
+        flags = "".join(flag for bit, flag in _INLINE_FLAGS if pattern.flags & bit)
+        source = f"(?{flags}){pattern.pattern}" if flags else pattern.pattern
+        try:
+            return engine.compile(source.encode("ascii") if as_bytes else source)
+        except Exception as exc:
+            unsupported.append(f"{name}{' (bytes)' if as_bytes else ''}: {exc}")
+            return None
+
+    routes = [(f"route_{idx}", pattern) for idx, pattern in enumerate(ROUTE_PATTERNS)]
+    compiled = _ScanPatterns(
+        engine=engine_name,
+        line=tuple(compile_pattern(rule.name, rule.pattern) for rule in LINE_RULES),
+        line_bytes=tuple(compile_pattern(rule.name, rule.pattern, as_bytes=True) for rule in LINE_RULES),
+        route=tuple(compile_pattern(name, pattern) for name, pattern in routes),
+        route_bytes=tuple(compile_pattern(name, pattern, as_bytes=True) for name, pattern in routes),
+        auth_hint=compile_pattern("auth_hint", AUTH_HINT_PATTERN),
+        rate_hint=compile_pattern("rate_hint", RATE_HINT_PATTERN),
+    )
+    if unsupported:
+        raise RuntimeError(f"Tier 1 scan patterns unsupported by {engine_name}: {'; '.join(unsupported)}")
+    return compiled
+
+
+def _configured_scan_patterns() -> _ScanPatterns:
+    """Compile the patterns for ``tier1_regex_engine``; checked once at import."""
+    engine_name = settings.tier1_regex_engine
+    if engine_name == "re":
+        return _compile_scan_patterns("re", re)
+    if engine_name == "re2":
+        if re2 is None:
+            raise RuntimeError('tier1_regex_engine is "re2" but the google-re2 package is not installed')
+        # RE2 runs in linear time; its \b and \s are ASCII-only, which only
+        # matters on the rare non-ASCII lines.
+        return _compile_scan_patterns("re2", re2)
+    raise RuntimeError(f'Unknown tier1_regex_engine {engine_name!r}; expected "re" or "re2"')
+
+
+_SCAN_PATTERNS = _configured_scan_patterns()
+
+_CORS_WILDCARD_NEEDLES = ("allow_origins=['*'", 'allow_origins=["*"', "origin: '*'")
+_CORS_CREDENTIAL_NEEDLES = ("allow_credentials=true", "credentials: true")
+
+# Non-ASCII characters that re.IGNORECASE matches against ASCII letters.
+# Mapping them first keeps the folded copy the same length as the original
+# (U+0130 is the only character whose lower() is longer than one character).
+_IGNORECASE_ASCII_MAP = {0x130: "i", 0x131: "i", 0x17F: "s", 0x212A: "k"}
+# Every separator str.splitlines() honors besides "\n".
+_EXTRA_LINE_BREAK_CHARS = ("\r", "\x0b", "\x0c", "\x1c", "\x1d", "\x1e", "\x85", "\u2028", "\u2029")
+_EXTRA_LINE_BREAKS = re.compile("\r\n?|[\x0b\x0c\x1c-\x1e\x85\u2028\u2029]")
+
 
 class DeterministicIndexer:
     """Builds and caches deterministic Tier 1 index payloads."""
 
+    def __init__(self, plan: ScanPlan | None = None) -> None:
+        # Builds collect only what the plan's checks read (the configured profile by default).
+        self.plan = plan if plan is not None else compile_scan_plan(settings.tier1_check_profile)
+        uncollected = self.plan.signals - PLAN_SIGNALS
+        if uncollected:
+            raise ValueError(f"No Tier1 collector fills signals: {', '.join(sorted(uncollected))}")
+
+    @property
+    def plan_key(self) -> str:
+        """Identifies what this indexer's payloads hold; only equal keys may share a build."""
+        scan_plan = _scan_plan_json(self.plan)
+        return ",".join(scan_plan["signals"]) + (":git_metadata" if scan_plan["git_metadata"] else "")
+
+    async def cached_index(self, project_id: UUID, repo_sha: str, *, with_body: bool = True) -> dict | None:
+        """Return the project's stored index for ``repo_sha``, if it covers this indexer's plan.
+
+        Only the index header is fetched to decide; the body follows when
+        ``with_body`` is set. Without it, ``index_json`` holds just the header
+        fields, which is enough for callers that only need the counts.
+        """
+        cached = await db.get_project_index(project_id, repo_sha, index_fields=ENVELOPE_HEADER_FIELDS)
+        stored = cached.get("index_json") if cached else None
+        if not stored or not index_covers_plan(stored, self.plan):
+            return None
+        index_json = {key: stored[key] for key in HEADER_KEYS if key in stored}
+        if with_body:
+            cached = await db.get_project_index(project_id, repo_sha)
+            if not cached:
+                return None
+            stored = cached.get("index_json") or {}
+            index_json = decode_index(stored)
+        return {
+            "repo_sha": repo_sha,
+            "loc_total": int(cached.get("loc_total") or 0),
+            "file_count": int(cached.get("file_count") or 0),
+            "index_json": index_json,
+            "cache_hit": True,
+            "metrics": {
+                "files_seen": int(cached.get("file_count") or 0),
+                "loc_total": int(cached.get("loc_total") or 0),
+                "cache_hit": True,
+                "index_storage": storage_stats(stored),
+            },
+        }
+
     async def build_or_reuse(
         self,
         *,
@@ -82,23 +492,26 @@ class DeterministicIndexer:
         repo_sha: str,
         github_token: str | None,
         scan_id: UUID | None = None,
+        loc_budget: int | None = None,
+        byte_budget: int | None = None,
+        progress: IndexProgress | None = None,
     ) -> dict:
+        """Return the index for ``repo_sha``, from the project cache or freshly built.
+
+        With a ``loc_budget`` or ``byte_budget`` a build stops as soon as
+        either is exceeded and returns a partial index marked ``truncated``.
+        Truncated indexes are never stored. A cached index built for a
+        narrower scan plan than this indexer's is rebuilt. ``progress``
+        receives the phases and file counts of a fresh build.
+        """
         if project_id is not None:
-            cached = await db.get_project_index(project_id, repo_sha)
-            if cached:
-                index_json = cached.get("index_json") or {}
-                return {
-                    "repo_sha": repo_sha,
-                    "loc_total": int(cached.get("loc_total") or 0),
-                    "file_count": int(cached.get("file_count") or 0),
-                    "index_json": index_json,
-                    "cache_hit": True,
-                    "metrics": {
-                        "files_seen": int(cached.get("file_count") or 0),
-                        "loc_total": int(cached.get("loc_total") or 0),
-                        "cache_hit": True,
-                    },
-                }
+            cached = await self.cached_index(project_id, repo_sha)
+            if cached is not None:
+                return cached
+
+        base_index: dict | None = None
+        if project_id is not None and settings.tier1_incremental_index_enabled:
+            base_index = await self._incremental_base(project_id, repo_sha)
 
         result = await asyncio.to_thread(
             self._build_index_sync,
@@ -107,28 +520,86 @@ class DeterministicIndexer:
             repo_sha,
             github_token,
             scan_id,
+            base_index,
+            loc_budget=loc_budget,
+            byte_budget=byte_budget,
+            progress=progress,
         )
 
-        if project_id is not None and user_id is not None:
-            expires_at = datetime.now(timezone.utc) + timedelta(days=settings.tier1_index_ttl_days)
-            await db.upsert_project_index(
-                project_id=project_id,
-                user_id=user_id,
-                repo_sha=repo_sha,
-                loc_total=result["loc_total"],
-                file_count=result["file_count"],
-                index_json=result["index_json"],
-                expires_at=expires_at,
-            )
+        index_storage: dict = {}
+        if project_id is not None and user_id is not None and not result.get("truncated"):
+            index_storage = await self.store_index(project_id=project_id, user_id=user_id, result=result)
 
         result["cache_hit"] = False
         result["metrics"] = {
             "files_seen": result["file_count"],
             "loc_total": result["loc_total"],
             "cache_hit": False,
+            "index_mode": result.get("index_mode", "full"),
+            "files_rescanned": result.get("files_rescanned", result["file_count"]),
+            "blob_cache": result.get("blob_cache") or {},
+            "index_storage": index_storage,
+            "truncated": bool(result.get("truncated")),
         }
         return result
 
+    @staticmethod
+    async def store_index(*, project_id: UUID, user_id: str, result: dict) -> dict:
+        """Persist a built index payload for ``project_id``; returns its storage stats."""
+        if result.get("truncated"):
+            raise ValueError("Truncated indexes cannot be stored")
+        index_json = result["index_json"]
+        if isinstance(index_json, LazyIndex):
+            index_json = index_json.materialize()
+        encoded_index = encode_index(index_json)
+        index_storage = storage_stats(encoded_index)
+        logger.info(
+            "Tier1 index for %s@%s stored in %d bytes (%d raw, %.1f%% smaller)",
+            index_json.get("repo_url"),
+            str(result["repo_sha"])[:12],
+            index_storage["encoded_bytes"],
+            index_storage["raw_bytes"],
+            index_storage["reduction"] * 100,
+        )
+        expires_at = datetime.now(timezone.utc) + timedelta(days=settings.tier1_index_ttl_days)
+        await db.upsert_project_index(
+            project_id=project_id,
+            user_id=user_id,
+            repo_sha=result["repo_sha"],
+            loc_total=result["loc_total"],
+            file_count=result["file_count"],
+            index_json=encoded_index,
+            expires_at=expires_at,
+        )
+        return index_storage
+
+    @staticmethod
+    async def _incremental_base(project_id: UUID, repo_sha: str) -> dict | None:
+        """Return the latest cached index usable as an incremental base, if any.
+
+        The body is only fetched once the header shows the index is usable.
+        """
+        try:
+            row = await db.get_latest_project_index(project_id, index_fields=ENVELOPE_HEADER_FIELDS)
+            if not row:
+                return None
+            header = row.get("index_json") or {}
+            base_sha = str(header.get("repo_sha") or row.get("repo_sha") or "")
+            if not base_sha or base_sha == repo_sha:
+                return None
+            if header.get("indexer_version") != INDEXER_VERSION or header.get("truncated"):
+                return None
+            row = await db.get_project_index(project_id, str(row.get("repo_sha") or base_sha))
+        except Exception:
+            logger.exception("Tier1 incremental base lookup failed; indexing from scratch")
+            return None
+        if not row:
+            return None
+        index_json = decode_index(row.get("index_json"))
+        if isinstance(index_json, LazyIndex):
+            return index_json.materialize()
+        return index_json
+
     def _build_index_sync(
         self,
         repo_url: str,
@@ -136,172 +607,896 @@ class DeterministicIndexer:
         repo_sha: str,
         github_token: str | None,
         scan_id: UUID | None,
+        base_index: dict | None = None,
+        *,
+        loc_budget: int | None = None,
+        byte_budget: int | None = None,
+        progress: IndexProgress | None = None,
     ) -> dict:
-        workspace_root = Path("/tmp") / "clarity-check" / "tier1" / str(scan_id or uuid4())
-        repo_dir = workspace_root / "repo"
+        budget = None
+        if loc_budget is not None or byte_budget is not None:
+            budget = _IndexBudget(max_loc=loc_budget, max_bytes=byte_budget)
+        scan_plan = _scan_plan_json(self.plan)
+        collectors = _plan_collectors(self.plan)
+        # Everything is read from the shared mirror's object store; no working
+        # tree is written unless a linter needs one.
+        with repo_mirrors.lease(clone_url) as git_dir:
+            if progress is not None:
+                progress.start("clone")
+            repo_mirrors.ensure_commit(clone_url, repo_sha, token=github_token)
+            if progress is not None:
+                progress.start("checkout")
+            entries = repo_mirrors.list_tree(clone_url, repo_sha)
+            # Blobs over the mirror's blob limit are never read, whether the
+            # server left them behind or a worktree checkout fetched them since;
+            # they are listed in the index instead.
+            oversized = repo_mirrors.oversized_objects(clone_url, repo_sha)
+
+            files = [entry.path for entry in entries]
+            facts = _path_facts(files)
+            stats = _IndexStats()
+
+            with repo_mirrors.open_blob_stream(clone_url, token=github_token) as stream:
+                reader = _ObjectReader(stream, entries, oversized)
+                file_classes, classifier_key = _classify_tracked_files(reader, files, clone_url)
+                indexed_paths = [path for path in files if file_classes.get(path) not in SKIPPED_FILE_CLASSES]
+                oversized_files = sorted(
+                    entry.path
+                    for entry in entries
+                    if entry.object_id in oversized and file_classes.get(entry.path) not in SKIPPED_FILE_CLASSES
+                )
+                sampled = {path: file_classes[path] for path in indexed_paths if path in file_classes}
+                if progress is not None:
+                    progress.start("index", files_total=len(indexed_paths))
+
+                changed = None
+                # Classification depends on .gitattributes, so carrying files
+                # over is only sound when those are unchanged.
+                if (
+                    base_index is not None
+                    and base_index.get("classifier_key") == classifier_key
+                    and base_index.get("signal_sample_cap") == _signal_sample_cap()
+                    and (base_index.get("scan_plan") or {}).get("signals") == scan_plan["signals"]
+                ):
+                    changed = _changed_paths(
+                        git_dir,
+                        str(base_index["repo_sha"]),
+                        repo_sha,
+                        clone_url=clone_url,
+                        token=github_token,
+                    )
+
+                if changed is None:
+                    indexed_files, signals, loc_total = _index_tracked_files(
+                        reader,
+                        indexed_paths,
+                        blob_ids=reader.blob_ids,
+                        stats=stats,
+                        sampled=sampled,
+                        budget=budget,
+                        collectors=collectors,
+                        progress=progress,
+                    )
+                    index_mode = "full"
+                    files_rescanned = len(indexed_paths)
+                else:
+                    indexed_files, signals, loc_total = _reindex_changed_files(
+                        reader,
+                        indexed_paths,
+                        changed,
+                        base_index,
+                        blob_ids=reader.blob_ids,
+                        stats=stats,
+                        sampled=sampled,
+                        budget=budget,
+                        collectors=collectors,
+                        progress=progress,
+                    )
+                    index_mode = "incremental"
+                    files_rescanned = len(changed)
+
+            truncated = budget is not None and budget.exceeded
+            linter_probes: list[dict] = []
+            lint_issues: list[dict] = []
+            git_metadata: dict = {}
+            # A truncated index only answers "over budget"; skip the per-commit extras,
+            # as well as any the plan does not read.
+            if progress is not None:
+                progress.flush()
+            if not truncated and self.plan.linters:
+                if progress is not None:
+                    progress.start("linters")
+                linter_probes, lint_issues = _linter_probes_for_commit(
+                    clone_url, repo_sha, github_token, scan_id, indexed_paths
+                )
+            if not truncated and self.plan.git_metadata:
+                if progress is not None:
+                    progress.start("git-history")
+                git_metadata = _git_metadata_for_commit(clone_url, repo_sha, github_token)
+        repo_mirrors.evict()
+
+        index_json = {
+            "indexer_version": INDEXER_VERSION,
+            "repo_url": repo_url,
+            "repo_sha": repo_sha,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "classifier_key": classifier_key,
+            "signal_sample_cap": _signal_sample_cap(),
+            "scan_plan": scan_plan,
+            "files": indexed_files,
+            "signals": {**signals, "lint_issues": lint_issues},
+            "signal_counts": _signal_totals(indexed_files),
+            "facts": {
+                **facts,
+                **_file_class_facts(file_classes, indexed_files),
+                "oversized_files": oversized_files,
+                "git_metadata": git_metadata,
+            },
+            "linter_probes": linter_probes,
+        }
+        if truncated:
+            index_json["truncated"] = True
+
+        return {
+            "repo_sha": repo_sha,
+            "loc_total": loc_total,
+            "file_count": len(indexed_files),
+            "truncated": truncated,
+            "index_json": index_json,
+            "index_mode": index_mode,
+            "files_rescanned": files_rescanned,
+            "blob_cache": {
+                "hits": stats.blob_cache_hits,
+                "misses": stats.blob_cache_misses,
+            },
+        }
 
-        shutil.rmtree(workspace_root, ignore_errors=True)
-        workspace_root.mkdir(parents=True, exist_ok=True)
 
-        clone_target = _clone_url_with_token(clone_url, github_token)
+def _scan_plan_json(plan: ScanPlan) -> dict:
+    """What an index built for ``plan`` holds, as recorded in its ``scan_plan``."""
+    return {"signals": sorted(plan.signals & PLAN_SIGNALS), "git_metadata": plan.git_metadata}
 
-        try:
-            _run(["git", "clone", "--depth", "1", clone_target, str(repo_dir)], timeout=120)
-            # Ensure requested commit is checked out.
-            _run(["git", "fetch", "--depth", "1", "origin", repo_sha], cwd=repo_dir, timeout=120)
-            _run(["git", "checkout", repo_sha], cwd=repo_dir, timeout=30)
-            # Best-effort additional history so git metadata signals are available.
-            subprocess.run(
-                ["git", "fetch", "--depth", "200", "origin"],
-                cwd=str(repo_dir),
-                text=True,
-                capture_output=True,
-                timeout=60,
-                check=False,
-            )
 
-            files = _git_ls_files(repo_dir)
-            indexed_files: list[dict] = []
-            loc_total = 0
-
-            signals: dict[str, list[dict]] = {
-                "secret_matches": [],
-                "private_key_matches": [],
-                "insecure_cors_matches": [],
-                "dangerous_exec_matches": [],
-                "sql_matches": [],
-                "route_hints": [],
-                "env_usage": [],
-                "weak_error_logging": [],
-                "blocking_sync": [],
-            }
-
-            has_ci = False
-            has_tests = False
-            has_env_example = False
-            tracked_env_files: list[str] = []
-            manifests_present: set[str] = set()
-            lockfiles_present: set[str] = set()
-
-            for rel_path in files:
-                # basic path-driven checks
-                lower = rel_path.lower()
-                if lower.startswith(".github/workflows/"):
-                    has_ci = True
-                if _is_test_path(lower):
-                    has_tests = True
-                if lower in {".env.example", ".env.sample", ".env.template"}:
-                    has_env_example = True
-                if _is_secret_env_file(lower):
-                    tracked_env_files.append(rel_path)
-                if _is_manifest_file(lower):
-                    manifests_present.add(Path(rel_path).name)
-                if _is_lockfile(lower):
-                    lockfiles_present.add(Path(rel_path).name)
-
-                abs_path = repo_dir / rel_path
-                if not abs_path.exists() or not abs_path.is_file():
-                    continue
+def index_covers_plan(index_json: dict, plan: ScanPlan) -> bool:
+    """Whether ``index_json`` holds everything ``plan`` reads.
 
-                data = _read_text(abs_path)
-                if data is None:
-                    continue
+    Indexes without a ``scan_plan`` predate plans and ran every collector.
+    """
+    stored = index_json.get("scan_plan")
+    if not stored:
+        return True
+    return set(stored.get("signals") or ()) >= plan.signals and (
+        bool(stored.get("git_metadata")) or not plan.git_metadata
+    )
 
-                loc = _loc_count(data)
-                loc_total += loc
 
-                ext = abs_path.suffix.lower()
-                sha256 = hashlib.sha256(data.encode("utf-8", errors="ignore")).hexdigest()
+def _empty_signals() -> dict[str, list[SignalHit]]:
+    return {
+        "secret_matches": [],
+        "private_key_matches": [],
+        "insecure_cors_matches": [],
+        "dangerous_exec_matches": [],
+        "sql_matches": [],
+        "route_hints": [],
+        "env_usage": [],
+        "weak_error_logging": [],
+        "blocking_sync": [],
+    }
 
-                indexed_files.append(
-                    {
-                        "path": rel_path,
-                        "ext": ext,
-                        "loc": loc,
-                        "sha256": sha256,
-                        "path_role": _path_role(lower),
-                    }
-                )
 
-                # deterministic signal extraction
-                _collect_secret_signals(rel_path, data, signals)
-                _collect_cors_signals(rel_path, data, signals)
-                _collect_dangerous_exec_signals(rel_path, data, signals)
-                _collect_sql_signals(rel_path, data, signals)
-                _collect_route_signals(rel_path, data, signals)
-                _collect_env_signals(rel_path, data, signals)
-                _collect_error_logging_signals(rel_path, data, signals)
-                _collect_sync_blocking_signals(rel_path, data, signals)
-
-            linter_probes = _run_linter_probes(repo_dir)
-
-            index_json = {
-                "repo_url": repo_url,
-                "repo_sha": repo_sha,
-                "generated_at": datetime.now(timezone.utc).isoformat(),
-                "files": indexed_files,
-                "signals": signals,
-                "facts": {
-                    "has_ci": has_ci,
-                    "has_tests": has_tests,
-                    "has_env_example": has_env_example,
-                    "tracked_env_files": tracked_env_files,
-                    "manifests_present": sorted(manifests_present),
-                    "lockfiles_present": sorted(lockfiles_present),
-                    "git_metadata": _collect_git_metadata(repo_dir),
-                },
-                "linter_probes": linter_probes,
-            }
-
-            return {
-                "repo_sha": repo_sha,
-                "loc_total": loc_total,
-                "file_count": len(indexed_files),
-                "index_json": index_json,
-            }
-        finally:
-            shutil.rmtree(workspace_root, ignore_errors=True)
+def _path_facts(files: list[str]) -> dict:
+    """Derive path-only repository facts from the tracked file list."""
+    has_ci = False
+    has_tests = False
+    has_env_example = False
+    tracked_env_files: list[str] = []
+    manifests_present: set[str] = set()
+    lockfiles_present: set[str] = set()
+
+    for rel_path in files:
+        lower = rel_path.lower()
+        if lower.startswith(".github/workflows/"):
+            has_ci = True
+        if _is_test_path(lower):
+            has_tests = True
+        if lower in {".env.example", ".env.sample", ".env.template"}:
+            has_env_example = True
+        if _is_secret_env_file(lower):
+            tracked_env_files.append(rel_path)
+        if _is_manifest_file(lower):
+            manifests_present.add(Path(rel_path).name)
+        if _is_lockfile(lower):
+            lockfiles_present.add(Path(rel_path).name)
+
+    return {
+        "has_ci": has_ci,
+        "has_tests": has_tests,
+        "has_env_example": has_env_example,
+        "tracked_env_files": tracked_env_files,
+        "manifests_present": sorted(manifests_present),
+        "lockfiles_present": sorted(lockfiles_present),
+    }
 
 
-def _run(cmd: list[str], cwd: Path | None = None, timeout: int = 30) -> subprocess.CompletedProcess[str]:
-    return subprocess.run(
-        cmd,
-        cwd=str(cwd) if cwd else None,
-        check=True,
-        text=True,
-        capture_output=True,
-        timeout=timeout,
+def _index_content(
+    rel_path: str, raw: bytes | None, collectors: frozenset[str] | None = None
+) -> FileResult | None:
+    """Index one tracked file: its file record plus its non-empty signal buckets.
+
+    Only ``collectors`` run (every one when None). Module-level and
+    argument-only so it can run in a process pool worker.
+    """
+    if raw is None or raw.find(b"\x00", 0, BINARY_SNIFF_BYTES) != -1:
+        return None
+    # cap huge files to keep indexing bounded
+    buf = raw[:MAX_INDEXED_FILE_BYTES] if len(raw) > MAX_INDEXED_FILE_BYTES else raw
+
+    group = _rule_group(rel_path)
+    signals = _empty_signals()
+    file_class = None
+    max_line_bytes = settings.tier1_scan_max_line_bytes
+    if max_line_bytes > 0 and _longest_line_exceeds(buf, max_line_bytes):
+        file_class, loc = "long_lines", 0
+    else:
+        rule_budget = settings.tier1_scan_file_rule_budget
+        try:
+            loc = _scan_buffer(rel_path, buf, signals, rule_budget or None, group, collectors)
+        except _ScanBudgetExceeded as exc:
+            file_class, loc = "slow_scan", exc.loc
+            signals = _empty_signals()
+    if file_class is not None:
+        # Bounded input, so the sampled rescan runs without a rule budget.
+        sample = _clip_lines(buf[:SAMPLED_FILE_BYTES], max_line_bytes)
+        _scan_buffer(rel_path, sample, signals, group=group, collectors=collectors)
+
+    record = FileRecord(
+        path=rel_path,
+        ext=PurePosixPath(rel_path).suffix.lower(),
+        loc=loc,
+        sha256=hashlib.sha256(buf).hexdigest(),
+        path_role=_path_role(rel_path.lower()),
+        file_class=file_class,
     )
+    return record, {bucket: rows for bucket, rows in signals.items() if rows}
+
+
+class _ScanBudgetExceeded(Exception):
+    """Raised by ``_scan_buffer`` over its rule budget; carries the file's LOC."""
+
+    def __init__(self, loc: int) -> None:
+        super().__init__(loc)
+        self.loc = loc
+
+
+def _longest_line_exceeds(buf: bytes, max_line_bytes: int) -> bool:
+    if len(buf) <= max_line_bytes:
+        return False
+    text = buf.replace(b"\r", b"\n") if b"\r" in buf else buf
+    return max(map(len, text.split(b"\n"))) > max_line_bytes
+
+
+def _clip_lines(buf: bytes, max_line_bytes: int) -> bytes:
+    """``buf`` with every line cut to ``max_line_bytes``; line numbers are unchanged."""
+    if max_line_bytes <= 0 or len(buf) <= max_line_bytes:
+        return buf
+    return b"\n".join(line[:max_line_bytes] for line in buf.split(b"\n"))
+
+
+@dataclass
+class _IndexStats:
+    blob_cache_hits: int = 0
+    blob_cache_misses: int = 0
+
 
+@dataclass
+class _IndexBudget:
+    """LOC and read-byte limits past which indexing stops early; None is unlimited."""
 
-def _git_ls_files(repo_dir: Path) -> list[str]:
-    result = _run(["git", "ls-files"], cwd=repo_dir, timeout=30)
-    return [line.strip() for line in result.stdout.splitlines() if line.strip()]
+    max_loc: int | None = None
+    max_bytes: int | None = None
+    loc: int = 0
+    bytes_read: int = 0
 
+    @property
+    def exceeded(self) -> bool:
+        return (self.max_loc is not None and self.loc > self.max_loc) or (
+            self.max_bytes is not None and self.bytes_read > self.max_bytes
+        )
+
+    def charge(self, result: FileResult | None, raw_bytes: int = 0) -> bool:
+        """Count one resolved file; returns whether the budget is now exceeded."""
+        if result is not None:
+            self.loc += result[0].loc
+        self.bytes_read += raw_bytes
+        return self.exceeded
+
+
+class _ObjectReader:
+    """Reads one commit's files from the repo mirror through a ``cat-file`` stream.
 
-def _clone_url_with_token(clone_url: str, token: str | None) -> str:
-    if not token:
-        return clone_url
-    if clone_url.startswith("https://"):
-        return clone_url.replace("https://", f"https://x-access-token:{token}@", 1)
-    return clone_url
+    Symlinks resolve to the blob of an in-tree target; submodules, dangling
+    links and blobs over the mirror's blob limit read as None.
+    """
+
+    def __init__(self, stream: BlobStream, entries: list[TreeEntry], missing: set[str]) -> None:
+        self._stream = stream
+        regular = {
+            entry.path: entry.object_id
+            for entry in entries
+            if entry.mode in REGULAR_FILE_MODES and entry.object_id not in missing
+        }
+        targets = self._link_targets([e for e in entries if e.mode == _SYMLINK_MODE], missing)
+        self.blob_ids: dict[str, str] = {}
+        for entry in entries:
+            if entry.mode == _SYMLINK_MODE:
+                object_id = regular.get(targets.get(entry.path, ""))
+            else:
+                object_id = regular.get(entry.path)
+            if object_id:
+                self.blob_ids[entry.path] = object_id
+
+    def iter_contents(self, paths: list[str]):
+        wanted = [self.blob_ids.get(path) for path in paths]
+        for start in range(0, len(wanted), READ_CHUNK_OBJECTS):
+            chunk = wanted[start : start + READ_CHUNK_OBJECTS]
+            blobs = self._stream.iter_blobs([object_id for object_id in chunk if object_id])
+            try:
+                for object_id in chunk:
+                    yield _within_blob_limit(next(blobs)) if object_id else None
+            finally:
+                # Drain the chunk so the stream is reusable, even when the
+                # caller stops reading early.
+                for _ in blobs:
+                    pass
+
+    def _link_targets(self, links: list[TreeEntry], missing: set[str]) -> dict[str, str]:
+        links = [link for link in links if link.object_id not in missing]
+        targets: dict[str, str] = {}
+        for link, raw in zip(links, self._stream.iter_blobs([link.object_id for link in links])):
+            if raw is None:
+                continue
+            target = raw.decode("utf-8", errors="surrogateescape")
+            if target.startswith("/"):
+                continue
+            targets[link.path] = posixpath.normpath(posixpath.join(posixpath.dirname(link.path), target))
+        return targets
+
+
+def _within_blob_limit(raw: bytes | None) -> bytes | None:
+    """Drop blobs the mirror's partial fetch would have left on the server."""
+    limit = repo_mirrors.blob_limit
+    if raw is None or (limit is not None and len(raw) > limit):
+        return None
+    return raw
+
+
+def _index_tracked_files(
+    reader,
+    files: list[str],
+    *,
+    workers: int | None = None,
+    blob_ids: dict[str, str] | None = None,
+    stats: _IndexStats | None = None,
+    sampled: dict[str, str] | None = None,
+    budget: _IndexBudget | None = None,
+    collectors: frozenset[str] | None = None,
+    progress: IndexProgress | None = None,
+) -> tuple[list[dict], dict[str, list[dict]], int]:
+    """Index ``files`` serially or across the worker pool, merging in input order.
+
+    Once ``budget`` is exceeded the remaining files are left out.
+    """
+    results = _resolve_classified_results(
+        reader,
+        files,
+        sampled or {},
+        workers=workers,
+        blob_ids=blob_ids,
+        stats=stats,
+        budget=budget,
+        collectors=collectors,
+        progress=progress,
+    )
+    return _merge_file_results(results.get(path) for path in files)
+
+
+def _reindex_changed_files(
+    reader,
+    files: list[str],
+    changed: set[str],
+    base_index: dict,
+    *,
+    blob_ids: dict[str, str] | None = None,
+    stats: _IndexStats | None = None,
+    sampled: dict[str, str] | None = None,
+    budget: _IndexBudget | None = None,
+    collectors: frozenset[str] | None = None,
+    progress: IndexProgress | None = None,
+) -> tuple[list[dict], dict[str, list[dict]], int]:
+    """Re-scan ``changed`` paths and carry every other file over from ``base_index``.
+
+    ``files`` is the full indexed list at the new commit, so deleted and
+    skipped paths drop out and the merged output is identical to a full
+    re-index. Unchanged files whose signal rows were dropped from the base
+    index's bounded sample are resolved again (usually from the blob cache).
+    Carried-over files are charged to ``budget`` first.
+    """
+    carried = _file_results_from_index(base_index)
+    changed = changed | {path for path, result in carried.items() if _signal_rows_dropped(result)}
+    if budget is not None:
+        for path in files:
+            if path not in changed:
+                budget.charge(carried.get(path))
+    to_scan = [path for path in files if path in changed]
+    if progress is not None:
+        progress.advance(len(files) - len(to_scan))
+    rescanned: dict[str, FileResult | None] = {}
+    if budget is None or not budget.exceeded:
+        rescanned = _resolve_classified_results(
+            reader,
+            to_scan,
+            sampled or {},
+            blob_ids=blob_ids,
+            stats=stats,
+            budget=budget,
+            collectors=collectors,
+            progress=progress,
+        )
+
+    return _merge_file_results(
+        rescanned.get(path) if path in changed else carried.get(path)
+        for path in files
+    )
 
 
-def _read_text(path: Path) -> str | None:
+def _resolve_classified_results(
+    reader,
+    files: list[str],
+    sampled: dict[str, str],
+    **kwargs,
+) -> dict[str, FileResult | None]:
+    """Resolve full files normally and ``sampled`` ones on their leading bytes."""
+    results = _resolve_file_results(reader, [path for path in files if path not in sampled], **kwargs)
+    sample_paths = [path for path in files if path in sampled]
+    budget = kwargs.get("budget")
+    if sample_paths and (budget is None or not budget.exceeded):
+        for rel_path, result in _resolve_file_results(
+            reader, sample_paths, sample_bytes=SAMPLED_FILE_BYTES, **kwargs
+        ).items():
+            results[rel_path] = _sampled_result(result, sampled[rel_path])
+    return results
+
+
+def _sampled_result(
+    result: FileResult | None,
+    file_class: str,
+) -> FileResult | None:
+    if result is None:
+        return None
+    record, file_signals = result
+    return replace(record, loc=0, file_class=file_class), file_signals
+
+
+def _resolve_file_results(
+    reader,
+    files: list[str],
+    *,
+    workers: int | None = None,
+    blob_ids: dict[str, str] | None = None,
+    stats: _IndexStats | None = None,
+    sample_bytes: int | None = None,
+    budget: _IndexBudget | None = None,
+    collectors: frozenset[str] | None = None,
+    progress: IndexProgress | None = None,
+) -> dict[str, FileResult | None]:
+    """Per-file results, replayed from the blob cache where possible.
+
+    Only cache misses are read (streamed in bounded batches, then indexed
+    serially or in the worker pool), and each distinct missing blob once;
+    their path-independent results are stored back under the blob id and
+    replayed for duplicate paths. Results also depend on the path's rule
+    group and on ``collectors``, which are part of the cache key. With
+    ``sample_bytes`` only each file's leading bytes are indexed, under a
+    separate cache key. Once ``budget`` is exceeded no further files are
+    resolved or read. Every resolved file is counted on ``progress``.
+    """
+    blob_ids = (blob_ids or {}) if blob_cache.enabled else {}
+    stats = stats or _IndexStats()
+    extraction_key = _extraction_key(collectors)
+    if sample_bytes is not None:
+        extraction_key += f":sample={sample_bytes}"
+
+    results: dict[str, FileResult | None] = {}
+    pending: list[str] = []
+    duplicates: dict[tuple[str, str], list[str]] = {}
+    for rel_path in files:
+        blob_id = blob_ids.get(rel_path)
+        group = _rule_group(rel_path)
+        if (blob_id, group) in duplicates:
+            duplicates[(blob_id, group)].append(rel_path)
+            continue
+        cached = blob_cache.get(blob_id, f"{extraction_key}:rules={group}") if blob_id else None
+        if cached is not None:
+            stats.blob_cache_hits += 1
+            results[rel_path] = _result_from_cached_blob(rel_path, cached)
+            if progress is not None:
+                progress.advance()
+            if budget is not None and budget.charge(results[rel_path]):
+                return results
+            continue
+        pending.append(rel_path)
+        if blob_id:
+            duplicates[(blob_id, group)] = []
+
+    if workers is None:
+        workers = _index_worker_count(len(pending))
+    signal_cap = _signal_sample_cap()
+    raw_contents = reader.iter_contents(pending)
+    contents = raw_contents
+    if sample_bytes is not None:
+        contents = (raw[:sample_bytes] if raw is not None else None for raw in raw_contents)
+    if budget is None:
+        batches = _content_batches(pending, contents)
+    else:
+        batches = _content_batches(pending, contents, BUDGET_BATCH_BYTES, BUDGET_BATCH_FILES)
     try:
-        raw = path.read_bytes()
-    except Exception:
+        for batch in batches:
+            for (rel_path, raw), result in zip(batch, _map_index_content(batch, workers, collectors)):
+                result = results[rel_path] = _cap_file_signals(result, signal_cap)
+                resolved = 1
+                blob_id = blob_ids.get(rel_path)
+                if blob_id:
+                    stats.blob_cache_misses += 1
+                    cached = _cached_blob_from_result(result)
+                    group = _rule_group(rel_path)
+                    blob_cache.put(blob_id, f"{extraction_key}:rules={group}", cached)
+                    for duplicate_path in duplicates[(blob_id, group)]:
+                        stats.blob_cache_hits += 1
+                        resolved += 1
+                        results[duplicate_path] = _result_from_cached_blob(duplicate_path, cached)
+                        if budget is not None:
+                            budget.charge(results[duplicate_path])
+                if progress is not None:
+                    progress.advance(resolved, len(raw) if raw else 0)
+                if budget is not None and budget.charge(result, len(raw) if raw else 0):
+                    return results
+    finally:
+        close = getattr(raw_contents, "close", None)
+        if close is not None:
+            close()
+
+    return results
+
+
+def _content_batches(
+    paths: list[str], contents, max_batch_bytes: int = READ_BATCH_BYTES, max_batch_files: int | None = None
+):
+    """Pair paths with streamed contents in batches of about ``max_batch_bytes`` (and ``max_batch_files``)."""
+    batch: list[tuple[str, bytes | None]] = []
+    batch_bytes = 0
+    for rel_path, raw in zip(paths, contents):
+        batch.append((rel_path, raw))
+        batch_bytes += len(raw) if raw else 0
+        if batch_bytes >= max_batch_bytes or (max_batch_files is not None and len(batch) >= max_batch_files):
+            yield batch
+            batch, batch_bytes = [], 0
+    if batch:
+        yield batch
+
+
+def _extraction_key(collectors: frozenset[str] | None = None) -> str:
+    return (
+        f"v{INDEXER_VERSION}:max_bytes={MAX_INDEXED_FILE_BYTES}"
+        f":blob_limit={repo_mirrors.blob_limit}"
+        f":signal_cap={_signal_sample_cap()}"
+        f":max_line={settings.tier1_scan_max_line_bytes}"
+        f":scan_rules={settings.tier1_scan_file_rule_budget}"
+        f":regex={_SCAN_PATTERNS.engine}"
+        f":collectors={_collectors_key(collectors)}"
+    )
+
+
+def _collectors_key(collectors: frozenset[str] | None) -> str:
+    return "all" if collectors is None else ",".join(sorted(collectors))
+
+
+def _cached_blob_from_result(result: FileResult | None) -> CachedBlob:
+    if result is None:
+        return CachedBlob(indexable=False)
+    record, file_signals = result
+    return CachedBlob(
+        indexable=True,
+        loc=record.loc,
+        sha256=record.sha256,
+        file_class=record.file_class,
+        signals={
+            bucket: [replace(row, file_path="") for row in rows]
+            for bucket, rows in file_signals.items()
+        },
+        signal_counts=dict(record.signal_counts or {}),
+    )
+
+
+def _result_from_cached_blob(
+    rel_path: str,
+    cached: CachedBlob,
+) -> FileResult | None:
+    if not cached.indexable:
         return None
-    if b"\x00" in raw:
+    record = FileRecord(
+        path=rel_path,
+        ext=Path(rel_path).suffix.lower(),
+        loc=cached.loc,
+        sha256=cached.sha256,
+        path_role=_path_role(rel_path.lower()),
+        file_class=cached.file_class,
+        signal_counts=dict(cached.signal_counts) if cached.signal_counts else None,
+    )
+    file_signals = {
+        bucket: [replace(row, file_path=rel_path) for row in rows]
+        for bucket, rows in cached.signals.items()
+    }
+    return record, file_signals
+
+
+def _merge_file_results(results) -> tuple[list[dict], dict[str, list[dict]], int]:
+    """Concatenate per-file results in order, keeping a bounded sample of each signal bucket.
+
+    This is where in-flight records become ``index_json`` dicts.
+    """
+    indexed_files: list[dict] = []
+    reservoir = _SignalReservoir(_signal_sample_cap())
+    loc_total = 0
+
+    for result in results:
+        if result is None:
+            continue
+        record, file_signals = result
+        indexed_files.append(record.as_json())
+        loc_total += record.loc
+        for bucket, rows in file_signals.items():
+            reservoir.extend(bucket, rows)
+
+    signals = {bucket: [row.as_json() for row in rows] for bucket, rows in reservoir.signals().items()}
+    return indexed_files, signals, loc_total
+
+
+# Signal buckets are bounded by keeping a deterministic bottom-k sample: every
+# row gets a rank from a hash of its path-independent fields, and the ``cap``
+# lowest-ranked rows per bucket (per auth/rate-limit class for route hints, so
+# SEC_007 and SCL_003 always have evidence) are kept in their original order.
+# A file's own bottom-k rows are a superset of its share of the repo-wide
+# sample, so capping per file first (and in the blob cache) loses nothing.
+# Exact counts live in each file entry's ``signal_counts`` and are summed into
+# ``index_json["signal_counts"]``.
+
+
+def _signal_sample_cap() -> int:
+    return max(0, int(settings.tier1_signal_bucket_cap))
+
+
+def _sample_group(bucket: str, row: SignalHit) -> tuple:
+    if row.is_route_hint:
+        return bucket, row.has_auth, row.has_rate_limit
+    return (bucket,)
+
+
+def _sample_rank(bucket: str, row: SignalHit) -> bytes:
+    key = "\0".join((bucket, str(row.line_number), str(row.match), row.snippet))
+    return hashlib.blake2b(key.encode("utf-8", errors="replace"), digest_size=8).digest()
+
+
+def _file_signal_counts(file_signals: dict[str, list[SignalHit]]) -> dict[str, int]:
+    counts = {bucket: len(rows) for bucket, rows in file_signals.items() if rows}
+    route_hints = file_signals.get("route_hints") or []
+    no_auth = sum(1 for row in route_hints if not row.has_auth)
+    no_rate_limit = sum(1 for row in route_hints if not row.has_rate_limit)
+    if no_auth:
+        counts[ROUTE_NO_AUTH_COUNT] = no_auth
+    if no_rate_limit:
+        counts[ROUTE_NO_RATE_LIMIT_COUNT] = no_rate_limit
+    return counts
+
+
+def _cap_file_signals(
+    result: FileResult | None,
+    cap: int,
+) -> FileResult | None:
+    """Record a freshly indexed file's exact ``signal_counts`` and keep its bottom-``cap`` rows."""
+    if result is None:
         return None
-    # cap huge files to keep indexing bounded
-    if len(raw) > 1_500_000:
-        raw = raw[:1_500_000]
-    return raw.decode("utf-8", errors="replace")
+    record, file_signals = result
+    counts = _file_signal_counts(file_signals)
+    if not counts:
+        return result
+    record.signal_counts = counts
+    if not cap:
+        return result
+    capped: dict[str, list[SignalHit]] = {}
+    for bucket, rows in file_signals.items():
+        if len(rows) <= cap:
+            capped[bucket] = rows
+            continue
+        groups: dict[tuple, list[tuple[bytes, int, int]]] = {}
+        for pos, row in enumerate(rows):
+            rank = (_sample_rank(bucket, row), row.line_number or 0, pos)
+            groups.setdefault(_sample_group(bucket, row), []).append(rank)
+        kept = sorted(rank[2] for ranks in groups.values() for rank in heapq.nsmallest(cap, ranks))
+        capped[bucket] = [rows[pos] for pos in kept]
+    return record, capped
+
+
+def _signal_rows_dropped(result: FileResult) -> bool:
+    """Whether a stored file's rows in the bucket sample fall short of its exact counts."""
+    record, file_signals = result
+    counts = record.signal_counts or {}
+    return any(len(file_signals.get(bucket) or []) < count for bucket, count in counts.items() if "." not in bucket)
+
+
+def _signal_totals(indexed_files: list[dict]) -> dict[str, int]:
+    totals: dict[str, int] = {}
+    for entry in indexed_files:
+        for key, count in (entry.get("signal_counts") or {}).items():
+            totals[key] = totals.get(key, 0) + count
+    return totals
+
+
+class _SignalReservoir:
+    """Bottom-``cap`` sample per bucket group, holding at most ``2 * cap`` rows per group."""
+
+    def __init__(self, cap: int) -> None:
+        self.cap = cap
+        self._groups: dict[tuple, list[tuple]] = {}
+        self._seq = 0
+
+    def extend(self, bucket: str, rows: list[SignalHit]) -> None:
+        for row in rows:
+            self._seq += 1
+            group = self._groups.setdefault(_sample_group(bucket, row), [])
+            if not self.cap:
+                group.append((self._seq, row))
+                continue
+            rank = (_sample_rank(bucket, row), row.file_path, row.line_number or 0)
+            group.append((rank, self._seq, row))
+            if len(group) >= 2 * self.cap:
+                group[:] = heapq.nsmallest(self.cap, group, key=lambda item: item[:2])
+
+    def signals(self) -> dict[str, list[SignalHit]]:
+        kept: list[tuple[int, str, SignalHit]] = []
+        for (bucket, *_), group in self._groups.items():
+            if self.cap:
+                group = [item[1:] for item in heapq.nsmallest(self.cap, group, key=lambda item: item[:2])]
+            kept.extend((seq, bucket, row) for seq, row in group)
+        kept.sort(key=lambda item: item[0])
+        signals = _empty_signals()
+        for _, bucket, row in kept:
+            signals[bucket].append(row)
+        return signals
+
+
+def _file_results_from_index(index_json: dict) -> dict[str, FileResult]:
+    """Split a stored index back into per-file ``(record, signals)`` results."""
+    results: dict[str, FileResult] = {
+        str(entry.get("path")): (FileRecord.from_json(entry), {})
+        for entry in index_json.get("files") or []
+    }
+    file_buckets = _empty_signals()
+    for bucket, rows in (index_json.get("signals") or {}).items():
+        # Linter output is per commit, not per file; it is rerun every build.
+        if bucket not in file_buckets:
+            continue
+        for row in rows:
+            result = results.get(str(row.get("file_path")))
+            if result is not None:
+                result[1].setdefault(bucket, []).append(SignalHit.from_json(row))
+    return results
+
+
+def _changed_paths(
+    git_dir: Path,
+    base_sha: str,
+    repo_sha: str,
+    *,
+    clone_url: str,
+    token: str | None = None,
+) -> set[str] | None:
+    """Return paths added or modified between two commits, or None if undiffable.
+
+    Tree-only: ``--name-status --no-renames`` compares blob ids, so no blob
+    of either commit has to be present in the mirror.
+    """
+    try:
+        repo_mirrors.ensure_commit(clone_url, base_sha, token=token, timeout=60)
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        # The diff below fails too and reports the fallback.
+        pass
+    try:
+        result = _run(
+            ["git", "diff", "--name-status", "--no-renames", "-z", base_sha, repo_sha],
+            cwd=git_dir,
+            timeout=60,
+        )
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        logger.info("Tier1 incremental diff %s..%s unavailable; indexing from scratch", base_sha, repo_sha)
+        return None
+
+    fields = result.stdout.split("\0")
+    changed: set[str] = set()
+    # -z output alternates status and path; deletions simply vanish from ls-files.
+    for status, path in zip(fields[0::2], fields[1::2]):
+        if status and status[0] != "D":
+            changed.add(path)
+    return changed
+
+
+def _map_index_content(
+    batch: list[tuple[str, bytes | None]], workers: int, collectors: frozenset[str] | None = None
+):
+    if workers > 1 and batch:
+        try:
+            pool = _index_pool(workers)
+            paths, contents = zip(*batch)
+            chunksize = max(1, len(batch) // (workers * 8))
+            # Executor.map yields in submission order, so merging stays deterministic.
+            return list(
+                pool.map(_index_content, paths, contents, [collectors] * len(batch), chunksize=chunksize)
+            )
+        except BrokenProcessPool:
+            logger.warning("Tier1 index worker pool failed; falling back to serial indexing")
+            _reset_index_pool()
+    return (_index_content(rel_path, raw, collectors) for rel_path, raw in batch)
+
+
+def _index_worker_count(file_count: int) -> int:
+    workers = int(settings.tier1_index_workers)
+    if workers <= 1 or file_count < settings.tier1_index_parallel_min_files:
+        return 0
+    return workers
+
+
+_index_pool_lock = threading.Lock()
+_index_pool_executor: ProcessPoolExecutor | None = None
+_index_pool_size = 0
+
+
+def _index_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the shared indexing pool, creating or resizing it on demand.
+
+    Workers live across builds so module import (and regex compilation) is
+    paid once per worker. The spawn context avoids forking a process that is
+    running asyncio and worker threads.
+    """
+    global _index_pool_executor, _index_pool_size
+    with _index_pool_lock:
+        if _index_pool_executor is None or _index_pool_size != workers:
+            if _index_pool_executor is not None:
+                _index_pool_executor.shutdown(wait=False)
+            _index_pool_executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _index_pool_size = workers
+        return _index_pool_executor
 
 
-def _loc_count(content: str) -> int:
-    return sum(1 for line in content.splitlines() if line.strip())
+def _reset_index_pool() -> None:
+    global _index_pool_executor, _index_pool_size
+    with _index_pool_lock:
+        if _index_pool_executor is not None:
+            _index_pool_executor.shutdown(wait=False)
+        _index_pool_executor = None
+        _index_pool_size = 0
+
+
+def _run(cmd: list[str], cwd: Path | None = None, timeout: int = 30) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        cmd,
+        cwd=str(cwd) if cwd else None,
+        check=True,
+        text=True,
+        capture_output=True,
+        timeout=timeout,
+    )
 
 
 def _is_test_path(lower_path: str) -> bool:
@@ -364,138 +1559,638 @@ def _path_role(lower_path: str) -> str:
     return "source"
 
 
-def _line_iter(content: str):
-    for idx, line in enumerate(content.splitlines(), start=1):
-        yield idx, line
+def _classify_tracked_files(reader: _ObjectReader, files: list[str], clone_url: str) -> tuple[dict[str, str], str]:
+    """Classify a commit's files before reading them; returns classes and the classifier key.
+
+    Only ``.gitattributes`` contents and blob sizes (object headers) are read.
+    """
+    attribute_paths = [path for path in files if posixpath.basename(path) == ".gitattributes"]
+    attribute_rules = _gitattribute_rules(list(zip(attribute_paths, reader.iter_contents(attribute_paths))))
+    blob_sizes = repo_mirrors.blob_sizes(clone_url, reader.blob_ids.values())
+    sizes = {path: blob_sizes[blob_id] for path, blob_id in reader.blob_ids.items() if blob_id in blob_sizes}
+    return _classify_files(files, sizes, attribute_rules), _classifier_key(reader.blob_ids, attribute_paths)
+
+
+def _classify_files(
+    files: list[str],
+    sizes: dict[str, int],
+    attribute_rules: list[tuple[re.Pattern[str], dict[str, bool | None]]],
+) -> dict[str, str]:
+    """Map each generated, vendored, minified or large-data path to its class.
+
+    ``.gitattributes`` ``linguist-generated``/``linguist-vendored`` settings
+    override the path heuristics in either direction.
+    """
+    classes: dict[str, str] = {}
+    for rel_path in files:
+        overrides: dict[str, bool | None] = {}
+        for pattern, attributes in attribute_rules:
+            if pattern.match(rel_path):
+                overrides.update(attributes)
+        file_class = classify_file(rel_path.lower(), sizes.get(rel_path), overrides)
+        if file_class:
+            classes[rel_path] = file_class
+    return classes
+
+
+def classify_file(lower_path: str, size: int | None, overrides: dict[str, bool | None]) -> str | None:
+    """Class of a file skipped from scans (vendored, generated, ...), or None for source files.
+
+    ``overrides`` holds ``.gitattributes`` linguist flags for the path.
+    """
+    vendored = overrides.get("linguist-vendored")
+    generated = overrides.get("linguist-generated")
+    if vendored or (vendored is None and _VENDORED_PATH_PATTERN.search(lower_path)):
+        return "vendored"
+    if generated or (
+        generated is None and (_GENERATED_PATH_PATTERN.search(lower_path) or _is_lockfile(lower_path))
+    ):
+        return "generated"
+    if generated is None and _MINIFIED_PATH_PATTERN.search(lower_path):
+        return "minified"
+    if (
+        size is not None
+        and size > LARGE_DATA_FILE_BYTES
+        and PurePosixPath(lower_path).suffix in _DATA_FILE_EXTENSIONS
+    ):
+        return "large_data"
+    return None
+
+
+def _gitattribute_rules(
+    sources: list[tuple[str, bytes | None]],
+) -> list[tuple[re.Pattern[str], dict[str, bool | None]]]:
+    """Parse linguist settings from ``.gitattributes`` files, lowest precedence first.
+
+    As in git, deeper files override shallower ones and later lines override
+    earlier ones; ``!attr`` (unspecified) restores the path heuristics.
+    """
+    rules: list[tuple[re.Pattern[str], dict[str, bool | None]]] = []
+    for attr_path, raw in sorted(sources, key=lambda source: (source[0].count("/"), source[0])):
+        if raw is None:
+            continue
+        base = posixpath.dirname(attr_path)
+        for line in raw.decode("utf-8", errors="replace").splitlines():
+            fields = line.split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            attributes: dict[str, bool | None] = {}
+            for field in fields[1:]:
+                name, _, value = field.lstrip("-!").partition("=")
+                if name not in _LINGUIST_ATTRIBUTES:
+                    continue
+                if field.startswith("!"):
+                    attributes[name] = None
+                elif field.startswith("-"):
+                    attributes[name] = False
+                else:
+                    attributes[name] = value.lower() not in {"false", "0"}
+            pattern = _gitattribute_pattern(fields[0], base) if attributes else None
+            if pattern is not None:
+                rules.append((pattern, attributes))
+    return rules
+
+
+def _gitattribute_pattern(pattern: str, base: str) -> re.Pattern[str] | None:
+    """Translate a gitattributes path pattern into a full-path regex."""
+    if pattern.endswith("/"):
+        # Directory patterns never match files in .gitattributes.
+        return None
+    anchored = "/" in pattern
+    pattern = pattern.removeprefix("/")
+    parts: list[str] = []
+    idx = 0
+    while idx < len(pattern):
+        if pattern.startswith("**/", idx):
+            parts.append("(?:.*/)?")
+            idx += 3
+        elif pattern.startswith("/**", idx) and idx + 3 == len(pattern):
+            parts.append("/.*")
+            idx += 3
+        elif pattern.startswith("**", idx):
+            parts.append(".*")
+            idx += 2
+        elif pattern[idx] == "*":
+            parts.append("[^/]*")
+            idx += 1
+        elif pattern[idx] == "?":
+            parts.append("[^/]")
+            idx += 1
+        elif pattern[idx] == "[" and "]" in pattern[idx + 2 :]:
+            end = pattern.index("]", idx + 2)
+            body = pattern[idx + 1 : end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append("[" + body.replace("\\", "\\\\") + "]")
+            idx = end + 1
+        else:
+            parts.append(re.escape(pattern[idx]))
+            idx += 1
+    prefix = re.escape(base + "/") if base else ""
+    try:
+        return re.compile(prefix + ("" if anchored else "(?:.*/)?") + "".join(parts) + r"\Z")
+    except re.error:
+        return None
 
 
-def _add_signal(bucket: list[dict], file_path: str, line_number: int, snippet: str, match: str) -> None:
-    bucket.append(
-        {
-            "file_path": file_path,
-            "line_number": line_number,
-            "snippet": snippet.strip()[:240],
-            "match": match[:120],
-        }
-    )
+def _classifier_key(blob_ids: dict[str, str], attribute_paths: list[str]) -> str:
+    """Fingerprint of the classification inputs beyond path and blob identity."""
+    digest = hashlib.sha256()
+    for rel_path in sorted(attribute_paths):
+        digest.update(f"{rel_path}\0{blob_ids.get(rel_path, '')}\n".encode("utf-8", errors="surrogateescape"))
+    return digest.hexdigest()
+
+
+def _file_class_facts(file_classes: dict[str, str], indexed_files: list[dict]) -> dict:
+    counts = {name: 0 for name in (*SKIPPED_FILE_CLASSES, *SAMPLED_FILE_CLASSES, *DOWNGRADED_FILE_CLASSES)}
+    for file_class in file_classes.values():
+        counts[file_class] += 1
+    for entry in indexed_files:
+        if entry.get("file_class") in DOWNGRADED_FILE_CLASSES:
+            counts[entry["file_class"]] += 1
+    return {
+        "file_classes": counts,
+        "files_skipped": sum(counts[name] for name in SKIPPED_FILE_CLASSES),
+        "files_sampled": sum(counts[name] for name in SAMPLED_FILE_CLASSES),
+        "files_downgraded": sum(counts[name] for name in DOWNGRADED_FILE_CLASSES),
+    }
 
 
-def _collect_secret_signals(file_path: str, content: str, signals: dict[str, list[dict]]) -> None:
-    for line_no, line in _line_iter(content):
-        for name, pattern in SECRET_PATTERNS:
-            m = pattern.search(line)
+def _add_signal(bucket: list[SignalHit], file_path: str, line_number: int, snippet: str, match: str) -> None:
+    bucket.append(SignalHit(file_path, line_number, snippet.strip()[:240], match[:120]))
+
+
+def _candidate_lines(
+    content: str, group: str | None = None, collectors: frozenset[str] | None = None
+) -> list[tuple[int, list[int]]]:
+    """Map anchor hits to ``(line index, sorted rule ids)`` for ``content.splitlines()``."""
+    # With every separator rewritten to "\n", line N of ``content.splitlines()``
+    # is the text after the N-th "\n", so offsets map to lines by counting.
+    text = content
+    if any(ch in content for ch in _EXTRA_LINE_BREAK_CHARS):
+        text = _EXTRA_LINE_BREAKS.sub("\n", content)
+    folded_text: str | None = None
+
+    hits: list[tuple[int, tuple[int, ...]]] = []
+    for anchor, folded, rule_ids in _anchor_tables(collectors)[0][group]:
+        haystack = text
+        if folded:
+            if folded_text is None:
+                folded_text = (
+                    text.lower() if text.isascii() else text.translate(_IGNORECASE_ASCII_MAP).lower()
+                )
+            haystack = folded_text
+        pos = haystack.find(anchor)
+        while pos != -1:
+            hits.append((pos, rule_ids))
+            pos = haystack.find(anchor, pos + 1)
+
+    if not hits:
+        return []
+
+    hits.sort(key=lambda hit: hit[0])
+    candidates: list[tuple[int, set[int]]] = []
+    line_idx = 0
+    prev = 0
+    for offset, rule_ids in hits:
+        line_idx += text.count("\n", prev, offset)
+        prev = offset
+        if candidates and candidates[-1][0] == line_idx:
+            candidates[-1][1].update(rule_ids)
+        else:
+            candidates.append((line_idx, set(rule_ids)))
+    return [(line_idx, sorted(rule_ids)) for line_idx, rule_ids in candidates]
+
+
+def _scan_buffer(
+    file_path: str,
+    buf: bytes,
+    signals: dict[str, list[SignalHit]],
+    max_evaluations: int | None = None,
+    group: str | None = None,
+    collectors: frozenset[str] | None = None,
+) -> int:
+    """Fused extraction over raw UTF-8 bytes; returns the file's LOC.
+
+    Output is identical to running every rule over each line of
+    ``buf.decode("utf-8", errors="replace").splitlines()`` and counting its
+    non-blank lines, but only lines that hit an anchor are materialized and
+    decoded. ASCII lines are matched with the
+    byte patterns; the few lines holding non-ASCII text (or \\x1f) are decoded
+    one by one and go through the str path. Only the rules dispatched to
+    ``group`` and named in ``collectors`` run (None meaning every rule).
+    When the anchor hits would take more than ``max_evaluations`` rule
+    evaluations it raises ``_ScanBudgetExceeded`` before evaluating any.
+    """
+    # Every ASCII separator becomes "\n", so line tokens are "\n"-delimited;
+    # UTF-8 never uses ASCII bytes inside a multi-byte sequence.
+    if any(char in buf for char in _BYTES_LINE_BREAK_CHARS):
+        text = _BYTES_LINE_BREAKS.sub(b"\n", buf)
+    else:
+        text = buf
+
+    # Non-ASCII tokens may split further at \x85, \u2028 or \u2029, shifting the
+    # line numbers of every later token.
+    special: dict[int, list[str]] = {}
+    shift_tokens: list[int] = []
+    shift_totals: list[int] = []
+    if not text.isascii() or b"\x1f" in text:
+        token_idx = 0
+        prev = 0
+        for m in _BYTES_SPECIAL_LINE.finditer(text):
+            token_idx += text.count(b"\n", prev, m.start())
+            prev = m.start()
+            sublines = _UNICODE_LINE_BREAKS.split(m.group().decode("utf-8", errors="replace"))
+            special[token_idx] = sublines
+            if len(sublines) > 1:
+                shift_tokens.append(token_idx)
+                shift_totals.append((shift_totals[-1] if shift_totals else 0) + len(sublines) - 1)
+
+    def line_index(token_idx: int) -> int:
+        pos = bisect.bisect_left(shift_tokens, token_idx)
+        return token_idx + (shift_totals[pos - 1] if pos else 0)
+
+    # Outside special tokens the only whitespace left is spaces and tabs.
+    tokens = text.translate(None, b" \t").split(b"\n")
+    loc = len(tokens) - tokens.count(b"")
+    del tokens
+    for sublines in special.values():
+        loc += sum(1 for line in sublines if line.strip()) - 1
+
+    candidates: list[tuple[int, list[int], bytes | str]] = []
+    for token_idx, (start, rule_ids) in _candidate_tokens(text, group, collectors).items():
+        if token_idx in special:
+            continue
+        end = text.find(b"\n", start)
+        candidates.append((line_index(token_idx), sorted(rule_ids), text[start : end if end != -1 else len(text)]))
+    for token_idx, sublines in special.items():
+        first_line = line_index(token_idx)
+        for sub_idx, rule_ids in _candidate_lines("\n".join(sublines), group, collectors):
+            candidates.append((first_line + sub_idx, rule_ids, sublines[sub_idx]))
+    if max_evaluations is not None and sum(len(rule_ids) for _, rule_ids, _ in candidates) > max_evaluations:
+        raise _ScanBudgetExceeded(loc)
+    candidates.sort(key=lambda candidate: candidate[0])
+
+    patterns = _SCAN_PATTERNS
+    route_lines: list[int] = []
+    for line_idx, rule_ids, line in candidates:
+        idx = line_idx + 1
+        is_bytes = isinstance(line, bytes)
+        for rule_id in rule_ids:
+            if rule_id == _ROUTE_RULE_ID:
+                if any(p.search(line) for p in (patterns.route_bytes if is_bytes else patterns.route)):
+                    route_lines.append(idx)
+                continue
+            rule = LINE_RULES[rule_id]
+            m = (patterns.line_bytes if is_bytes else patterns.line)[rule_id].search(line)
             if m:
-                _add_signal(signals["secret_matches"], file_path, line_no, line, name)
-        if "BEGIN PRIVATE KEY" in line or "BEGIN RSA PRIVATE KEY" in line:
-            _add_signal(signals["private_key_matches"], file_path, line_no, line, "private_key")
-
-
-def _collect_cors_signals(file_path: str, content: str, signals: dict[str, list[dict]]) -> None:
-    lower = content.lower()
-    has_wildcard = "allow_origins=['*'" in lower or 'allow_origins=["*"' in lower or "origin: '*'" in lower
-    has_credentials = "allow_credentials=true" in lower or "credentials: true" in lower
-    if has_wildcard and has_credentials:
-        _add_signal(
-            signals["insecure_cors_matches"],
-            file_path,
-            1,
-            "Wildcard origin with credentials appears enabled.",
-            "cors_wildcard_with_credentials",
+                match = m.group(1) if rule.match_group else rule.name
+                _add_signal(
+                    signals[rule.bucket],
+                    file_path,
+                    idx,
+                    line.decode("ascii") if is_bytes else line,
+                    match.decode("ascii") if isinstance(match, bytes) else match,
+                )
+
+    # Lowercasing never turns non-ASCII text into these ASCII needles, so the
+    # byte check agrees with searching the decoded text.
+    if (collectors is None or "cors" in collectors) and (b"'*'" in text or b'"*"' in text):
+        lower = text.lower()
+        if any(n.encode("ascii") in lower for n in _CORS_WILDCARD_NEEDLES) and any(
+            n.encode("ascii") in lower for n in _CORS_CREDENTIAL_NEEDLES
+        ):
+            _add_cors_signal(file_path, signals)
+
+    if route_lines:
+        lines: list[bytes | str] = text.split(b"\n")
+        for token_idx in sorted(special, reverse=True):
+            lines[token_idx : token_idx + 1] = special[token_idx]
+        if lines and not lines[-1]:
+            lines.pop()
+        # Only the lines inside a route window are ever read (and decoded).
+        _append_route_hints(file_path, lines, route_lines, signals)
+
+    return loc
+
+
+def _candidate_tokens(
+    text: bytes, group: str | None = None, collectors: frozenset[str] | None = None
+) -> dict[int, tuple[int, set[int]]]:
+    """Map anchor hits in "\n"-delimited ``text`` to ``{token index: (start, rule ids)}``."""
+    folded_text: bytes | None = None
+    hits: list[tuple[int, tuple[int, ...]]] = []
+    for anchor, folded, rule_ids in _anchor_tables(collectors)[1][group]:
+        haystack = text
+        if folded:
+            if folded_text is None:
+                folded_text = text.lower()
+            haystack = folded_text
+        pos = haystack.find(anchor)
+        while pos != -1:
+            hits.append((pos, rule_ids))
+            pos = haystack.find(anchor, pos + 1)
+
+    hits.sort(key=lambda hit: hit[0])
+    candidates: dict[int, tuple[int, set[int]]] = {}
+    token_idx = 0
+    prev = 0
+    for offset, rule_ids in hits:
+        token_idx += text.count(b"\n", prev, offset)
+        prev = offset
+        if token_idx in candidates:
+            candidates[token_idx][1].update(rule_ids)
+        else:
+            candidates[token_idx] = (text.rfind(b"\n", 0, offset) + 1, set(rule_ids))
+    return candidates
+
+
+def _route_window(idx: int, line_count: int) -> tuple[int, int]:
+    """The ``[start, end)`` line positions whose auth/rate hints apply to the route on line ``idx``."""
+    return max(0, idx - 5), min(line_count, idx + 15)
+
+
+def _append_route_hints(
+    file_path: str,
+    lines: list[bytes | str],
+    route_lines: list[int],
+    signals: dict[str, list[SignalHit]],
+) -> None:
+    """Append one ``route_hints`` row per line in ascending ``route_lines``.
+
+    Neither hint pattern can match across a line break, so searching a
+    route's joined window equals asking whether any of its lines match. Each
+    line covered by some window is searched once, and every window is then
+    answered by bisecting the sorted hit positions, keeping route-dense files
+    linear. ASCII ``bytes`` lines are decoded in place as they are reached.
+    """
+    auth_hits: list[int] = []
+    rate_hits: list[int] = []
+    covered = 0
+    for idx in route_lines:
+        start, end = _route_window(idx, len(lines))
+        for pos in range(max(start, covered), end):
+            line = lines[pos]
+            if isinstance(line, bytes):
+                line = lines[pos] = line.decode("ascii")
+            if _SCAN_PATTERNS.auth_hint.search(line):
+                auth_hits.append(pos)
+            if _SCAN_PATTERNS.rate_hint.search(line):
+                rate_hits.append(pos)
+        covered = max(covered, end)
+
+    for idx in route_lines:
+        start, end = _route_window(idx, len(lines))
+        signals["route_hints"].append(
+            SignalHit(
+                file_path,
+                idx,
+                lines[idx - 1].strip()[:240],
+                has_auth=_any_hit_between(auth_hits, start, end),
+                has_rate_limit=_any_hit_between(rate_hits, start, end),
+            )
         )
 
 
-def _collect_dangerous_exec_signals(file_path: str, content: str, signals: dict[str, list[dict]]) -> None:
-    for line_no, line in _line_iter(content):
-        for name, pattern in DANGEROUS_PATTERNS:
-            if pattern.search(line):
-                _add_signal(signals["dangerous_exec_matches"], file_path, line_no, line, name)
+def _any_hit_between(hits: list[int], start: int, end: int) -> bool:
+    pos = bisect.bisect_left(hits, start)
+    return pos < len(hits) and hits[pos] < end
 
 
-def _collect_sql_signals(file_path: str, content: str, signals: dict[str, list[dict]]) -> None:
-    for line_no, line in _line_iter(content):
-        for name, pattern in SQL_PATTERNS:
-            if pattern.search(line):
-                _add_signal(signals["sql_matches"], file_path, line_no, line, name)
+def _add_cors_signal(file_path: str, signals: dict[str, list[SignalHit]]) -> None:
+    _add_signal(
+        signals["insecure_cors_matches"],
+        file_path,
+        1,
+        "Wildcard origin with credentials appears enabled.",
+        "cors_wildcard_with_credentials",
+    )
 
 
-def _collect_route_signals(file_path: str, content: str, signals: dict[str, list[dict]]) -> None:
-    lines = content.splitlines()
-    for idx, line in enumerate(lines, start=1):
-        if not any(p.search(line) for p in ROUTE_PATTERNS):
-            continue
+def _linter_probes_for_commit(
+    clone_url: str,
+    repo_sha: str,
+    token: str | None,
+    scan_id: UUID | None,
+    files: list[str],
+) -> tuple[list[dict], list[dict]]:
+    """Run the installed linters relevant to ``files``; returns probes and lint issues.
+
+    Only linters need a working tree, so the commit is checked out on demand.
+    """
+    extensions = {PurePosixPath(path).suffix.lower() for path in files}
+    tools = [
+        tool_name
+        for tool_name in LINTER_COMMANDS
+        if not LINTER_EXTENSIONS[tool_name].isdisjoint(extensions) and shutil.which(tool_name)
+    ]
+    if not tools:
+        return [], []
+
+    workspace_root = Path("/tmp") / "clarity-check" / "tier1" / str(scan_id or uuid4())
+    try:
+        with repo_mirrors.worktree(clone_url, repo_sha, workspace_root / "repo", token=token) as repo_dir:
+            return _run_linter_probes(repo_dir, tools)
+    finally:
+        shutil.rmtree(workspace_root, ignore_errors=True)
 
-        window = "\n".join(lines[max(0, idx - 5) : min(len(lines), idx + 15)])
-        has_auth = bool(AUTH_HINT_PATTERN.search(window))
-        has_rate_limit = bool(RATE_HINT_PATTERN.search(window))
-        signals["route_hints"].append(
-            {
-                "file_path": file_path,
-                "line_number": idx,
-                "snippet": line.strip()[:240],
-                "has_auth": has_auth,
-                "has_rate_limit": has_rate_limit,
-            }
-        )
 
+def _run_linter_probes(repo_dir: Path, tools: list[str]) -> tuple[list[dict], list[dict]]:
+    """Run ``tools`` concurrently within the overall linter budget.
 
-def _collect_env_signals(file_path: str, content: str, signals: dict[str, list[dict]]) -> None:
-    for line_no, line in _line_iter(content):
-        m = ENV_USAGE_PATTERN.search(line)
-        if m:
-            _add_signal(signals["env_usage"], file_path, line_no, line, m.group(1))
+    Called from the indexing worker thread, so it owns a private event loop.
+    """
+    return asyncio.run(_run_linter_probes_async(repo_dir, tools))
 
 
-def _collect_error_logging_signals(file_path: str, content: str, signals: dict[str, list[dict]]) -> None:
-    for line_no, line in _line_iter(content):
-        for name, pattern in WEAK_ERROR_LOGGING_PATTERNS:
-            if pattern.search(line):
-                _add_signal(signals["weak_error_logging"], file_path, line_no, line, name)
+async def _run_linter_probes_async(repo_dir: Path, tools: list[str]) -> tuple[list[dict], list[dict]]:
+    procs: list[subprocess.Popen] = []
+    tasks = {tool_name: asyncio.create_task(_run_linter(tool_name, repo_dir, procs)) for tool_name in tools}
+    budget = float(settings.tier1_linter_budget_seconds)
+    pending: set[asyncio.Task] = set()
+    try:
+        _, pending = await asyncio.wait(tasks.values(), timeout=budget)
+    finally:
+        for task in pending:
+            task.cancel()
+        # Cancelling a task does not stop its child; kill every probe still running.
+        for proc in procs:
+            if proc.poll() is None:
+                proc.kill()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
 
+    probes: list[dict] = []
+    issues: list[dict] = []
+    for tool_name, task in tasks.items():
+        if task in pending:
+            probes.append({"tool": tool_name, "error": f"timed out after {budget:g}s", "timed_out": True})
+            continue
+        exc = task.exception()
+        if exc is not None:
+            probes.append({"tool": tool_name, "error": str(exc)})
+            continue
+        probe, tool_issues = task.result()
+        probes.append(probe)
+        issues.extend(tool_issues)
+    return probes, issues
+
+
+async def _run_linter(tool_name: str, repo_dir: Path, procs: list[subprocess.Popen]) -> tuple[dict, list[dict]]:
+    cpu_seconds = int(settings.tier1_linter_cpu_seconds)
+    # Popen rather than preexec_fn: probes start from worker threads, where forking
+    # into a Python callback can deadlock the child before it execs.
+    proc = subprocess.Popen(
+        LINTER_COMMANDS[tool_name],
+        cwd=str(repo_dir),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    procs.append(proc)
+    if cpu_seconds > 0:
+        _limit_cpu(proc.pid, cpu_seconds)
+    stdout, stderr = await asyncio.to_thread(proc.communicate)
+    if proc.returncode == -signal.SIGXCPU:
+        return {"tool": tool_name, "error": f"exceeded {cpu_seconds}s CPU limit"}, []
+
+    issues = _parse_linter_output(tool_name, stdout.decode("utf-8", errors="replace"), repo_dir)
+    probe = {
+        "tool": tool_name,
+        "exit_code": int(proc.returncode or 0),
+        "issue_count": len(issues),
+        "stderr": stderr.decode("utf-8", errors="replace")[:4_000],
+    }
+    return probe, issues[:MAX_LINT_ISSUES_PER_TOOL]
 
-def _collect_sync_blocking_signals(file_path: str, content: str, signals: dict[str, list[dict]]) -> None:
-    for line_no, line in _line_iter(content):
-        for name, pattern in SYNC_BLOCKING_PATTERNS:
-            if pattern.search(line):
-                _add_signal(signals["blocking_sync"], file_path, line_no, line, name)
 
+def _limit_cpu(pid: int, seconds: int) -> None:
+    # SIGXCPU stops a linter past its CPU budget; the hard limit SIGKILLs one that ignores it.
+    try:
+        resource.prlimit(pid, resource.RLIMIT_CPU, (seconds, seconds + 1))
+    except ProcessLookupError:
+        pass
 
-def _run_linter_probes(repo_dir: Path) -> list[dict]:
-    probes: list[dict] = []
-    commands = {
-        "ruff": ["ruff", "check", ".", "--output-format", "json"],
-        "eslint": ["eslint", ".", "-f", "json"],
-        "bandit": ["bandit", "-r", ".", "-f", "json"],
-        "semgrep": ["semgrep", "--config", "auto", "--json", "."],
-    }
 
-    for tool_name, cmd in commands.items():
-        if shutil.which(tool_name) is None:
-            continue
-        try:
-            result = subprocess.run(
-                cmd,
-                cwd=str(repo_dir),
-                text=True,
-                capture_output=True,
-                timeout=20,
-                check=False,
+def _parse_linter_output(tool_name: str, stdout: str, repo_dir: Path) -> list[dict]:
+    """Parse a linter's JSON report into compact issue rows; unparseable output yields none."""
+    try:
+        report = json.loads(stdout) if stdout.strip() else None
+    except ValueError:
+        return []
+    if report is None:
+        return []
+
+    issues: list[dict] = []
+    if tool_name == "ruff" and isinstance(report, list):
+        for item in report:
+            issues.append(
+                _lint_issue(
+                    tool_name,
+                    item.get("filename"),
+                    (item.get("location") or {}).get("row"),
+                    item.get("code") or "syntax-error",
+                    "error" if not item.get("code") else "warning",
+                    item.get("message"),
+                    repo_dir,
+                )
             )
-            probes.append(
-                {
-                    "tool": tool_name,
-                    "exit_code": int(result.returncode),
-                    "stdout": (result.stdout or "")[:40_000],
-                    "stderr": (result.stderr or "")[:4_000],
-                }
+    elif tool_name == "eslint" and isinstance(report, list):
+        for file_report in report:
+            for item in file_report.get("messages") or []:
+                issues.append(
+                    _lint_issue(
+                        tool_name,
+                        file_report.get("filePath"),
+                        item.get("line"),
+                        item.get("ruleId") or "parse-error",
+                        "error" if item.get("severity") == 2 else "warning",
+                        item.get("message"),
+                        repo_dir,
+                    )
+                )
+    elif tool_name == "bandit" and isinstance(report, dict):
+        for item in report.get("results") or []:
+            issues.append(
+                _lint_issue(
+                    tool_name,
+                    item.get("filename"),
+                    item.get("line_number"),
+                    item.get("test_id"),
+                    _LINT_SEVERITIES.get(str(item.get("issue_severity") or "").upper(), "warning"),
+                    item.get("issue_text"),
+                    repo_dir,
+                )
             )
-        except Exception as exc:
-            probes.append({"tool": tool_name, "error": str(exc)})
+    elif tool_name == "semgrep" and isinstance(report, dict):
+        for item in report.get("results") or []:
+            extra = item.get("extra") or {}
+            issues.append(
+                _lint_issue(
+                    tool_name,
+                    item.get("path"),
+                    (item.get("start") or {}).get("line"),
+                    item.get("check_id"),
+                    _LINT_SEVERITIES.get(str(extra.get("severity") or "").upper(), "warning"),
+                    extra.get("message"),
+                    repo_dir,
+                )
+            )
+    return issues
+
+
+_LINT_SEVERITIES = {
+    "HIGH": "error",
+    "ERROR": "error",
+    "MEDIUM": "warning",
+    "WARNING": "warning",
+    "LOW": "info",
+    "INFO": "info",
+}
+
+
+def _lint_issue(
+    tool_name: str,
+    file_path: object,
+    line_number: object,
+    rule: object,
+    severity: str,
+    message: object,
+    repo_dir: Path,
+) -> dict:
+    path = str(file_path or "")
+    if path.startswith(str(repo_dir)):
+        path = path[len(str(repo_dir)) :].lstrip("/")
+    return {
+        "file_path": path.removeprefix("./") or "unknown",
+        "line_number": line_number if isinstance(line_number, int) else None,
+        "tool": tool_name,
+        "rule": str(rule or "unknown"),
+        "severity": severity,
+        "message": str(message or "").strip()[:200],
+    }
+
+
+def _git_metadata_for_commit(clone_url: str, repo_sha: str, token: str | None) -> dict:
+    """Fetch blob-less history behind the indexed commit, then summarize it."""
+    try:
+        git_dir = repo_mirrors.ensure_history(
+            clone_url,
+            repo_sha,
+            token=token,
+            depth=settings.tier1_git_history_depth,
+        )
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        logger.info("Tier1 history fetch for %s failed; summarizing the history present", repo_sha)
+        git_dir = repo_mirrors.mirror_path(clone_url)
+    return _collect_git_metadata(git_dir, repo_sha)
 
-    return probes
 
+def _collect_git_metadata(repo_dir: Path, rev: str = "HEAD", timeout: int = 30) -> dict:
+    """Collect lightweight git history metadata for report context.
 
-def _collect_git_metadata(repo_dir: Path) -> dict:
-    """Collect lightweight git history metadata for report context."""
+    One streamed ``git log --name-only`` pass over the window yields the
+    latest commit time, commit count, contributors and per-file churn.
+    """
     metadata = {
         "history_available": False,
         "commit_count_90d": 0,
@@ -503,61 +2198,67 @@ def _collect_git_metadata(repo_dir: Path) -> dict:
         "top_churn_files_90d": [],
         "latest_commit_at": None,
     }
+    commit_total = 0
+    names: set[str] = set()
+    counts: dict[str, int] = {}
     try:
-        latest = subprocess.run(
-            ["git", "log", "-1", "--format=%cI"],
+        proc = subprocess.Popen(
+            [
+                "git",
+                "log",
+                f"--since={GIT_HISTORY_WINDOW}",
+                # No rename detection: inexact renames would read (and, in a
+                # partial clone, lazily fetch) blob contents.
+                "--name-only",
+                "--no-renames",
+                f"--format={_GIT_LOG_COMMIT_MARKER}%cI%x1f%an",
+                rev,
+            ],
             cwd=str(repo_dir),
             text=True,
-            capture_output=True,
-            timeout=15,
-            check=False,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
         )
-        latest_commit_at = (latest.stdout or "").strip()
-        if latest_commit_at:
-            metadata["latest_commit_at"] = latest_commit_at
+        timer = threading.Timer(timeout, proc.kill)
+        timer.start()
+        try:
+            for line in proc.stdout or ():
+                if line.startswith(_GIT_LOG_COMMIT_MARKER):
+                    committed_at, _, author = line[1:].rstrip("\n").partition("\x1f")
+                    commit_total += 1
+                    if metadata["latest_commit_at"] is None and committed_at.strip():
+                        metadata["latest_commit_at"] = committed_at.strip()
+                    if author.strip():
+                        names.add(author.strip())
+                    continue
+                path = line.strip()
+                if path:
+                    counts[path] = counts.get(path, 0) + 1
+        finally:
+            timer.cancel()
+            if proc.stdout is not None:
+                proc.stdout.close()
+            proc.wait()
+        if proc.returncode != 0:
+            # Killed at the timeout or no such revision: partial counts would mislead.
+            return metadata
+
+        if commit_total == 0:
+            # Nothing inside the window; the tip commit is still the latest.
+            latest = subprocess.run(
+                ["git", "log", "-1", "--format=%cI", rev],
+                cwd=str(repo_dir),
+                text=True,
+                capture_output=True,
+                timeout=15,
+                check=False,
+            )
+            latest_commit_at = (latest.stdout or "").strip()
+            if latest_commit_at:
+                metadata["latest_commit_at"] = latest_commit_at
 
-        commit_count = subprocess.run(
-            ["git", "rev-list", "--count", "--since=90.days", "HEAD"],
-            cwd=str(repo_dir),
-            text=True,
-            capture_output=True,
-            timeout=20,
-            check=False,
-        )
-        count_raw = (commit_count.stdout or "").strip()
-        commit_total = int(count_raw) if count_raw.isdigit() else 0
         metadata["commit_count_90d"] = commit_total
-
-        contributors = subprocess.run(
-            ["git", "log", "--since=90.days", "--format=%an"],
-            cwd=str(repo_dir),
-            text=True,
-            capture_output=True,
-            timeout=20,
-            check=False,
-        )
-        names = {
-            line.strip()
-            for line in (contributors.stdout or "").splitlines()
-            if line.strip()
-        }
         metadata["contributors_90d"] = len(names)
-
-        churn = subprocess.run(
-            ["git", "log", "--since=90.days", "--name-only", "--pretty=format:"],
-            cwd=str(repo_dir),
-            text=True,
-            capture_output=True,
-            timeout=30,
-            check=False,
-        )
-        counts: dict[str, int] = {}
-        for line in (churn.stdout or "").splitlines():
-            path = line.strip()
-            if not path:
-                continue
-            counts[path] = counts.get(path, 0) + 1
-
         top = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:10]
         metadata["top_churn_files_90d"] = [
             {"file_path": path, "touch_count": touches}
@@ -2,16 +2,21 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
 from datetime import datetime, timezone
 from typing import Any, Callable
 from uuid import UUID
 
+from config import settings
 from models.agent_log import AgentLogEntry, AgentName, LogLevel, SSEEventType
 from models.findings import AuditReport, Category, Finding, FindingSource, Severity
 from models.scan import PrimerResult
 from services.github import get_head_sha, get_repo_info, parse_repo_url
+from tier1.contracts import Tier1Finding
+from tier1.index_progress import IndexProgress
+from tier1.index_service import index_service
 from tier1.indexer import DeterministicIndexer
 from tier1.reporter import Tier1Reporter
 from tier1.scanner import DeterministicScanner
@@ -19,6 +24,48 @@ from tier1.scanner import DeterministicScanner
 logger = logging.getLogger(__name__)
 
 
+_PHASE_MESSAGES = {
+    "clone": "Fetching the commit into the repository mirror.",
+    "checkout": "Listing and classifying tracked files.",
+    "linters": "Running linter probes.",
+    "git-history": "Reading recent git history.",
+}
+
+
+def score_findings(findings: list) -> dict:
+    """Health and per-category scores (0-100) from severity penalties on open findings."""
+    penalties = {
+        "critical": 18,
+        "high": 10,
+        "medium": 6,
+        "low": 3,
+    }
+
+    scores = {
+        "security": 100,
+        "reliability": 100,
+        "scalability": 100,
+    }
+
+    for finding in findings:
+        if finding.status == "pass":
+            continue
+        penalty = penalties.get(finding.severity, 4)
+        if finding.status == "warn":
+            penalty = max(1, penalty // 2)
+        category = finding.category
+        scores[category] = max(0, scores.get(category, 100) - penalty)
+
+    health_score = round((scores["security"] + scores["reliability"] + scores["scalability"]) / 3)
+
+    return {
+        "health_score": int(health_score),
+        "security_score": int(scores["security"]),
+        "reliability_score": int(scores["reliability"]),
+        "scalability_score": int(scores["scalability"]),
+    }
+
+
 class Tier1Orchestrator:
     def __init__(
         self,
@@ -33,6 +80,8 @@ class Tier1Orchestrator:
         github_token: str | None,
         user_preferences: dict | None = None,
         run_context: dict | None = None,
+        clone_url: str | None = None,
+        repo_sha: str | None = None,
     ) -> None:
         self.scan_id = scan_id
         self.repo_url = repo_url
@@ -44,9 +93,12 @@ class Tier1Orchestrator:
         self.github_token = github_token
         self.user_preferences = user_preferences
         self.run_context = run_context or {}
+        # Commit resolved by the audit preflight, so the run indexes the same one.
+        self.clone_url = clone_url
+        self.repo_sha = repo_sha
 
-        self.indexer = DeterministicIndexer()
-        self.scanner = DeterministicScanner()
+        self.scanner = DeterministicScanner(profile=settings.tier1_check_profile)
+        self.indexer = DeterministicIndexer(plan=self.scanner.plan)
         self.reporter = Tier1Reporter()
 
     def _log(
@@ -68,18 +120,51 @@ class Tier1Orchestrator:
             )
         )
 
+    def _log_index_progress(self, snapshot: dict) -> None:
+        phase = snapshot["phase"]
+        if phase == "index":
+            message = (
+                f"Indexed {snapshot['files_done']}/{snapshot['files_total']} files "
+                f"({snapshot['bytes_read'] / (1024 * 1024):.1f} MB read)."
+            )
+        else:
+            message = _PHASE_MESSAGES.get(phase, f"Indexing phase: {phase}.")
+        self._log(
+            event_type=SSEEventType.agent_log,
+            agent=AgentName.scanner,
+            message=message,
+            data={"index_progress": snapshot},
+        )
+
+    def _log_finding(self, finding: Tier1Finding) -> None:
+        if finding.status == "pass":
+            return
+        data = finding.model_dump(mode="json")
+        if finding.evidence:
+            data["file_path"] = finding.evidence[0].file_path
+        self._log(
+            event_type=SSEEventType.finding,
+            agent=AgentName.scanner,
+            message=f"[{finding.severity.upper()}] {finding.title}",
+            level=LogLevel.warn if finding.status == "fail" else LogLevel.info,
+            data=data,
+        )
+
     async def run(self) -> dict:
         run_started_perf = time.perf_counter()
         run_started_at = datetime.now(timezone.utc).isoformat()
 
-        owner, repo = await parse_repo_url(self.repo_url)
-        repo_info = await get_repo_info(owner, repo, self.github_token)
-        repo_sha = await get_head_sha(
-            owner,
-            repo,
-            repo_info.default_branch,
-            self.github_token,
-        )
+        clone_url, repo_sha = self.clone_url, self.repo_sha
+        if not clone_url or not repo_sha:
+            owner, repo = await parse_repo_url(self.repo_url)
+            repo_info = await get_repo_info(owner, repo, self.github_token)
+            clone_url = repo_info.clone_url
+            repo_sha = await get_head_sha(
+                owner,
+                repo,
+                repo_info.default_branch,
+                self.github_token,
+            )
 
         self._log(
             event_type=SSEEventType.agent_start,
@@ -88,15 +173,23 @@ class Tier1Orchestrator:
             data={"repo_sha": repo_sha},
         )
 
+        # The build reports from its worker thread; events are logged back on the loop.
+        loop = asyncio.get_running_loop()
+        progress = IndexProgress(
+            lambda snapshot: loop.call_soon_threadsafe(self._log_index_progress, snapshot),
+            interval=settings.tier1_progress_interval_ms / 1000,
+        )
         index_started_perf = time.perf_counter()
-        index_payload = await self.indexer.build_or_reuse(
+        index_payload = await index_service.build_or_reuse(
+            self.indexer,
             project_id=self.project_id,
             user_id=self.user_id,
             repo_url=self.repo_url,
-            clone_url=repo_info.clone_url,
+            clone_url=clone_url,
             repo_sha=repo_sha,
             github_token=self.github_token,
             scan_id=self.scan_id,
+            progress=progress,
         )
         index_ms = int((time.perf_counter() - index_started_perf) * 1000)
 
@@ -104,24 +197,32 @@ class Tier1Orchestrator:
         findings = self.scanner.scan(
             index_payload=index_payload,
             sensitive_data=list(self.project_intake.get("sensitive_data") or []),
+            on_finding=self._log_finding,
         )
         scan_ms = int((time.perf_counter() - scan_started_perf) * 1000)
 
         actionable = [f for f in findings if f.status in {"warn", "fail"}]
-        score_summary = self._score(findings)
+        score_summary = score_findings(findings)
         index_json = index_payload.get("index_json") or {}
         index_facts = index_json.get("facts") or {}
         git_metadata = index_facts.get("git_metadata") or {}
         cache_hit = bool(index_payload.get("cache_hit"))
+        index_metrics = index_payload.get("metrics") or {}
+        index_source = "cache" if cache_hit else "fresh"
+        if index_metrics.get("index_mode") == "incremental":
+            index_source = "incremental"
 
         run_details = {
             "scan_id": str(self.scan_id),
             "repo_sha": repo_sha,
             "run_started_at": run_started_at,
-            "index_source": "cache" if cache_hit else "fresh",
+            "index_source": index_source,
             "cache_hit": cache_hit,
+            "files_rescanned": index_metrics.get("files_rescanned"),
+            "index_shared": bool(index_metrics.get("shared_index")),
             "file_count": int(index_payload.get("file_count") or 0),
             "loc_total": int(index_payload.get("loc_total") or 0),
+            "oversized_files": list(index_facts.get("oversized_files") or []),
             "index_generated_at": index_json.get("generated_at"),
             "index_ms": index_ms,
             "scan_ms": scan_ms,
@@ -158,6 +259,7 @@ class Tier1Orchestrator:
             run_details=run_details,
             git_metadata=git_metadata,
             index_facts=index_facts,
+            user_id=self.user_id,
         )
 
         audit_report = self._to_audit_report(
@@ -180,39 +282,6 @@ class Tier1Orchestrator:
             "audit_report": audit_report,
         }
 
-    @staticmethod
-    def _score(findings: list) -> dict:
-        penalties = {
-            "critical": 18,
-            "high": 10,
-            "medium": 6,
-            "low": 3,
-        }
-
-        scores = {
-            "security": 100,
-            "reliability": 100,
-            "scalability": 100,
-        }
-
-        for finding in findings:
-            if finding.status == "pass":
-                continue
-            penalty = penalties.get(finding.severity, 4)
-            if finding.status == "warn":
-                penalty = max(1, penalty // 2)
-            category = finding.category
-            scores[category] = max(0, scores.get(category, 100) - penalty)
-
-        health_score = round((scores["security"] + scores["reliability"] + scores["scalability"]) / 3)
-
-        return {
-            "health_score": int(health_score),
-            "security_score": int(scores["security"]),
-            "reliability_score": int(scores["reliability"]),
-            "scalability_score": int(scores["scalability"]),
-        }
-
     def _to_audit_report(self, *, findings: list, score_summary: dict) -> AuditReport:
         converted: list[Finding] = []
 
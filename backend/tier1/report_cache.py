@@ -0,0 +1,98 @@
+"""Reuse of Tier 1 report artifacts across scans with unchanged inputs.
+
+Re-scanning a commit with the same intake produces the same findings, so the
+assistant call, markdown, agent packet and rasterized PDF would all come out
+the same. Artifacts are stored in ``report_artifact_cache`` under a hash of
+everything composition reads, and expire with ``tier1_report_ttl_days`` like
+the report artifacts themselves. Cache failures never fail a report.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from datetime import datetime
+
+from services import supabase_client as db
+from tier1.contracts import Tier1Finding
+
+logger = logging.getLogger(__name__)
+
+
+def report_cache_key(
+    *,
+    findings: list[Tier1Finding],
+    score_summary: dict,
+    intake_context: dict,
+    user_preferences: dict | None,
+    git_metadata: dict,
+    index_facts: dict,
+    reporter_version: int,
+    model: str,
+) -> str:
+    """Hash of every report input; equal keys compose byte-identical artifacts up to run details."""
+    payload = {
+        "reporter_version": reporter_version,
+        "model": model,
+        "findings": [finding.model_dump(mode="json") for finding in findings],
+        "scores": score_summary,
+        "intake": intake_context,
+        "preferences": user_preferences or {},
+        # Hotspot ranking and strengths read these as well.
+        "git_metadata": git_metadata,
+        "index_facts": index_facts,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ReportArtifactCache:
+    """Looks up and stores cached report artifacts, counting hits and misses."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+
+    async def get(self, user_id: str, cache_key: str) -> dict | None:
+        try:
+            row = await db.get_cached_report_artifact(user_id, cache_key)
+        except Exception:
+            self.errors += 1
+            logger.exception("Tier1 report cache lookup failed; generating the report")
+            return None
+        entry = (row or {}).get("artifact_json")
+        if not entry:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    async def put(self, user_id: str, cache_key: str, entry: dict, expires_at: datetime) -> None:
+        try:
+            await db.save_cached_report_artifact(
+                user_id=user_id,
+                cache_key=cache_key,
+                artifact_json=entry,
+                expires_at=expires_at,
+            )
+        except Exception:
+            self.errors += 1
+            logger.exception("Tier1 report cache store failed")
+            return
+        self.stores += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+report_cache = ReportArtifactCache()
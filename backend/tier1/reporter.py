@@ -9,10 +9,10 @@ import time
 from datetime import datetime, timedelta, timezone
 from io import BytesIO
 
-import httpx
-
 from config import settings
+from services.openrouter import chat_completion
 from tier1.contracts import Tier1Finding, Tier1ReportArtifact
+from tier1.report_cache import report_cache, report_cache_key
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +20,10 @@ DAYTONA_VCPU_PER_SEC_USD = 0.000014
 DAYTONA_RAM_GB_PER_SEC_USD = 0.0000045
 LLM_INPUT_PER_MILLION_USD = 0.10
 LLM_OUTPUT_PER_MILLION_USD = 0.40
+# Bump whenever report composition changes, so cached artifacts are regenerated.
+REPORTER_VERSION = 3
+PDF_PAGE_SIZE = (1240, 1754)
+PDF_MARGIN = 72
 
 
 class Tier1Reporter:
@@ -33,7 +37,15 @@ class Tier1Reporter:
         run_details: dict | None = None,
         git_metadata: dict | None = None,
         index_facts: dict | None = None,
+        user_id: str | None = None,
+        use_llm_cache: bool = True,
     ) -> Tier1ReportArtifact:
+        """Compose the report artifacts, or reuse ``user_id``'s cached ones for identical inputs.
+
+        A cached report is only patched with this run's details; it costs no
+        model call. ``use_llm_cache=False`` makes the assistant call reach the
+        model even when an identical response is cached.
+        """
         report_started_perf = time.perf_counter()
         expires_at = datetime.now(timezone.utc) + timedelta(days=settings.tier1_report_ttl_days)
 
@@ -41,6 +53,40 @@ class Tier1Reporter:
         git_metadata = dict(git_metadata or {})
         index_facts = dict(index_facts or {})
 
+        cache_key: str | None = None
+        if user_id is not None and settings.tier1_report_cache_enabled:
+            cache_key = report_cache_key(
+                findings=findings,
+                score_summary=score_summary,
+                intake_context=intake_context,
+                user_preferences=user_preferences,
+                git_metadata=git_metadata,
+                index_facts=index_facts,
+                reporter_version=REPORTER_VERSION,
+                model=settings.tier1_assistant_model,
+            )
+            cached = await report_cache.get(user_id, cache_key)
+            stats = report_cache.stats()
+            logger.info(
+                "Tier1 report cache %s (hit rate %.1f%% over %d lookups)",
+                "hit" if cached is not None else "miss",
+                stats["hit_rate"] * 100,
+                stats["hits"] + stats["misses"],
+            )
+            if cached is not None:
+                try:
+                    return self._artifact_from_cache(
+                        cached,
+                        intake_context=intake_context,
+                        run_details=run_details,
+                        git_metadata=git_metadata,
+                        expires_at=expires_at,
+                        report_started_perf=report_started_perf,
+                    )
+                except Exception:
+                    logger.exception("Tier1 cached report artifact was unusable; generating the report")
+            run_details["report_cache"] = "miss"
+
         actionable = self._prioritize_findings(
             [f for f in findings if f.status in {"warn", "fail"}],
             git_metadata,
@@ -61,17 +107,23 @@ class Tier1Reporter:
                 score_summary=score_summary,
                 intake_context=intake_context,
                 user_preferences=user_preferences,
+                use_llm_cache=use_llm_cache,
             )
             model_used = settings.tier1_assistant_model
         except Exception:
             logger.exception("Tier1 assistant context generation failed; using deterministic-only narrative")
             fallback_used = True
 
+        cached_model_usage = None
+        if model_usage and model_usage.get("cached"):
+            cached_model_usage, model_usage = model_usage, None
+
         report_ms = int((time.perf_counter() - report_started_perf) * 1000)
         run_details_enriched = self._finalize_run_details(
             run_details=run_details,
             report_ms=report_ms,
             model_usage=model_usage,
+            cached_model_usage=cached_model_usage,
         )
 
         markdown = self._compose_report_markdown(
@@ -94,15 +146,17 @@ class Tier1Reporter:
             launch_guidance=launch_guidance,
             run_details=run_details_enriched,
         )
-        pdf_base64 = self._compose_report_pdf_base64(
+        pdf_layout = self._layout_report_pdf(
             intake_context=intake_context,
             score_summary=score_summary,
             strengths=strengths,
             actionable_findings=actionable,
             execution_plan=execution_plan,
             launch_guidance=launch_guidance,
-            run_details=run_details_enriched,
         )
+        # Snapshot before the run details are written: a cache hit redraws only those.
+        pdf_draft = pdf_layout.snapshot() if pdf_layout is not None and cache_key is not None else None
+        pdf_base64 = self._finish_report_pdf(pdf_layout, run_details_enriched)
 
         summary_json = {
             "scores": score_summary,
@@ -124,6 +178,23 @@ class Tier1Reporter:
             ],
         }
 
+        # A fallback narrative is not cached, so the next run retries the model.
+        if cache_key is not None and not fallback_used:
+            await report_cache.put(
+                user_id,
+                cache_key,
+                {
+                    "markdown": markdown,
+                    "agent_markdown": agent_markdown,
+                    "pdf_draft": pdf_draft,
+                    "assistant_context": assistant_context,
+                    "summary_json": {key: value for key, value in summary_json.items() if key != "run_details"},
+                    "run_details": run_details_enriched,
+                    "model_used": model_used,
+                },
+                expires_at,
+            )
+
         return Tier1ReportArtifact(
             markdown=markdown,
             agent_markdown=agent_markdown,
@@ -134,6 +205,43 @@ class Tier1Reporter:
             fallback_used=fallback_used,
         )
 
+    def _artifact_from_cache(
+        self,
+        entry: dict,
+        *,
+        intake_context: dict,
+        run_details: dict,
+        git_metadata: dict,
+        expires_at: datetime,
+        report_started_perf: float,
+    ) -> Tier1ReportArtifact:
+        run_details_enriched = self._finalize_run_details(
+            run_details={**run_details, "report_cache": "hit"},
+            report_ms=int((time.perf_counter() - report_started_perf) * 1000),
+            model_usage=None,
+        )
+        pdf_layout, pdf_body = _PdfLayout.from_snapshot(entry["pdf_draft"]) if entry.get("pdf_draft") else (None, None)
+        return Tier1ReportArtifact(
+            markdown=self._patch_run_details_markdown(entry["markdown"], run_details_enriched),
+            agent_markdown=self._patch_agent_markdown(
+                entry["agent_markdown"],
+                intake_context=intake_context,
+                cached_run_details=entry.get("run_details") or {},
+                run_details=run_details_enriched,
+            ),
+            pdf_base64=self._finish_report_pdf(pdf_layout, run_details_enriched, pdf_body),
+            summary_json={
+                **entry["summary_json"],
+                "run_details": {
+                    **run_details_enriched,
+                    "git_metadata": git_metadata,
+                },
+            },
+            expires_at=expires_at,
+            model_used=entry.get("model_used"),
+            fallback_used=False,
+        )
+
     async def _generate_assistant_context(
         self,
         *,
@@ -141,6 +249,7 @@ class Tier1Reporter:
         score_summary: dict,
         intake_context: dict,
         user_preferences: dict | None,
+        use_llm_cache: bool = True,
     ) -> tuple[dict, dict | None]:
         style_guide = self._style_guide(user_preferences)
         prompt_payload = {
@@ -157,32 +266,21 @@ class Tier1Reporter:
             f"{json.dumps(prompt_payload)[:22000]}"
         )
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post(
-                f"{settings.openrouter_base_url}/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {settings.openrouter_api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": settings.tier1_assistant_model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.2,
-                    "max_tokens": 800,
-                },
-            )
-            resp.raise_for_status()
-            data = resp.json()
-
-        content = (
-            data.get("choices", [{}])[0]
-            .get("message", {})
-            .get("content", "")
-            .strip()
+        completion = await chat_completion(
+            model=settings.tier1_assistant_model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.2,
+            max_tokens=800,
+            timeout=30,
+            cacheable=self._is_assistant_json,
+            use_cache=use_llm_cache,
         )
-        usage = data.get("usage") if isinstance(data.get("usage"), dict) else None
+        usage = completion.usage
+        if completion.cached:
+            # Tokens were paid for by the original call; report them apart from billed usage.
+            usage = {**(usage or {}), "cached": True}
 
-        parsed = self._parse_assistant_json(content)
+        parsed = self._parse_assistant_json(completion.content)
         if not isinstance(parsed, dict):
             raise ValueError("Assistant response was not a JSON object")
 
@@ -191,6 +289,14 @@ class Tier1Reporter:
         parsed.setdefault("risk_narrative", "")
         return parsed, usage
 
+    @classmethod
+    def _is_assistant_json(cls, content: str) -> bool:
+        try:
+            cls._parse_assistant_json(content)
+        except Exception:
+            return False
+        return True
+
     @staticmethod
     def _parse_assistant_json(content: str) -> dict:
         try:
@@ -361,7 +467,30 @@ class Tier1Reporter:
         else:
             lines.append("- No remediation tasks required for this run.")
 
-        lines.extend(["", "## Run Details"])
+        lines.extend(["", *self._run_details_markdown(run_details, model_usage)])
+
+        lines.extend(["", "## Personalization Profile"])
+        lines.append(f"- Technical level: **{technical_level}**")
+        lines.append(f"- Explanation style: **{explanation_style}**")
+        lines.append(f"- Shipping posture: **{shipping_posture}**")
+
+        lines.extend(
+            [
+                "",
+                "## Risk Narrative",
+                self._compose_risk_narrative(
+                    findings=actionable_findings,
+                    target_users=target_users,
+                    launch_guidance=launch_guidance,
+                ),
+            ]
+        )
+
+        return "\n".join(lines)
+
+    @staticmethod
+    def _run_details_markdown(run_details: dict, model_usage: dict | None) -> list[str]:
+        lines = ["## Run Details"]
         lines.append(f"- Scan id: `{run_details.get('scan_id', 'unknown')}`")
         lines.append(f"- Repo SHA: `{run_details.get('repo_sha', 'unknown')}`")
         lines.append(
@@ -371,6 +500,11 @@ class Tier1Reporter:
             lines.append(f"- Index generated at: {run_details.get('index_generated_at')}")
         lines.append(f"- Files scanned: **{run_details.get('file_count', 0)}**")
         lines.append(f"- LOC scanned: **{run_details.get('loc_total', 0)}**")
+        oversized = run_details.get("oversized_files") or []
+        if oversized:
+            shown = ", ".join(f"`{path}`" for path in oversized[:5])
+            more = f" and {len(oversized) - 5} more" if len(oversized) > 5 else ""
+            lines.append(f"- Not scanned (over the blob size limit): **{len(oversized)}** files: {shown}{more}")
         lines.append(
             f"- Timings (ms): index={run_details.get('index_ms', 0)}, scan={run_details.get('scan_ms', 0)}, report={run_details.get('report_ms', 0)}, total={run_details.get('total_ms', 0)}"
         )
@@ -387,25 +521,22 @@ class Tier1Reporter:
         lines.append(
             f"- LLM usage: prompt_tokens={usage.get('prompt_tokens', 0)}, completion_tokens={usage.get('completion_tokens', 0)}, total_tokens={usage.get('total_tokens', 0)}"
         )
+        cached_usage = run_details.get("cached_model_usage") or {}
+        if cached_usage.get("total_tokens"):
+            lines.append(
+                f"- LLM usage served from cache (not billed): total_tokens={cached_usage.get('total_tokens', 0)}"
+            )
+        if run_details.get("report_cache") == "hit":
+            lines.append("- Report reused from an earlier run with identical findings and inputs.")
+        return lines
 
-        lines.extend(["", "## Personalization Profile"])
-        lines.append(f"- Technical level: **{technical_level}**")
-        lines.append(f"- Explanation style: **{explanation_style}**")
-        lines.append(f"- Shipping posture: **{shipping_posture}**")
-
-        lines.extend(
-            [
-                "",
-                "## Risk Narrative",
-                self._compose_risk_narrative(
-                    findings=actionable_findings,
-                    target_users=target_users,
-                    launch_guidance=launch_guidance,
-                ),
-            ]
-        )
-
-        return "\n".join(lines)
+    def _patch_run_details_markdown(self, markdown: str, run_details: dict) -> str:
+        start = markdown.rfind("\n## Run Details\n")
+        end = markdown.find("\n\n## ", start + 1)
+        if start == -1 or end == -1:
+            raise ValueError("Cached report markdown has no run details section")
+        section = "\n".join(self._run_details_markdown(run_details, run_details.get("model_usage")))
+        return f"{markdown[: start + 1]}{section}{markdown[end:]}"
 
     @staticmethod
     def _counts_by(findings: list[Tier1Finding], field: str) -> dict:
@@ -571,12 +702,7 @@ class Tier1Reporter:
         prefs = user_preferences or {}
         provider = str(prefs.get("coding_agent_provider") or "openai").strip().lower()
         model = str(prefs.get("coding_agent_model") or self._default_model_for_provider(provider)).strip()
-        run_id = str(run_details.get("scan_id", "unknown"))
-        branch_name = (
-            f"codex/{self._slug_for_branch(product_summary, 24)}-"
-            f"{self._slug_for_branch('fix', 8)}-"
-            f"{self._slug_for_branch(run_id, 16)}"
-        )
+        branch_name = self._agent_branch_name(product_summary, str(run_details.get("scan_id", "unknown")))
         provider_overlay = self._provider_packet_overlay(provider, model)
         implementation_doc = "docs/agent-implementation-note.md"
 
@@ -662,6 +788,30 @@ class Tier1Reporter:
 
         return "\n".join(lines)
 
+    def _patch_agent_markdown(
+        self,
+        agent_markdown: str,
+        *,
+        intake_context: dict,
+        cached_run_details: dict,
+        run_details: dict,
+    ) -> str:
+        product_summary = intake_context.get("product_summary", "Unknown project")
+        cached_id = str(cached_run_details.get("scan_id", "unknown"))
+        run_id = str(run_details.get("scan_id", "unknown"))
+        return agent_markdown.replace(
+            f"`{self._agent_branch_name(product_summary, cached_id)}`",
+            f"`{self._agent_branch_name(product_summary, run_id)}`",
+        ).replace(f"- Scan id: `{cached_id}`", f"- Scan id: `{run_id}`")
+
+    @classmethod
+    def _agent_branch_name(cls, product_summary: str, run_id: str) -> str:
+        return (
+            f"codex/{cls._slug_for_branch(product_summary, 24)}-"
+            f"{cls._slug_for_branch('fix', 8)}-"
+            f"{cls._slug_for_branch(run_id, 16)}"
+        )
+
     @staticmethod
     def _slug_for_branch(value: str, max_len: int) -> str:
         safe_chars: list[str] = []
@@ -712,7 +862,7 @@ class Tier1Reporter:
             base.append("Use concise execution-first behavior and strict output compliance.")
         return base
 
-    def _compose_report_pdf_base64(
+    def _layout_report_pdf(
         self,
         *,
         intake_context: dict,
@@ -721,137 +871,89 @@ class Tier1Reporter:
         actionable_findings: list[Tier1Finding],
         execution_plan: list[dict],
         launch_guidance: dict,
-        run_details: dict,
-    ) -> str | None:
+    ) -> _PdfLayout | None:
+        """Lay out every section but the run details, which vary per run (see ``_finish_report_pdf``)."""
         try:
-            from PIL import Image, ImageDraw, ImageFont
+            from PIL import ImageFont
         except Exception:
             return None
 
-        page_w, page_h = 1240, 1754
-        margin = 72
-        pages: list = []
-        font = ImageFont.load_default()
-
-        def _new_page():
-            page = Image.new("RGB", (page_w, page_h), "white")
-            draw = ImageDraw.Draw(page)
-            return page, draw, margin
-
-        page, draw, y = _new_page()
-
-        def _append_page(current_page):
-            pages.append(current_page)
-
-        def _line_height() -> int:
-            return 22
-
-        def _text_width(text: str) -> int:
-            box = draw.textbbox((0, 0), text, font=font)
-            return int(box[2] - box[0])
-
-        def _ensure_space(height: int):
-            nonlocal page, draw, y
-            if y + height <= page_h - margin:
-                return
-            _append_page(page)
-            page, draw, y = _new_page()
-
-        def _write_wrapped(text: str, *, indent: int = 0):
-            nonlocal y
-            max_w = page_w - margin - (margin + indent)
-            words = text.split()
-            if not words:
-                y += _line_height()
-                return
-            current = words[0]
-            for word in words[1:]:
-                candidate = f"{current} {word}"
-                if _text_width(candidate) <= max_w:
-                    current = candidate
-                else:
-                    _ensure_space(_line_height())
-                    draw.text((margin + indent, y), current, fill="black", font=font)
-                    y += _line_height()
-                    current = word
-            _ensure_space(_line_height())
-            draw.text((margin + indent, y), current, fill="black", font=font)
-            y += _line_height()
-
-        def _write_heading(text: str):
-            nonlocal y
-            _ensure_space(34)
-            draw.text((margin, y), text, fill="black", font=font)
-            y += 30
+        layout = _PdfLayout(ImageFont.load_default())
+        page_w, _ = PDF_PAGE_SIZE
+        margin = PDF_MARGIN
 
         product_summary = intake_context.get("product_summary", "Unknown project")
         target_users = intake_context.get("target_users", "Unknown users")
 
-        _write_heading(f"Clarity Check Report: {product_summary}")
-        _write_wrapped(f"Audience: {target_users}")
-        _write_wrapped(f"Launch recommendation: {launch_guidance.get('decision')} - {launch_guidance.get('reason')}")
-        _write_wrapped(
+        layout.write_heading(f"Clarity Check Report: {product_summary}")
+        layout.write_wrapped(f"Audience: {target_users}")
+        layout.write_wrapped(
+            f"Launch recommendation: {launch_guidance.get('decision')} - {launch_guidance.get('reason')}"
+        )
+        layout.write_wrapped(
             f"Scores: health={score_summary.get('health_score', 0)}, security={score_summary.get('security_score', 0)}, reliability={score_summary.get('reliability_score', 0)}, scalability={score_summary.get('scalability_score', 0)}"
         )
-        y += 8
+        layout.y += 8
 
         score_chart = self._score_profile_png_image(score_summary)
         if score_chart is not None:
             max_chart_w = page_w - (margin * 2)
             chart = score_chart.copy().resize((max_chart_w, int(score_chart.height * (max_chart_w / score_chart.width))))
-            _ensure_space(chart.height + 12)
-            page.paste(chart, (margin, y))
-            y += chart.height + 12
+            layout.paste(chart, gap=12)
 
         severity_chart = self._severity_profile_png_image(actionable_findings)
         if severity_chart is not None:
             max_chart_w = page_w - (margin * 2)
             chart = severity_chart.copy().resize((max_chart_w, int(severity_chart.height * (max_chart_w / severity_chart.width))))
-            _ensure_space(chart.height + 18)
-            page.paste(chart, (margin, y))
-            y += chart.height + 18
+            layout.paste(chart, gap=18)
 
-        _write_heading("What is working well")
+        layout.write_heading("What is working well")
         if strengths:
             for item in strengths[:6]:
-                _write_wrapped(f"- {item}", indent=12)
+                layout.write_wrapped(f"- {item}", indent=12)
         else:
-            _write_wrapped("- Core quality checks are currently stable.", indent=12)
+            layout.write_wrapped("- Core quality checks are currently stable.", indent=12)
 
-        _write_heading("Top findings")
+        layout.write_heading("Top findings")
         if not actionable_findings:
-            _write_wrapped("- No warnings or failures were detected.", indent=12)
+            layout.write_wrapped("- No warnings or failures were detected.", indent=12)
         else:
             for idx, finding in enumerate(actionable_findings[:8], start=1):
-                _write_wrapped(
+                layout.write_wrapped(
                     f"{idx}. {finding.check_id} ({finding.severity.upper()} / {finding.status.upper()}): {finding.title}"
                 )
-                _write_wrapped(f"   Impact: {self._business_impact_for_finding(finding)}")
-                _write_wrapped(f"   Evidence: {self._format_evidence(finding)}")
+                layout.write_wrapped(f"   Impact: {self._business_impact_for_finding(finding)}")
+                layout.write_wrapped(f"   Evidence: {self._format_evidence(finding)}")
 
-        _write_heading("Execution plan summary")
+        layout.write_heading("Execution plan summary")
         for idx, item in enumerate(execution_plan[:5], start=1):
-            _write_wrapped(f"{idx}. {item.get('title')} - {item.get('estimate')}")
-            _write_wrapped(f"   {item.get('objective')}")
+            layout.write_wrapped(f"{idx}. {item.get('title')} - {item.get('estimate')}")
+            layout.write_wrapped(f"   {item.get('objective')}")
+
+        return layout
+
+    @staticmethod
+    def _finish_report_pdf(layout: _PdfLayout | None, run_details: dict, body: bytes | None = None) -> str | None:
+        """Write the run details after the laid-out report; returns the PDF as base64.
 
-        _write_heading("Run details")
-        _write_wrapped(f"Scan id: {run_details.get('scan_id', 'unknown')}")
-        _write_wrapped(f"Repo sha: {run_details.get('repo_sha', 'unknown')}")
-        _write_wrapped(
+        With ``body`` (the cached report's finished pages), only the pages
+        from the run details' page on are encoded, as an incremental update.
+        """
+        if layout is None:
+            return None
+        layout.write_heading("Run details")
+        layout.write_wrapped(f"Scan id: {run_details.get('scan_id', 'unknown')}")
+        layout.write_wrapped(f"Repo sha: {run_details.get('repo_sha', 'unknown')}")
+        layout.write_wrapped(
             f"Timings (ms): index={run_details.get('index_ms', 0)}, scan={run_details.get('scan_ms', 0)}, report={run_details.get('report_ms', 0)}, total={run_details.get('total_ms', 0)}"
         )
         usage = run_details.get("model_usage") or {}
-        _write_wrapped(
+        layout.write_wrapped(
             f"Model tokens: prompt={usage.get('prompt_tokens', 0)}, completion={usage.get('completion_tokens', 0)}, total={usage.get('total_tokens', 0)}"
         )
-
-        _append_page(page)
-
-        pdf_buf = BytesIO()
-        first = pages[0]
-        rest = pages[1:]
-        first.save(pdf_buf, format="PDF", save_all=True, append_images=rest, resolution=150.0)
-        return base64.b64encode(pdf_buf.getvalue()).decode("ascii")
+        if run_details.get("report_cache") == "hit":
+            layout.write_wrapped("Report reused from an earlier run with identical findings and inputs.")
+        return base64.b64encode(_pdf_bytes(layout.close(), body)).decode("ascii")
 
     @staticmethod
     def _finding_priority_key(finding: Tier1Finding) -> tuple[int, int]:
@@ -1181,7 +1283,9 @@ class Tier1Reporter:
         run_details: dict,
         report_ms: int,
         model_usage: dict | None,
+        cached_model_usage: dict | None = None,
     ) -> dict:
+        """Add timings and costs; ``cached_model_usage`` is recorded but not billed."""
         total_before_report_ms = int(run_details.get("total_before_report_ms") or 0)
         total_ms = total_before_report_ms + report_ms
 
@@ -1207,6 +1311,7 @@ class Tier1Reporter:
                 },
             },
             "model_usage": usage,
+            "cached_model_usage": self._normalized_usage(cached_model_usage),
         }
 
     @staticmethod
@@ -1238,3 +1343,93 @@ class Tier1Reporter:
         prompt_cost = (prompt_tokens / 1_000_000.0) * LLM_INPUT_PER_MILLION_USD
         completion_cost = (completion_tokens / 1_000_000.0) * LLM_OUTPUT_PER_MILLION_USD
         return prompt_cost + completion_cost
+
+
+class _PdfLayout:
+    """Report text and images laid out top to bottom; the last page stays open for more."""
+
+    def __init__(self, font, page=None, y: int = PDF_MARGIN) -> None:
+        from PIL import Image, ImageDraw
+
+        self.font = font
+        self.pages: list = []
+        self.page = page if page is not None else Image.new("RGB", PDF_PAGE_SIZE, "white")
+        self.draw = ImageDraw.Draw(self.page)
+        self.y = y
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> tuple[_PdfLayout, bytes | None]:
+        """Reopen a ``snapshot``; returns the layout and the PDF of its finished pages."""
+        from PIL import Image, ImageFont
+
+        page = Image.open(BytesIO(base64.b64decode(snapshot["page_png_base64"]))).convert("RGB")
+        body = base64.b64decode(snapshot["pages_pdf_base64"]) if snapshot.get("pages_pdf_base64") else None
+        return cls(ImageFont.load_default(), page, int(snapshot["y"])), body
+
+    def snapshot(self) -> dict:
+        """The layout so far: finished pages as a PDF, the open page losslessly as PNG, and the cursor."""
+        page_png = BytesIO()
+        self.page.save(page_png, format="PNG")
+        return {
+            "pages_pdf_base64": base64.b64encode(_pdf_bytes(self.pages)).decode("ascii") if self.pages else None,
+            "page_png_base64": base64.b64encode(page_png.getvalue()).decode("ascii"),
+            "y": self.y,
+        }
+
+    def close(self) -> list:
+        return [*self.pages, self.page]
+
+    def line_height(self) -> int:
+        return 22
+
+    def text_width(self, text: str) -> int:
+        box = self.draw.textbbox((0, 0), text, font=self.font)
+        return int(box[2] - box[0])
+
+    def ensure_space(self, height: int) -> None:
+        from PIL import Image, ImageDraw
+
+        if self.y + height <= PDF_PAGE_SIZE[1] - PDF_MARGIN:
+            return
+        self.pages.append(self.page)
+        self.page = Image.new("RGB", PDF_PAGE_SIZE, "white")
+        self.draw = ImageDraw.Draw(self.page)
+        self.y = PDF_MARGIN
+
+    def write_wrapped(self, text: str, *, indent: int = 0) -> None:
+        max_w = PDF_PAGE_SIZE[0] - PDF_MARGIN - (PDF_MARGIN + indent)
+        words = text.split()
+        if not words:
+            self.y += self.line_height()
+            return
+        current = words[0]
+        for word in words[1:]:
+            candidate = f"{current} {word}"
+            if self.text_width(candidate) <= max_w:
+                current = candidate
+            else:
+                self.ensure_space(self.line_height())
+                self.draw.text((PDF_MARGIN + indent, self.y), current, fill="black", font=self.font)
+                self.y += self.line_height()
+                current = word
+        self.ensure_space(self.line_height())
+        self.draw.text((PDF_MARGIN + indent, self.y), current, fill="black", font=self.font)
+        self.y += self.line_height()
+
+    def write_heading(self, text: str) -> None:
+        self.ensure_space(34)
+        self.draw.text((PDF_MARGIN, self.y), text, fill="black", font=self.font)
+        self.y += 30
+
+    def paste(self, image, *, gap: int) -> None:
+        self.ensure_space(image.height + gap)
+        self.page.paste(image, (PDF_MARGIN, self.y))
+        self.y += image.height + gap
+
+
+def _pdf_bytes(pages: list, body: bytes | None = None) -> bytes:
+    """Encode ``pages`` as a PDF, or as an incremental update appending them to ``body``."""
+    pdf_buf = BytesIO(body or b"")
+    first, *rest = pages
+    first.save(pdf_buf, format="PDF", save_all=True, append_images=rest, append=body is not None, resolution=150.0)
+    return pdf_buf.getvalue()
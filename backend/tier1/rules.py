@@ -0,0 +1,521 @@
+"""Declarative Tier 1 check registry and compiled scan plans.
+
+Every check declares the index signal buckets and facts it reads. A profile
+names a set of checks, and ``compile_scan_plan`` unions their declarations
+into a ``ScanPlan``: the scanner runs exactly those checks, and the indexer
+runs only the collectors that feed the plan's buckets. Checks only ever see
+the inputs they declare, so a declaration cannot silently fall out of date.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from tier1.contracts import Tier1Evidence
+
+LOCKFILE_NAMES = {
+    "package-lock.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "bun.lockb",
+    "poetry.lock",
+    "pipfile.lock",
+    "cargo.lock",
+}
+
+
+@dataclass(frozen=True)
+class CheckInputs:
+    """The slice of an index a check declared: its signal buckets, their counts, and its facts."""
+
+    signals: dict[str, list[dict]]
+    signal_counts: dict[str, int]
+    facts: dict[str, Any]
+    # File entries (path, LOC, role) are always collected.
+    files: list[dict]
+    # Only populated for checks that declare the ``lint_issues`` signal.
+    linter_probes: list[dict] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class CheckOutcome:
+    status: str
+    confidence: float
+    evidence: list[Tier1Evidence]
+    # Overrides the check's declared severity for this result.
+    severity: str | None = None
+
+
+@dataclass(frozen=True)
+class CheckRule:
+    check_id: str
+    title: str
+    description: str
+    category: str
+    severity: str
+    engine: str
+    suggested_fix_stub: str
+    evaluate: Callable[[CheckInputs], CheckOutcome]
+    signals: frozenset[str] = frozenset()
+    facts: frozenset[str] = frozenset()
+
+
+@dataclass(frozen=True)
+class ScanPlan:
+    """What a set of checks needs from an index, in the indexer's vocabulary."""
+
+    check_ids: tuple[str, ...]
+    # Signal buckets to collect; ``lint_issues`` means linter probes run.
+    signals: frozenset[str]
+    # Index facts read; path facts are always derived, ``git_metadata`` only on demand.
+    facts: frozenset[str]
+
+    @property
+    def linters(self) -> bool:
+        return "lint_issues" in self.signals
+
+    @property
+    def git_metadata(self) -> bool:
+        return "git_metadata" in self.facts
+
+
+# Registration order is finding order.
+CHECK_REGISTRY: dict[str, CheckRule] = {}
+
+
+def register_check(
+    check_id: str,
+    *,
+    title: str,
+    description: str,
+    category: str,
+    severity: str,
+    engine: str,
+    suggested_fix_stub: str,
+    signals: Iterable[str] = (),
+    facts: Iterable[str] = (),
+) -> Callable[[Callable[[CheckInputs], CheckOutcome]], Callable[[CheckInputs], CheckOutcome]]:
+    """Register the decorated evaluator as check ``check_id``."""
+
+    def decorator(evaluate: Callable[[CheckInputs], CheckOutcome]) -> Callable[[CheckInputs], CheckOutcome]:
+        if check_id in CHECK_REGISTRY:
+            raise ValueError(f"Tier1 check {check_id} is already registered")
+        CHECK_REGISTRY[check_id] = CheckRule(
+            check_id=check_id,
+            title=title,
+            description=description,
+            category=category,
+            severity=severity,
+            engine=engine,
+            suggested_fix_stub=suggested_fix_stub,
+            evaluate=evaluate,
+            signals=frozenset(signals),
+            facts=frozenset(facts),
+        )
+        return evaluate
+
+    return decorator
+
+
+def compile_scan_plan(checks: str | Iterable[str] = "balanced") -> ScanPlan:
+    """Compile a profile name, or an explicit list of check ids, into a ``ScanPlan``."""
+    extra_facts: frozenset[str] = frozenset()
+    if isinstance(checks, str):
+        profile = CHECK_PROFILES.get(checks)
+        if profile is None:
+            raise ValueError(f"Unknown Tier1 check profile {checks!r}; expected one of {sorted(CHECK_PROFILES)}")
+        wanted = set(profile.check_ids)
+        extra_facts = profile.facts
+    else:
+        wanted = set(checks)
+    unknown = wanted - set(CHECK_REGISTRY)
+    if unknown:
+        raise ValueError(f"Unknown Tier1 checks: {', '.join(sorted(unknown))}")
+
+    rules = [rule for check_id, rule in CHECK_REGISTRY.items() if check_id in wanted]
+    return ScanPlan(
+        check_ids=tuple(rule.check_id for rule in rules),
+        signals=frozenset().union(*(rule.signals for rule in rules)),
+        facts=extra_facts.union(*(rule.facts for rule in rules)),
+    )
+
+
+def check_inputs(rule: CheckRule, index_json: dict) -> CheckInputs:
+    """Project ``index_json`` down to what ``rule`` declared."""
+    signals = index_json.get("signals") or {}
+    signal_counts = index_json.get("signal_counts") or {}
+    facts = index_json.get("facts") or {}
+    return CheckInputs(
+        signals={bucket: list(signals.get(bucket) or []) for bucket in rule.signals},
+        signal_counts={
+            key: value for key, value in signal_counts.items() if key.split(".", 1)[0] in rule.signals
+        },
+        facts={key: facts[key] for key in rule.facts if key in facts},
+        files=list(index_json.get("files") or []),
+        linter_probes=list(index_json.get("linter_probes") or []) if "lint_issues" in rule.signals else [],
+    )
+
+
+def _evidence_from_rows(rows: list[dict], limit: int = 5) -> list[Tier1Evidence]:
+    items: list[Tier1Evidence] = []
+    for row in rows[:limit]:
+        items.append(
+            Tier1Evidence(
+                file_path=str(row.get("file_path") or "unknown"),
+                line_number=row.get("line_number"),
+                snippet=str(row.get("snippet") or "")[:220],
+                match=str(row.get("match") or "")[:120],
+            )
+        )
+    return items
+
+
+def _signal_count(signal_counts: dict, key: str, rows: list[dict]) -> int:
+    """Exact row count for ``key``; signal buckets may hold only a bounded sample.
+
+    Indexes without ``signal_counts`` kept every row, so the sample is exact.
+    """
+    if key in signal_counts:
+        return int(signal_counts[key])
+    return len(rows)
+
+
+def _is_lockfile_path(path: str) -> bool:
+    name = path.rsplit("/", 1)[-1].lower()
+    return name in LOCKFILE_NAMES
+
+
+def _rows_outcome(rows: list[dict], *, status: str, confidence: float) -> CheckOutcome:
+    """``status`` with evidence when ``rows`` is non-empty, otherwise a confident pass."""
+    if not rows:
+        return CheckOutcome(status="pass", confidence=1.0, evidence=[])
+    return CheckOutcome(status=status, confidence=confidence, evidence=_evidence_from_rows(rows))
+
+
+# --- Balanced checks ---
+
+
+@register_check(
+    "SEC_001",
+    title="Hardcoded API keys/secrets",
+    description="Detected token/key patterns committed in tracked source files.",
+    category="security",
+    severity="critical",
+    engine="regex",
+    suggested_fix_stub="Move secrets to environment variables, rotate exposed keys, and remove committed values from git history.",
+    signals=("secret_matches",),
+)
+def _hardcoded_secrets(inputs: CheckInputs) -> CheckOutcome:
+    return _rows_outcome(inputs.signals["secret_matches"], status="fail", confidence=0.98)
+
+
+@register_check(
+    "SEC_002",
+    title="Private key material committed",
+    description="Detected private key markers in tracked files.",
+    category="security",
+    severity="critical",
+    engine="regex",
+    suggested_fix_stub="Remove private key material from repository, rotate credentials, and load keys from secure secret storage.",
+    signals=("private_key_matches",),
+)
+def _private_keys(inputs: CheckInputs) -> CheckOutcome:
+    return _rows_outcome(inputs.signals["private_key_matches"], status="fail", confidence=0.99)
+
+
+@register_check(
+    "SEC_003",
+    title="Secret-bearing env files committed",
+    description="Tracked .env files increase secret leak risk in source control.",
+    category="security",
+    severity="high",
+    engine="index",
+    suggested_fix_stub="Keep only template env files (.env.example) in git and ignore real env files with .gitignore.",
+    facts=("tracked_env_files",),
+)
+def _tracked_env_files(inputs: CheckInputs) -> CheckOutcome:
+    tracked_env_files = list(inputs.facts.get("tracked_env_files") or [])
+    rows = [
+        {"file_path": p, "line_number": None, "snippet": p, "match": "tracked_env_file"}
+        for p in tracked_env_files
+    ]
+    return _rows_outcome(rows, status="fail", confidence=0.95)
+
+
+@register_check(
+    "SEC_004",
+    title="Insecure CORS configuration",
+    description="Detected wildcard origins together with credentialed requests.",
+    category="security",
+    severity="high",
+    engine="ast",
+    suggested_fix_stub="Restrict allowed origins to explicit trusted domains and avoid allow_credentials with wildcard origins.",
+    signals=("insecure_cors_matches",),
+)
+def _insecure_cors(inputs: CheckInputs) -> CheckOutcome:
+    return _rows_outcome(inputs.signals["insecure_cors_matches"], status="fail", confidence=0.85)
+
+
+@register_check(
+    "SEC_005",
+    title="Dangerous dynamic execution patterns",
+    description="Detected dynamic execution calls that can execute untrusted input.",
+    category="security",
+    severity="high",
+    engine="ast",
+    suggested_fix_stub="Replace eval/dynamic execution with strict allowlisted dispatch and validated inputs.",
+    signals=("dangerous_exec_matches",),
+)
+def _dangerous_exec(inputs: CheckInputs) -> CheckOutcome:
+    return _rows_outcome(inputs.signals["dangerous_exec_matches"], status="fail", confidence=0.85)
+
+
+@register_check(
+    "SEC_006",
+    title="SQL injection-risk query construction",
+    description="Detected SQL construction patterns that appear to use interpolation or concatenation.",
+    category="security",
+    severity="high",
+    engine="ast",
+    suggested_fix_stub="Use parameterized queries/placeholders for all user-controlled inputs.",
+    signals=("sql_matches",),
+)
+def _sql_construction(inputs: CheckInputs) -> CheckOutcome:
+    sql_matches = inputs.signals["sql_matches"]
+    sql_count = _signal_count(inputs.signal_counts, "sql_matches", sql_matches)
+    return CheckOutcome(
+        status="fail" if sql_count >= 2 else ("warn" if sql_count else "pass"),
+        confidence=0.8 if sql_count else 1.0,
+        evidence=_evidence_from_rows(sql_matches),
+    )
+
+
+@register_check(
+    "SEC_007",
+    title="Missing auth guard hints on API routes",
+    description="Detected route handlers without nearby auth middleware/guard indicators.",
+    category="security",
+    severity="medium",
+    engine="ast",
+    suggested_fix_stub="Attach explicit authentication/authorization middleware to exposed routes.",
+    signals=("route_hints",),
+)
+def _unauthenticated_routes(inputs: CheckInputs) -> CheckOutcome:
+    unauth_routes = [row for row in inputs.signals["route_hints"] if not row.get("has_auth")]
+    unauth_count = _signal_count(inputs.signal_counts, "route_hints.no_auth", unauth_routes)
+    return CheckOutcome(
+        status="warn" if unauth_count else "pass",
+        confidence=0.7 if unauth_count else 1.0,
+        evidence=_evidence_from_rows(unauth_routes),
+    )
+
+
+@register_check(
+    "REL_001",
+    title="Missing automated tests",
+    description="No test directories/files were detected from tracked source paths.",
+    category="reliability",
+    severity="high",
+    engine="index",
+    suggested_fix_stub="Add baseline unit/integration tests for core user flows and CI-gated regression checks.",
+    facts=("has_tests",),
+)
+def _missing_tests(inputs: CheckInputs) -> CheckOutcome:
+    has_tests = bool(inputs.facts.get("has_tests"))
+    return CheckOutcome(
+        status="fail" if not has_tests else "pass",
+        confidence=0.9,
+        evidence=[] if has_tests else [Tier1Evidence(file_path="(repo)", snippet="No tests matched known test patterns", match="missing_tests")],
+    )
+
+
+@register_check(
+    "REL_002",
+    title="Missing CI workflow",
+    description="No .github/workflows pipeline was detected.",
+    category="reliability",
+    severity="medium",
+    engine="index",
+    suggested_fix_stub="Add CI workflow to run lint, tests, and build checks on pull requests.",
+    facts=("has_ci",),
+)
+def _missing_ci(inputs: CheckInputs) -> CheckOutcome:
+    has_ci = bool(inputs.facts.get("has_ci"))
+    return CheckOutcome(
+        status="warn" if not has_ci else "pass",
+        confidence=0.95,
+        evidence=[] if has_ci else [Tier1Evidence(file_path=".github/workflows", snippet="No workflow files found", match="missing_ci")],
+    )
+
+
+@register_check(
+    "REL_003",
+    title="Missing lockfile for dependency reproducibility",
+    description="Dependency manifests were found without a matching lockfile.",
+    category="reliability",
+    severity="medium",
+    engine="index",
+    suggested_fix_stub="Commit lockfiles for deterministic dependency installs in CI and production builds.",
+    facts=("manifests_present", "lockfiles_present"),
+)
+def _missing_lockfile(inputs: CheckInputs) -> CheckOutcome:
+    manifests_present = list(inputs.facts.get("manifests_present") or [])
+    lockfiles_present = list(inputs.facts.get("lockfiles_present") or [])
+    missing_lockfile = bool(manifests_present and not lockfiles_present)
+    return CheckOutcome(
+        status="warn" if missing_lockfile else "pass",
+        confidence=0.9,
+        evidence=[] if not missing_lockfile else [
+            Tier1Evidence(
+                file_path="(repo)",
+                snippet=f"Manifests: {', '.join(manifests_present)}",
+                match="missing_lockfile",
+            )
+        ],
+    )
+
+
+@register_check(
+    "REL_004",
+    title="Env vars used but no .env.example",
+    description="Environment variables are referenced but no template env file was found.",
+    category="reliability",
+    severity="medium",
+    engine="hybrid",
+    suggested_fix_stub="Add .env.example documenting required variables and safe default placeholders.",
+    signals=("env_usage",),
+    facts=("has_env_example",),
+)
+def _missing_env_template(inputs: CheckInputs) -> CheckOutcome:
+    env_usage = inputs.signals["env_usage"]
+    if inputs.facts.get("has_env_example"):
+        env_usage = []
+    return _rows_outcome(env_usage, status="warn", confidence=0.82)
+
+
+@register_check(
+    "REL_005",
+    title="Weak error/logging hygiene in backend paths",
+    description="Detected weak exception/logging patterns and/or lint warnings in server code.",
+    category="reliability",
+    severity="low",
+    engine="hybrid",
+    suggested_fix_stub="Use structured logger calls and explicit exception handling with actionable context.",
+    signals=("weak_error_logging", "lint_issues"),
+)
+def _weak_error_logging(inputs: CheckInputs) -> CheckOutcome:
+    linter_errors = [p for p in inputs.linter_probes if int(p.get("exit_code") or 0) != 0]
+    failing_tools = {p.get("tool") for p in linter_errors}
+    lint_issues = [i for i in inputs.signals["lint_issues"] if i.get("tool") in failing_tools]
+    rows: list[dict[str, Any]] = inputs.signals["weak_error_logging"][:]
+    rows.extend(
+        {
+            "file_path": issue.get("file_path"),
+            "line_number": issue.get("line_number"),
+            "snippet": f"{issue.get('tool')} {issue.get('rule')}: {issue.get('message') or ''}"[:180],
+            "match": "linter_issue",
+        }
+        for issue in lint_issues[:3]
+    )
+    # Probes without structured issues (or indexes predating them) cite raw output.
+    issue_tools = {issue.get("tool") for issue in lint_issues}
+    rows.extend(
+        {
+            "file_path": p.get("tool", "linter"),
+            "line_number": None,
+            "snippet": (p.get("stderr") or p.get("stdout") or "")[:180],
+            "match": "linter_issue",
+        }
+        for p in linter_errors[:3]
+        if p.get("tool") not in issue_tools
+    )
+    return _rows_outcome(rows, status="warn", confidence=0.7)
+
+
+@register_check(
+    "SCL_001",
+    title="God file size threshold exceeded",
+    description="Large hand-maintained source files may indicate high coupling and maintenance risk.",
+    category="scalability",
+    severity="medium",
+    engine="index",
+    suggested_fix_stub="Break large modules into smaller domain-focused components and isolate shared utilities.",
+)
+def _god_files(inputs: CheckInputs) -> CheckOutcome:
+    source_candidates = [f for f in inputs.files if not _is_lockfile_path(str(f.get("path") or ""))]
+    largest_files = sorted(source_candidates, key=lambda f: int(f.get("loc") or 0), reverse=True)[:3]
+    over_500 = [f for f in source_candidates if int(f.get("loc") or 0) > 500]
+    over_800 = [f for f in source_candidates if int(f.get("loc") or 0) > 800]
+    status = "pass"
+    severity = "medium"
+    if over_800:
+        status = "fail"
+        severity = "high"
+    elif over_500:
+        status = "warn"
+    return CheckOutcome(
+        status=status,
+        confidence=0.95,
+        severity=severity,
+        evidence=[
+            Tier1Evidence(
+                file_path=str(f.get("path") or "unknown"),
+                line_number=None,
+                snippet=f"LOC={int(f.get('loc') or 0)}",
+                match="large_file",
+            )
+            for f in largest_files
+            if int(f.get("loc") or 0) > 500
+        ],
+    )
+
+
+@register_check(
+    "SCL_002",
+    title="Blocking sync operations in request paths",
+    description="Detected synchronous/blocking calls that can increase latency under load.",
+    category="scalability",
+    severity="medium",
+    engine="ast",
+    suggested_fix_stub="Prefer async/non-blocking IO for request handlers and move heavy work off the hot path.",
+    signals=("blocking_sync",),
+)
+def _blocking_sync(inputs: CheckInputs) -> CheckOutcome:
+    return _rows_outcome(inputs.signals["blocking_sync"], status="warn", confidence=0.75)
+
+
+@register_check(
+    "SCL_003",
+    title="Missing rate limiting hints on exposed APIs",
+    description="Detected route handlers without nearby rate limiting indicators.",
+    category="scalability",
+    severity="medium",
+    engine="ast",
+    suggested_fix_stub="Add route-level or global rate limiting to protect critical endpoints from abuse spikes.",
+    signals=("route_hints",),
+)
+def _missing_rate_limits(inputs: CheckInputs) -> CheckOutcome:
+    no_rate_limit_routes = [row for row in inputs.signals["route_hints"] if not row.get("has_rate_limit")]
+    no_rate_limit_count = _signal_count(inputs.signal_counts, "route_hints.no_rate_limit", no_rate_limit_routes)
+    return CheckOutcome(
+        status="warn" if no_rate_limit_count else "pass",
+        confidence=0.7 if no_rate_limit_count else 1.0,
+        evidence=_evidence_from_rows(no_rate_limit_routes),
+    )
+
+
+@dataclass(frozen=True)
+class CheckProfile:
+    check_ids: tuple[str, ...]
+    # Facts read outside the checks themselves (the reporter's churn hotspots).
+    facts: frozenset[str] = frozenset()
+
+
+CHECK_PROFILES: dict[str, CheckProfile] = {
+    # The locked Balanced 15.
+    "balanced": CheckProfile(check_ids=tuple(CHECK_REGISTRY), facts=frozenset({"git_metadata"})),
+    # Security checks only, e.g. for a CI gate: no linters, no git history.
+    "security": CheckProfile(check_ids=tuple(check_id for check_id in CHECK_REGISTRY if check_id.startswith("SEC_"))),
+}
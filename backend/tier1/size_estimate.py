@@ -0,0 +1,206 @@
+"""Pre-clone repository size estimates for the Tier 1 LOC cap.
+
+The preflight only learns a repo's real ``loc_total`` by indexing it. This
+module approximates it beforehand from blob sizes alone. Sizes come from
+GitHub's recursive tree endpoint, or from the languages endpoint when the
+tree is too large to list. The fallback is a blob-less fetch into the local
+mirror. Files the indexer would not count (binaries, generated, vendored,
+minified and large data files) are left out, and the remaining text bytes are
+converted to lines with per-extension bytes-per-line ratios.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import asdict, dataclass
+from pathlib import PurePosixPath
+from typing import Iterable
+
+import httpx
+
+from services.github import get_languages, get_tree
+from services.repo_mirror import repo_mirrors
+from tier1.indexer import MAX_INDEXED_FILE_BYTES, REGULAR_FILE_MODES, classify_file
+
+logger = logging.getLogger(__name__)
+
+# Average bytes per non-blank line, measured on typical source trees.
+BYTES_PER_LOC: dict[str, float] = {
+    ".py": 40.0,
+    ".pyi": 40.0,
+    ".js": 34.0,
+    ".jsx": 40.0,
+    ".mjs": 34.0,
+    ".cjs": 34.0,
+    ".ts": 34.0,
+    ".tsx": 40.0,
+    ".go": 30.0,
+    ".java": 40.0,
+    ".kt": 38.0,
+    ".rb": 30.0,
+    ".php": 36.0,
+    ".cs": 38.0,
+    ".rs": 34.0,
+    ".c": 30.0,
+    ".h": 34.0,
+    ".cpp": 32.0,
+    ".swift": 36.0,
+    ".css": 27.0,
+    ".scss": 27.0,
+    ".html": 50.0,
+    ".json": 30.0,
+    ".yml": 25.0,
+    ".yaml": 25.0,
+    ".toml": 25.0,
+    ".sql": 45.0,
+    ".md": 44.0,
+    ".txt": 40.0,
+}
+DEFAULT_BYTES_PER_LOC = 38.0
+# The same ratios keyed by GitHub Linguist language names.
+LANGUAGE_BYTES_PER_LOC: dict[str, float] = {
+    "Python": 40.0,
+    "JavaScript": 34.0,
+    "TypeScript": 36.0,
+    "Go": 30.0,
+    "Java": 40.0,
+    "Kotlin": 38.0,
+    "Ruby": 30.0,
+    "PHP": 36.0,
+    "C#": 38.0,
+    "Rust": 34.0,
+    "C": 30.0,
+    "C++": 32.0,
+    "Swift": 36.0,
+    "CSS": 27.0,
+    "SCSS": 27.0,
+    "HTML": 50.0,
+    "Shell": 30.0,
+}
+# Assumed size of a blob whose size the fallback could not read.
+DEFAULT_FILE_BYTES = 4096
+BINARY_EXTENSIONS = frozenset(
+    {
+        ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".webp", ".tiff", ".psd",
+        ".woff", ".woff2", ".ttf", ".otf", ".eot",
+        ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar", ".tar", ".jar", ".war",
+        ".pdf", ".mp3", ".mp4", ".mov", ".avi", ".wav", ".ogg", ".webm",
+        ".exe", ".dll", ".so", ".dylib", ".a", ".o", ".class", ".pyc", ".wasm", ".bin",
+        ".sqlite", ".db", ".pkl", ".npy", ".parquet",
+    }
+)
+
+
+@dataclass(frozen=True)
+class RepoSizeEstimate:
+    source: str
+    file_count: int
+    text_bytes: int
+    loc_estimate: int
+    # Files counted at DEFAULT_FILE_BYTES because their size was unknown.
+    unknown_sizes: int = 0
+
+    def verdict(self, loc_cap: int, margin: float) -> str:
+        """``over_cap`` when even the low end of the estimate exceeds the cap.
+
+        ``borderline`` when only the high end does, otherwise ``ok``. An
+        estimate that is mostly guessed file sizes is never ``over_cap``.
+        """
+        guessed = self.unknown_sizes * 2 > self.file_count
+        if self.loc_estimate * (1 - margin) > loc_cap and not guessed:
+            return "over_cap"
+        if self.loc_estimate * (1 + margin) > loc_cap:
+            return "borderline"
+        return "ok"
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def estimate_from_entries(entries: Iterable[tuple[str, int | None]], *, source: str) -> RepoSizeEstimate:
+    """Estimate from ``(path, size)`` pairs of regular files; ``None`` marks an unknown size."""
+    file_count = 0
+    text_bytes = 0
+    unknown_sizes = 0
+    loc = 0.0
+    for path, size in entries:
+        lower_path = path.lower()
+        ext = PurePosixPath(lower_path).suffix
+        # Sampled and skipped classes stay out of loc_total, as in the indexer.
+        if ext in BINARY_EXTENSIONS or classify_file(lower_path, size, {}) is not None:
+            continue
+        if size is None:
+            unknown_sizes += 1
+            size = DEFAULT_FILE_BYTES
+        size = min(int(size), MAX_INDEXED_FILE_BYTES)
+        file_count += 1
+        text_bytes += size
+        loc += size / BYTES_PER_LOC.get(ext, DEFAULT_BYTES_PER_LOC)
+    return RepoSizeEstimate(
+        source=source,
+        file_count=file_count,
+        text_bytes=text_bytes,
+        loc_estimate=int(loc),
+        unknown_sizes=unknown_sizes,
+    )
+
+
+def estimate_from_languages(languages: dict[str, int]) -> RepoSizeEstimate:
+    """Estimate from Linguist bytes per language; file counts are unknown."""
+    loc = sum(size / LANGUAGE_BYTES_PER_LOC.get(name, DEFAULT_BYTES_PER_LOC) for name, size in languages.items())
+    return RepoSizeEstimate(
+        source="github_languages",
+        file_count=0,
+        text_bytes=sum(languages.values()),
+        loc_estimate=int(loc),
+    )
+
+
+async def estimate_repo_size(
+    *,
+    owner: str,
+    repo: str,
+    repo_sha: str,
+    clone_url: str,
+    token: str | None,
+) -> RepoSizeEstimate:
+    """Estimate the indexed LOC of a commit without cloning its blobs."""
+    try:
+        tree = await get_tree(owner, repo, repo_sha, token)
+        if not tree.get("truncated"):
+            entries = [
+                (str(item["path"]), item.get("size"))
+                for item in tree.get("tree") or []
+                if item.get("type") == "blob" and item.get("mode") in REGULAR_FILE_MODES
+            ]
+            return estimate_from_entries(entries, source="github_tree")
+        languages = await get_languages(owner, repo, token)
+        if languages:
+            return estimate_from_languages(languages)
+    except httpx.HTTPError as exc:
+        logger.info("GitHub size lookup failed for %s/%s (%s); sizing from the mirror", owner, repo, exc)
+    return await asyncio.to_thread(estimate_from_mirror, clone_url, repo_sha, token)
+
+
+def estimate_from_mirror(clone_url: str, repo_sha: str, token: str | None) -> RepoSizeEstimate:
+    """Estimate from a blob-less fetch: ``ls-tree`` paths plus the sizes of blobs already mirrored.
+
+    ``ls-tree -l`` is not used. In a blob-less mirror it would lazily fetch
+    every blob, which costs as much as the clone being avoided.
+    """
+    with repo_mirrors.lease(clone_url):
+        repo_mirrors.ensure_tree(clone_url, repo_sha, token=token)
+        entries = [
+            entry
+            for entry in repo_mirrors.list_tree(clone_url, repo_sha)
+            if entry.object_type == "blob" and entry.mode in REGULAR_FILE_MODES
+        ]
+        missing = repo_mirrors.missing_objects(clone_url, repo_sha)
+        sizes = repo_mirrors.blob_sizes(
+            clone_url, [entry.object_id for entry in entries if entry.object_id not in missing]
+        )
+    return estimate_from_entries(
+        ((entry.path, sizes.get(entry.object_id)) for entry in entries),
+        source="mirror_tree",
+    )
@@ -0,0 +1,39 @@
+-- Tier 1 report artifacts reusable across scans with identical report inputs.
+
+CREATE TABLE IF NOT EXISTS public.report_artifact_cache (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  user_id text NOT NULL,
+  cache_key text NOT NULL,
+  artifact_json jsonb NOT NULL DEFAULT '{}'::jsonb,
+  expires_at timestamptz NOT NULL,
+  created_at timestamptz NOT NULL DEFAULT now(),
+  updated_at timestamptz NOT NULL DEFAULT now(),
+  UNIQUE(user_id, cache_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_report_artifact_cache_expires_at
+  ON public.report_artifact_cache(expires_at);
+
+ALTER TABLE public.report_artifact_cache ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view their own cached report artifacts"
+  ON public.report_artifact_cache FOR SELECT
+  USING (public.requesting_user_id() = user_id);
+
+CREATE POLICY "Users can insert their own cached report artifacts"
+  ON public.report_artifact_cache FOR INSERT
+  WITH CHECK (public.requesting_user_id() = user_id);
+
+CREATE POLICY "Users can update their own cached report artifacts"
+  ON public.report_artifact_cache FOR UPDATE
+  USING (public.requesting_user_id() = user_id);
+
+CREATE POLICY "Users can delete their own cached report artifacts"
+  ON public.report_artifact_cache FOR DELETE
+  USING (public.requesting_user_id() = user_id);
+
+DROP TRIGGER IF EXISTS update_report_artifact_cache_updated_at ON public.report_artifact_cache;
+CREATE TRIGGER update_report_artifact_cache_updated_at
+  BEFORE UPDATE ON public.report_artifact_cache
+  FOR EACH ROW
+  EXECUTE FUNCTION public.update_updated_at_column();